@@ -86,6 +86,7 @@ $DashboardDir = Join-Path $ScriptRoot "dashboard"
 $TempDir = Join-Path $DashboardDir "temp"
 $PortsFile = Join-Path $TempDir "ports.json"
 $SetupFile = Join-Path $DashboardDir "setup.json"
+$PortPlanFile = Join-Path $DashboardDir "portplan.json"
 $MonitorFile = Join-Path $DashboardDir "monitor.json"
 $LocalConfigPath = Join-Path $ScriptRoot "_local\config.json"
 $LogPath = Join-Path $ScriptRoot "_local\r14logs"
@@ -298,7 +299,23 @@ Function Update-ExternalConfigs ($numInstances) {
     if (Test-Path $SetupFile) {
         $dashData = Get-Content $SetupFile -Raw | ConvertFrom-Json
         $dashData.numInstances = [int]$numInstances
-        $dashData.upperPort = $Global:BasePort + ([int]$numInstances * 2) 
+
+        # The forwarding checklist lists the ports instances will actually get
+        $pairs = Get-PlannedPortPairs ([int]$numInstances)
+        if ($pairs.Count -gt 0) {
+            $current = if ($dashData.portRanges) { $dashData.portRanges } else { "$($dashData.lowerPort)-$($dashData.upperPort)" }
+            $ranges = New-Object System.Collections.ArrayList
+            foreach ($pair in ($pairs | Sort-Object { $_.GS })) {
+                if ($ranges.Count -gt 0 -and $ranges[$ranges.Count - 1][1] + 1 -eq $pair.GS) { $ranges[$ranges.Count - 1][1] = $pair.API }
+                else { [void]$ranges.Add(@($pair.GS, $pair.API)) }
+            }
+            $portRanges = ($ranges | ForEach-Object { "$($_[0])-$($_[1])" }) -join ", "
+
+            $dashData.lowerPort = $pairs[0].GS
+            $dashData.upperPort = $pairs[$pairs.Count - 1].API
+            $dashData | Add-Member -NotePropertyName portRanges -NotePropertyValue $portRanges -Force
+            if ($current -ne $portRanges) { $dashData | Add-Member -NotePropertyName chklst_portFwd -NotePropertyValue $false -Force }
+        }
         $dashData | ConvertTo-Json -Depth 4 | Set-Content $SetupFile
     }
 }
@@ -713,10 +730,32 @@ Function Show-ConfigWindow {
 # 6. PORT MANAGEMENT
 # ==============================================================================
 
+Function Get-PlannedPortPairs ($count) {
+    # Same as planned_pairs in echovr_setup/ports.py: the setup tool's portplan.json (which
+    # skips ports that were taken when it was made) if it was made from our basePort, then
+    # the pairs right after its last one; without a matching plan, basePort + 2i as before.
+    $pairs = New-Object System.Collections.ArrayList
+    if (Test-Path $PortPlanFile) {
+        try {
+            $plan = Get-Content $PortPlanFile -Raw | ConvertFrom-Json
+            $entries = @($plan.psobject.properties | Sort-Object { [int]$_.Name } | ForEach-Object { $_.Value })
+            if ($entries.Count -gt 0 -and -not ($entries | Where-Object { $_.BasePort -ne $Global:BasePort })) {
+                foreach ($entry in ($entries | Select-Object -First $count)) { [void]$pairs.Add(@{ GS = [int]$entry.GS; API = [int]$entry.API }) }
+            }
+        } catch { $pairs.Clear() }
+    }
+    $nextGs = if ($pairs.Count -gt 0) { $pairs[$pairs.Count - 1].GS + 2 } else { [int]$Global:BasePort }
+    while ($pairs.Count -lt $count -and $nextGs + 1 -le 65535) {
+        [void]$pairs.Add(@{ GS = $nextGs; API = $nextGs + 1 })
+        $nextGs += 2
+    }
+    return ,$pairs.ToArray()
+}
+
 Function Get-AvailablePortPair {
-    for ($i = 0; $i -lt 100; $i++) {
-        $gsPort = $Global:BasePort + ($i * 2)
-        $apiPort = $gsPort + 1
+    foreach ($pair in (Get-PlannedPortPairs 100)) {
+        $gsPort = $pair.GS
+        $apiPort = $pair.API
         $inUse = $false
         foreach ($pidKey in $Global:PortMap.Keys) {
             $entry = $Global:PortMap[$pidKey]
@@ -1075,11 +1114,7 @@ $MonitorAction = {
     }
 
     if ($Global:PendingSilentDLLUpdate -and $runningCount -eq 0) {
-        try {
-            [System.Net.ServicePointManager]::SecurityProtocol = [System.Net.SecurityProtocolType]::Tls12
-            Invoke-WebRequest -Uri "$dllURL/pnsradgameserver.dll" -OutFile $Script:Path_PNSRAD
-            Invoke-WebRequest -Uri "$dllURL/dbgcore.dll" -OutFile $Script:Path_DBGCORE
-        } catch { }
+        try { Install-DLLs } catch { }
 
         $Global:PendingSilentDLLUpdate = $false
 
@@ -1133,11 +1168,21 @@ Function Test-FileHash ($path, $targetHash) {
     return ($hash.Hash -eq $targetHash)
 }
 
-Function Update-DLLs ($Silent = $false) {
-    $rawBaseUrl = $dllURL
-    $urlPNSRAD = "$rawBaseUrl/pnsradgameserver.dll"
-    $urlDBG    = "$rawBaseUrl/dbgcore.dll"
+Function Install-DLLs {
+    # The setup tool patches the installed DLLs with small binary deltas (falling back to full
+    # downloads itself), targeting the hashes this monitor checks; without it, download both DLLs whole as before.
+    $setupExe = Join-Path $ScriptRoot "EchoVR-Server-Setup.exe"
+    if (Test-Path $setupExe) {
+        $proc = Start-Process -FilePath $setupExe -ArgumentList "update-dlls", "--md5", "pnsradgameserver.dll=$Global:Hash_PNSRAD", "--md5", "dbgcore.dll=$Global:Hash_DBGCORE" -WorkingDirectory $ScriptRoot -WindowStyle Hidden -Wait -PassThru
+        if ($proc.ExitCode -eq 0 -and (Test-FileHash $Script:Path_PNSRAD $Global:Hash_PNSRAD) -and (Test-FileHash $Script:Path_DBGCORE $Global:Hash_DBGCORE)) { return }
+    }
 
+    [System.Net.ServicePointManager]::SecurityProtocol = [System.Net.SecurityProtocolType]::Tls12
+    Invoke-WebRequest -Uri "$dllURL/pnsradgameserver.dll" -OutFile $Script:Path_PNSRAD
+    Invoke-WebRequest -Uri "$dllURL/dbgcore.dll" -OutFile $Script:Path_DBGCORE
+}
+
+Function Update-DLLs ($Silent = $false) {
     $running = Get-Process -Name $Script:EchoProcessName -ErrorAction SilentlyContinue
     if ($running) {
         if ($Silent) { 
@@ -1177,9 +1222,7 @@ Function Update-DLLs ($Silent = $false) {
     }
 
     try {
-        [System.Net.ServicePointManager]::SecurityProtocol = [System.Net.SecurityProtocolType]::Tls12
-        Invoke-WebRequest -Uri $urlPNSRAD -OutFile $Script:Path_PNSRAD
-        Invoke-WebRequest -Uri $urlDBG -OutFile $Script:Path_DBGCORE
+        Install-DLLs
         if (-not $Silent) { [System.Windows.Forms.MessageBox]::Show("DLLs updated successfully.", "Success", [System.Windows.Forms.MessageBoxButtons]::OK, [System.Windows.Forms.MessageBoxIcon]::Information) }
         return $true
     } catch {
@@ -1,842 +1,12 @@
-import customtkinter as ctk
-import tkinter as tk
-from tkinter import messagebox
-import json
-import os
+import multiprocessing
 import sys
-import subprocess
-import urllib.request
-import zipfile
-import shutil
-import hashlib
-import threading
-import re
-import ctypes
-import ssl
 
-# SSL Fix
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
+from echovr_setup.cli import main
 
-# Theme Setup
-ctk.set_appearance_mode("Dark")
-ctk.set_default_color_theme("dark-blue")
-
-# Filepaths
-ROOT_DIR = os.getcwd() 
-DASHBOARD_DIR = os.path.join(ROOT_DIR, "dashboard")
-SETUP_JSON = os.path.join(DASHBOARD_DIR, "setup.json")
-BIN_DIR = os.path.join(ROOT_DIR, "bin", "win10")
-CONFIG_LOCAL = os.path.join(ROOT_DIR, "_local", "config.json")
-
-# URLs
-URL_GUNPATCH = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/misc/gunpatch.zip"
-URL_PNSRAD = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/dll/pnsradgameserver.dll"
-URL_DBGCORE = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/dll/dbgcore.dll"
-GITHUB_API_LATEST = "https://api.github.com/repos/EchoTools/EchoVR-Windows-Hosts-Resources/releases/latest"
-URL_FONTS = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/misc/"
-
-# Monitor Filenames
-MONITOR_EXE = "EchoVR-Server-Monitor.exe"
-MONITOR_SCRIPT = "EchoVR-Server-Monitor.ps1"
-
-# MD5 Hashes
-HASH_DBGCORE = "7E7998C29A1E588AF659E19C3DD27265"
-HASH_PNSRAD = "67E6E9B3BE315EA784D69E5A31815B89"
-
-# Globals
-FONT_MAIN = "Neuropol X"
-
-class EchoServerConfig(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        
-        # Load fonts before building UI
-        self.initialize_fonts()
-        
-        self.title("EchoVR Server Setup Tool")
- 
-        screen_height = self.winfo_screenheight()
-        default_width = 490
-        default_height = 840
-
-        if screen_height < default_height:
-            calc_height = int(screen_height * 0.8)
-            self.geometry(f"{default_width + 20}x{calc_height}") 
-            self.use_scroll = True
-        else:
-            self.geometry(f"{default_width}x{default_height}")
-            self.use_scroll = False
-
-        self.resizable(False, False)
-        
-        # State variables
-        self.setup_data = {}
-        self.is_cgnat = False 
-        
-        self.patch_thread = None
-        self.patch_status_text = "Patch Server"
-
-        # Initialization check
-        if not os.path.exists(os.path.join(BIN_DIR, "echovr.exe")):
-            messagebox.showerror("Error", "Place this program in the ready-at-dawn-echo-arena folder.")
-            self.destroy()
-            sys.exit()
-
-        self.ensure_setup_exists()
-        self.load_setup()
-        
-        # Run startup checks
-        self.startup_checks()
-        self.build_main_menu()
-
-    def initialize_fonts(self):
-        global FONT_MAIN
-        fonts_dir = os.path.join(ROOT_DIR, "content", "engine", "core", "fonts")
-        os.makedirs(fonts_dir, exist_ok=True)
-        
-        font_files = ["EchoStencil.ttf", "Neuropol-X-Rg.otf"]
-        base_url = URL_FONTS
-        fonts_loaded = True
-        
-        for font_file in font_files:
-            font_path = os.path.join(fonts_dir, font_file)
-            try:
-                if not os.path.exists(font_path):
-                    urllib.request.urlretrieve(base_url + font_file, font_path)
-                
-                # Temporarily load font into Windows GDI 
-                if os.name == 'nt':
-                    FR_PRIVATE = 0x10
-                    res = ctypes.windll.gdi32.AddFontResourceExW(font_path, FR_PRIVATE, 0)
-                    if res == 0:
-                        fonts_loaded = False
-                else:
-                    fonts_loaded = False
-            except Exception:
-                fonts_loaded = False
-                
-        FONT_MAIN = "Neuropol X" if fonts_loaded else "Arial"
-
-    def ensure_setup_exists(self):
-        if not os.path.exists(DASHBOARD_DIR):
-            os.makedirs(DASHBOARD_DIR)
-            
-        if not os.path.exists(SETUP_JSON):
-            default_data = {
-                "filePath": ROOT_DIR, 
-                "isPatched": False,   
-                "isConfigured": False, 
-                "checkCGNAT": "Fail",  
-                "hasUnifi": False,
-                "numInstances": "",    
-                "lowerPort": 6792,
-                "upperPort": 6793, 
-                "chklst_privateNet": False,
-                "chklst_staticIP": False,
-                "chklst_portFwd": False,
-                "chklst_unifiAllowP2P": False,
-                "chklst_usedNewConfig": False,
-                "chklst_hasMonitorScript": False
-            }
-            with open(SETUP_JSON, 'w') as f:
-                json.dump(default_data, f, indent=4)
-
-    def load_setup(self):
-        with open(SETUP_JSON, 'r') as f:
-            self.setup_data = json.load(f)
-        
-        if "hasUnifi" not in self.setup_data:
-            self.setup_data["hasUnifi"] = False
-        if "chklst_unifiAllowP2P" not in self.setup_data:
-            self.setup_data["chklst_unifiAllowP2P"] = False
-        if "lowerPort" not in self.setup_data:
-            self.setup_data["lowerPort"] = 6792
-        self.save_setup()
-
-    def save_setup(self):
-        with open(SETUP_JSON, 'w') as f:
-            json.dump(self.setup_data, f, indent=4)
-
-    def startup_checks(self):
-        if self.setup_data["filePath"] != ROOT_DIR:
-            self.setup_data["filePath"] = ROOT_DIR
-            self.save_setup()
-
-        self.check_unifi()
-
-        path_exe = os.path.join(ROOT_DIR, MONITOR_EXE)
-        path_ps1 = os.path.join(ROOT_DIR, MONITOR_SCRIPT)
-        
-        if os.path.exists(path_exe) or os.path.exists(path_ps1):
-            if not self.setup_data.get("chklst_hasMonitorScript", False):
-                self.setup_data["chklst_hasMonitorScript"] = True
-                self.save_setup()
-
-        if not self.setup_data["isPatched"]:
-            self.check_patch_status()
-
-        if self.setup_data.get("checkCGNAT") in ["Fail", ""]:
-            threading.Thread(target=self.run_cgnat_check, daemon=True).start()
-        else:
-             self.is_cgnat = (self.setup_data["checkCGNAT"] == "Pass") 
-
-    def is_network_private(self):
-        """Silently checks if the current network profile is set to Private."""
-        try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            output = subprocess.check_output(
-                ["powershell", "-NoProfile", "-Command", "(Get-NetConnectionProfile).NetworkCategory"],
-                startupinfo=startupinfo, text=True, timeout=5
-            ).strip()
-            return output.lower() == "private"
-        except Exception:
-            return False
-
-    def check_unifi(self):
-        try:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            output = subprocess.check_output("tracert -h 1 1.1.1.1", 
-                                             startupinfo=startupinfo, 
-                                             shell=True).decode()
-            
-            if 'unifi' in output.lower():
-                self.setup_data["hasUnifi"] = True
-            else:
-                self.setup_data["hasUnifi"] = False
-            
-            self.save_setup()
-        except Exception:
-            self.setup_data["hasUnifi"] = False
-            self.save_setup()
-
-    def run_cgnat_check(self):
-        try:
-            wan_ip = urllib.request.urlopen('https://api.ipify.org', timeout=3).read().decode('utf8')
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-            output = subprocess.check_output(f"tracert -d -h 5 {wan_ip}", 
-                                             startupinfo=startupinfo, 
-                                             shell=True).decode()
-            
-            hops = re.findall(r'^\s*(\d+)\s+', output, re.MULTILINE)
-            
-            if hops:
-                hop_count = int(hops[-1])
-                if hop_count > 1:
-                    self.setup_data["checkCGNAT"] = "Fail"
-                else:
-                    self.setup_data["checkCGNAT"] = "Pass"
-            else:
-                self.setup_data["checkCGNAT"] = "Fail"
-
-            self.save_setup()
-            
-        except Exception:
-            self.setup_data["checkCGNAT"] = "Fail"
-            self.save_setup()
-
-    def check_patch_status(self):
-        path_dbg = os.path.join(BIN_DIR, "dbgcore.dll")
-        path_pns = os.path.join(BIN_DIR, "pnsradgameserver.dll")
-        path_gun = os.path.join(ROOT_DIR, "combatGunPatchFiles")
-
-        is_patched = True
-        if not os.path.exists(path_gun):
-            is_patched = False
-        else:
-            if not self.verify_hash(path_dbg, HASH_DBGCORE) or \
-               not self.verify_hash(path_pns, HASH_PNSRAD):
-                is_patched = False
-        
-        self.setup_data["isPatched"] = is_patched
-        self.save_setup()
-        return is_patched
-
-    def verify_hash(self, filepath, expected_hash):
-        if not os.path.exists(filepath): return False
-        with open(filepath, "rb") as f:
-            file_hash = hashlib.md5(f.read()).hexdigest().upper() 
-        return file_hash == expected_hash.upper()
-
-    # --- GUI Construction ---
-
-    def clear_window(self):
-        for widget in self.winfo_children():
-            widget.destroy()
-
-    def build_main_menu(self):
-        self.clear_window()
-        
-        # Pick which ui mode to use based on screen height
-        if self.use_scroll:
-            main_frame = ctk.CTkScrollableFrame(self)
-        else:
-            main_frame = ctk.CTkFrame(self)
-
-        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
-
-        # 1. Calculate readiness state first
-        checklist_keys = ["chklst_privateNet", "chklst_staticIP", "chklst_portFwd", "chklst_usedNewConfig", "chklst_hasMonitorScript"]
-        if self.setup_data.get("hasUnifi", False):
-            checklist_keys.append("chklst_unifiAllowP2P")
-
-        all_checklist_complete = all(self.setup_data.get(k, False) for k in checklist_keys)
-        is_ready = self.setup_data["isConfigured"] and self.setup_data["isPatched"] and all_checklist_complete
-
-        # 2. Conditionally show the warning label
-        if not is_ready:
-            lbl_warning = ctk.CTkLabel(main_frame, text="Complete all actions before starting your server.", font=(FONT_MAIN, 12), text_color="#FFA500")
-            lbl_warning.pack(pady=(10, 15))
-
-        # Buttons side-by-side
-        btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        btn_frame.pack(pady=10)
-
-        self.btn_patch = ctk.CTkButton(btn_frame, text="Patch Server", command=self.action_patch_server, font=(FONT_MAIN, 14), width=180, height=40)
-        self.btn_patch.pack(side="left", padx=10)
-        self.update_patch_button() 
-
-        config_text = "Config Ready" if self.setup_data["isConfigured"] else "Configure Server"
-        config_fg_color = "green" if self.setup_data["isConfigured"] else None 
-        
-        self.btn_config = ctk.CTkButton(btn_frame, text=config_text, fg_color=config_fg_color, command=self.action_configure_server, font=(FONT_MAIN, 14), width=180, height=40)
-        self.btn_config.pack(side="right", padx=10)
-
-        self.checklist_frame = ctk.CTkFrame(main_frame)
-        self.refresh_checklist() 
-
-        # 3. Use the pre-calculated state to show the launch buttons
-        if is_ready:
-            lbl_ready = ctk.CTkLabel(main_frame, text="Ready to Launch", font=(FONT_MAIN, 20, "bold"), text_color="green")
-            lbl_ready.pack(pady=(20, 5))
-            
-            btn_launch = ctk.CTkButton(main_frame, text="Start Server", 
-                                   command=self.action_launch_monitor, 
-                                   fg_color="green", text_color="white", font=(FONT_MAIN, 14), height=40)
-            btn_launch.pack(pady=5)
-
-            lbl_instruct = ctk.CTkLabel(main_frame, text="This will close the setup tool.", font=(FONT_MAIN, 10), text_color="gray")
-            lbl_instruct.pack(pady=0)
-
-    def update_patch_button(self):
-        if self.patch_thread and self.patch_thread.is_alive():
-            self.btn_patch.configure(text=self.patch_status_text, state="disabled")
-            return
-
-        if self.setup_data["isPatched"]:
-            self.btn_patch.configure(text="Server Patched", fg_color="green", state="normal", font=(FONT_MAIN, 14))
-        else:
-            self.btn_patch.configure(text="Patch Server", fg_color=["#3B8ED0", "#1F6AA5"], state="normal", font=(FONT_MAIN, 14)) 
-
-    def refresh_checklist(self):
-        lower_port = self.setup_data.get('lowerPort', 6792)
-        upper_port = self.setup_data.get('upperPort', 6793)
-        
-        checklist_items_map = [
-            ("chklst_privateNet", "Set Network Profile to Private"),
-            ("chklst_staticIP", "Create a Static LAN IP for This Machine"),
-            ("chklst_portFwd", f"Forward Ports {lower_port}-{upper_port} (TCP + UDP)")
-        ]
-
-        if self.setup_data.get("hasUnifi", False):
-            checklist_items_map.append(("chklst_unifiAllowP2P", "Allow P2P traffic to reach your server"))
-
-        checklist_items_map.append(("chklst_usedNewConfig", "Log In with New Client Config"))
-        checklist_items_map.append(("chklst_hasMonitorScript", "Download Server Monitoring Script"))
-
-        all_complete = all(self.setup_data.get(k, False) for k, v in checklist_items_map)
-        
-        if all_complete:
-            self.checklist_frame.pack_forget()
-            return
-
-        self.checklist_frame.pack(fill="x", pady=20, padx=10)
-        
-        for widget in self.checklist_frame.winfo_children():
-            widget.destroy()
-
-        lbl_title = ctk.CTkLabel(self.checklist_frame, text="Setup Checklist", font=(FONT_MAIN, 14))
-        lbl_title.pack(anchor="w", padx=10, pady=(10,5))
-
-        for key, label_text in checklist_items_map:
-            if not self.setup_data.get(key, False):
-                row = ctk.CTkFrame(self.checklist_frame, fg_color="transparent")
-                row.pack(fill="x", pady=2, padx=5)
-                
-                lbl = ctk.CTkLabel(row, text=label_text, anchor="w")
-                lbl.pack(side="left", fill="x", expand=True, padx=5)
-                
-                state = "normal"
-                if key in ["chklst_portFwd", "chklst_usedNewConfig", "chklst_unifiAllowP2P"] and not self.setup_data["isConfigured"]:
-                    state = "disabled"
-                
-                if key == "chklst_hasMonitorScript":
-                    btn_dl_frame = ctk.CTkFrame(row, fg_color="transparent")
-                    btn_dl_frame.pack(side="right")
-                    
-                    ctk.CTkButton(btn_dl_frame, text="Download .exe", width=80,
-                             command=lambda: self.download_monitor_file(MONITOR_EXE)).pack(side="left", padx=2)
-                    ctk.CTkButton(btn_dl_frame, text="Download .ps1", width=80,
-                             command=lambda: self.download_monitor_file(MONITOR_SCRIPT)).pack(side="left", padx=2)
-                elif key == "chklst_privateNet":
-                    btn = ctk.CTkButton(row, text="Set", width=60, command=self.action_set_private_network)
-                    btn.pack(side="right", padx=5)
-                else:
-                    btn = ctk.CTkButton(row, text="Done", width=60, state=state, command=lambda k=key: self.complete_checklist_item(k))
-                    btn.pack(side="right", padx=5)
-
-                # --- Checklist Notes ---
-                note_text = ""
-                if key == "chklst_privateNet": note_text = 'Click "Set" to do this automatically.'
-                if key == "chklst_staticIP": note_text = "e.g., 192.168.1.100. Reconnect before continuing."
-                if key == "chklst_portFwd": note_text = "Complete your server configuration first."
-                if key == "chklst_unifiAllowP2P": note_text = "Ensure P2P traffic to your server is unblocked in the UniFi dashboard."
-                if key == "chklst_usedNewConfig": note_text = "Do this with the device you usually play on. (Config > Generate Client Config)"
-                if key == "chklst_hasMonitorScript": note_text = "Downloads the Server Monitor to your echo folder.\nThe .ps1 option will auto-update execution policy."
-
-                if note_text:
-                    note_lbl = ctk.CTkLabel(self.checklist_frame, text=note_text,
-                                        font=("Arial", 11), text_color="gray", anchor="w")
-                    note_lbl.pack(fill="x", padx=30, pady=(0, 5))
-
-    def complete_checklist_item(self, key):
-        self.setup_data[key] = True
-        self.save_setup()
-        self.refresh_checklist()
-        self.build_main_menu() 
-
-    # --- Actions ---
-    
-    def action_set_private_network(self):
-        """Creates a self-deleting batch file that requests UAC and sets network profile to Private."""
-        temp_dir = os.path.join(DASHBOARD_DIR, "temp")
-        os.makedirs(temp_dir, exist_ok=True)
-        bat_path = os.path.join(temp_dir, "Set-PrivateNetwork.bat")
-        
-        bat_content = """@echo off
-net session >nul 2>&1
-if %errorLevel% neq 0 (
-    powershell -WindowStyle Hidden -Command "Start-Process -WindowStyle Hidden -Wait -Verb RunAs -FilePath '%~f0'"
-    exit /b
-)
-powershell -WindowStyle Hidden -NoProfile -Command "Get-NetConnectionProfile | Set-NetConnectionProfile -NetworkCategory Private"
-del "%~f0"
-"""
-        try:
-            with open(bat_path, "w") as f:
-                f.write(bat_content)
-                
-            def run_and_verify():
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                
-                # Execute script and wait
-                subprocess.run(bat_path, startupinfo=startupinfo, shell=True)
-                
-                # Verify profile was successfully changed
-                is_private = self.is_network_private()
-                
-                # Safely update GUI
-                def update_ui():
-                    if is_private:
-                        self.setup_data["chklst_privateNet"] = True
-                        self.save_setup()
-                        self.refresh_checklist()
-                        self.build_main_menu()
-                    else:
-                        messagebox.showwarning("Incomplete", "The network profile was not updated. Did you decline the Administrator prompt?")
-                
-                self.after(0, update_ui)
-
-            threading.Thread(target=run_and_verify, daemon=True).start()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not run network profile script: {e}")
-    
-    def action_update_exec_policy(self):
-        """Creates a self-deleting batch file that requests UAC and sets the PS policy."""
-        bat_path = os.path.join(ROOT_DIR, "Set-ExecPolicy.bat")
-        
-        bat_content = """@echo off
-net session >nul 2>&1
-if %errorLevel% neq 0 (
-    powershell -WindowStyle Hidden -Command "Start-Process -WindowStyle Hidden -Wait -Verb RunAs -FilePath '%~f0'"
-    exit /b
-)
-
-:: Force update for 64-bit Windows PowerShell (5.1)
-if exist "%SystemRoot%\\sysnative\\WindowsPowerShell\\v1.0\\powershell.exe" (
-    "%SystemRoot%\\sysnative\\WindowsPowerShell\\v1.0\\powershell.exe" -WindowStyle Hidden -NoProfile -Command "Set-ExecutionPolicy Bypass -Scope LocalMachine -Force"
-) else (
-    powershell -WindowStyle Hidden -NoProfile -Command "Set-ExecutionPolicy Bypass -Scope LocalMachine -Force"
-)
-
-del "%~f0"
-"""
-        try:
-            with open(bat_path, "w") as f:
-                f.write(bat_content)
-                
-            def run_and_update():
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                
-                # Execute script and wait
-                subprocess.run(bat_path, startupinfo=startupinfo, shell=True)
-                
-                # Safely update GUI
-                def update_ui():
-                    self.refresh_checklist()
-                    self.build_main_menu()
-
-                self.after(0, update_ui)
-
-            threading.Thread(target=run_and_update, daemon=True).start()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not run policy update script: {e}")
-
-    def download_monitor_file(self, filename):
-            try:
-                target_path = os.path.join(ROOT_DIR, filename)
-                print(f"Checking for updates at: {GITHUB_API_LATEST}")
-                with urllib.request.urlopen(GITHUB_API_LATEST, timeout=5) as response:
-                    data = json.loads(response.read().decode())
-                    
-                download_url = None
-                for asset in data.get("assets", []):
-                    if asset["name"].lower() == filename.lower():
-                        download_url = asset["browser_download_url"]
-                        break
-                
-                if not download_url:
-                    messagebox.showerror("Error", f"Could not find '{filename}' in the latest GitHub release.")
-                    return
-
-                opener = urllib.request.build_opener()
-                opener.addheaders = [('User-agent', 'Mozilla/5.0')]
-                urllib.request.install_opener(opener)
-                urllib.request.urlretrieve(download_url, target_path)
-                
-                if os.path.exists(target_path):
-                    messagebox.showinfo("Success", f"Downloaded {filename} successfully!")
-                    self.setup_data["chklst_hasMonitorScript"] = True
-                    self.save_setup()
-                    
-                    if filename == MONITOR_SCRIPT:
-                        # Always run the policy update
-                        self.action_update_exec_policy()
-                    else:
-                        self.refresh_checklist()
-                        self.build_main_menu()
-                else:
-                    messagebox.showerror("Error", "Download appeared to finish but file is missing.")
-                    
-            except urllib.error.HTTPError as e:
-                messagebox.showerror("GitHub API Error", f"Failed to check GitHub: {e.code} {e.reason}")
-            except Exception as e:
-                messagebox.showerror("Download Error", str(e))
-
-    def action_launch_monitor(self):
-        path_exe = os.path.join(ROOT_DIR, MONITOR_EXE)
-        path_ps1 = os.path.join(ROOT_DIR, MONITOR_SCRIPT)
-
-        if os.path.exists(path_exe):
-            try:
-                os.startfile(path_exe)
-                self.destroy() 
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not launch .exe monitor: {e}")
-
-        elif os.path.exists(path_ps1):
-            try:
-                bat_filename = "Launch-Monitor.bat"
-                bat_path = os.path.join(ROOT_DIR, bat_filename)
-                
-                cmd_content = f"start /min powershell -windowstyle hidden -file {MONITOR_SCRIPT}"
-                with open(bat_path, "w") as f:
-                    f.write(cmd_content)
-                
-                os.startfile(bat_path)
-                self.destroy() 
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not launch .ps1 monitor: {e}")
-        else:
-            messagebox.showerror("Error", "Monitor executable or script not found.")
-
-    def action_patch_server(self):
-        self.btn_patch.configure(state="disabled")
-        self.patch_thread = threading.Thread(target=self.run_patch_sequence, daemon=True)
-        self.patch_thread.start()
-
-    def run_patch_sequence(self):
-        try:
-            self.update_btn_text("Downloading DLLs...")
-            temp_dir = os.path.join(DASHBOARD_DIR, "temp")
-            if not os.path.exists(temp_dir): os.makedirs(temp_dir)
-            
-            urllib.request.urlretrieve(URL_DBGCORE, os.path.join(BIN_DIR, "dbgcore.dll"))
-            urllib.request.urlretrieve(URL_PNSRAD, os.path.join(BIN_DIR, "pnsradgameserver.dll"))
-            
-            self.update_btn_text("Downloading Patch...")
-            gunpatch_zip_path = os.path.join(temp_dir, "gunpatch.zip")
-            urllib.request.urlretrieve(URL_GUNPATCH, gunpatch_zip_path)
-            
-            self.update_btn_text("Extracting Patch...")
-            if os.path.exists(gunpatch_zip_path):
-                 with zipfile.ZipFile(gunpatch_zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(ROOT_DIR)
-
-            self.update_btn_text("Getting Ready...")
-            data_dir = os.path.join(ROOT_DIR, "_data")
-            rad_base = os.path.join(data_dir, "5932408047", "rad15")
-            path_win10 = os.path.join(rad_base, "win10")
-            path_orig = os.path.join(rad_base, "original_files")
-            
-            if os.path.exists(data_dir):
-                if not os.path.exists(path_orig):
-                    if os.path.exists(path_win10):
-                        os.rename(path_win10, path_orig)
-                
-                if os.path.exists(path_win10):
-                    shutil.rmtree(path_win10)
-                
-                os.makedirs(os.path.join(path_win10, "packages"), exist_ok=True)
-                os.makedirs(os.path.join(path_win10, "manifests"), exist_ok=True)
-                
-                self.update_btn_text("Copying Files...")
-                src_manifest = os.path.join(path_orig, "manifests", "2b47aab238f60515")
-                dst_manifest = os.path.join(path_win10, "manifests", "2b47aab238f60515")
-                if os.path.exists(src_manifest):
-                    if os.path.isdir(src_manifest): shutil.copytree(src_manifest, dst_manifest)
-                    else: shutil.copy(src_manifest, dst_manifest)
-
-                src_pkg = os.path.join(path_orig, "packages", "2b47aab238f60515_0")
-                dst_pkg = os.path.join(path_win10, "packages", "2b47aab238f60515_0")
-                if os.path.exists(src_pkg):
-                     if os.path.isdir(src_pkg): shutil.copytree(src_pkg, dst_pkg)
-                     else: shutil.copy(src_pkg, dst_pkg)
-
-                self.update_btn_text("Patching...")
-                tool_path = os.path.join(ROOT_DIR, "evrFileTools.exe")
-                args = [
-                    tool_path, "-mode", "replace", "-packageName", "48037dc70b0ecab2",
-                    "-dataDir", path_orig + "\\", "-inputDir", os.path.join(ROOT_DIR, "combatGunPatchFiles"),
-                    "-outputDir", path_win10 + "\\", "-ignoreOutputRestrictions"
-                ]
-                
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                subprocess.call(args, startupinfo=startupinfo)
-                
-            else:
-                messagebox.showerror("Error", "Missing _data folder. Ensure you are in the correct directory.")
-
-            self.update_btn_text("Cleaning Up...")
-            self.after(500, self.finish_patching) 
-
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            if os.path.exists(os.path.join(ROOT_DIR, "patch.bat")):
-                os.remove(os.path.join(ROOT_DIR, "patch.bat"))
-            if os.path.exists(os.path.join(ROOT_DIR, "evrFileTools.exe")):
-                os.remove(os.path.join(ROOT_DIR, "evrFileTools.exe"))
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-            self.after(0, self.update_patch_button)
-
-    def update_btn_text(self, text):
-        self.patch_status_text = text
-        def _update():
-            if hasattr(self, 'btn_patch') and self.btn_patch.winfo_exists():
-                self.btn_patch.configure(text=text, font=(FONT_MAIN, 14))
-        self.after(0, _update)
-
-    def finish_patching(self):
-        is_success = self.check_patch_status()
-        self.patch_thread = None 
-        on_main_menu = hasattr(self, 'btn_patch') and self.btn_patch.winfo_exists()
-
-        if is_success:
-            messagebox.showinfo("Success", "Server Patched Successfully!")
-            if on_main_menu: self.build_main_menu()
-        else:
-            messagebox.showerror("Failed", "Patch verification failed.")
-            if on_main_menu: self.update_patch_button()
-
-    def action_configure_server(self):
-        self.clear_window()
-        
-        existing_conf = {}
-        discord_id = ""
-        password = ""
-        region_val = ""
-        cgnat_val = ""
-        args_val = ""
-        
-        if os.path.exists(CONFIG_LOCAL):
-            with open(CONFIG_LOCAL, 'r') as f:
-                try:
-                    existing_conf = json.load(f)
-                    serverdb_url = existing_conf.get("serverdb_host", "")
-                    if "?" in serverdb_url:
-                        _, query = serverdb_url.split("?", 1)
-                        params = query.split("&")
-                        remaining_params = []
-                        for p in params:
-                            if p.startswith("discordid="): discord_id = p.split("=", 1)[1]
-                            elif p.startswith("password="): password = p.split("=", 1)[1]
-                            elif p.startswith("regions="): region_val = p.split("=", 1)[1]
-                            elif p.startswith("serveraddr="): cgnat_val = p.split("=", 1)[1]
-                            else: remaining_params.append(p)
-                        if remaining_params: args_val = "&" + "&".join(remaining_params)
-                except: pass
-
-        # Frame selection
-        if self.use_scroll:
-            form_frame = ctk.CTkScrollableFrame(self)
-        else:
-            form_frame = ctk.CTkFrame(self)
-
-        form_frame.pack(fill="both", expand=True, padx=20, pady=20)
-        
-        cgnat_status = self.setup_data.get("checkCGNAT", "Fail")
-        if cgnat_status == "Pass":
-            lbl_cgnat = ctk.CTkLabel(form_frame, text="No CGNAT Detected!", text_color="green", font=(FONT_MAIN, 14))
-        else:
-            lbl_cgnat = ctk.CTkLabel(form_frame, text="CGNAT Detected. Use a tunnel service to host.", text_color="red", font=(FONT_MAIN, 14))
-        lbl_cgnat.pack(anchor="w", pady=(0, 10))
-
-        ctk.CTkLabel(form_frame, text="Discord User ID (Required)").pack(anchor="w")
-        entry_discord = ctk.CTkEntry(form_frame, width=400)
-        entry_discord.insert(0, discord_id)
-        entry_discord.pack(anchor="w")
-        ctk.CTkLabel(form_frame, text="NOT your username. Get your user ID by right clicking your profile > Copy User ID.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        ctk.CTkLabel(form_frame, text="Password (Required)").pack(anchor="w")
-        entry_pass = ctk.CTkEntry(form_frame, width=400)
-        entry_pass.insert(0, password)
-        entry_pass.pack(anchor="w")
-        ctk.CTkLabel(form_frame, text="Do not use a password you typically use.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        ctk.CTkLabel(form_frame, text="Region ID").pack(anchor="w")
-        entry_region = ctk.CTkEntry(form_frame, width=400)
-        entry_region.insert(0, region_val)
-        entry_region.pack(anchor="w")
-        ctk.CTkLabel(form_frame, text="Leave blank unless otherwise instructed. Separate multiple IDs with commas.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        ctk.CTkLabel(form_frame, text="Tunnel IP:Port").pack(anchor="w")
-        entry_cgnat = ctk.CTkEntry(form_frame, width=400)
-        entry_cgnat.insert(0, cgnat_val)
-        entry_cgnat.pack(anchor="w")
-        ctk.CTkLabel(form_frame, text="Required for hosts behind a CGNAT, optional otherwise.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        ctk.CTkLabel(form_frame, text="Additional Arguments").pack(anchor="w")
-        entry_args = ctk.CTkEntry(form_frame, width=400)
-        entry_args.insert(0, args_val)
-        entry_args.pack(anchor="w")
-        ctk.CTkLabel(form_frame, text="Raw text appended to serverdb_host. Leave blank unless you know what you're doing!", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        # Base Port Addition
-        ctk.CTkLabel(form_frame, text="Base Port").pack(anchor="w")
-        saved_lower = self.setup_data.get("lowerPort", 6792)
-        var_lower = tk.IntVar(value=int(saved_lower))
-        spin_lower = tk.Spinbox(form_frame, from_=1024, to=65535, textvariable=var_lower, 
-                                    bg="#343638", fg="white", buttonbackground="#2B2B2B")
-        spin_lower.pack(anchor="w", pady=2)
-        ctk.CTkLabel(form_frame, text="Default is 6792.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        ctk.CTkLabel(form_frame, text="Number of Instances (Required)").pack(anchor="w")
-        saved_instances = self.setup_data.get("numInstances", 0)
-        if saved_instances == "": saved_instances = 0
-        var_instances = tk.IntVar(value=int(saved_instances))
-        
-        spin_instances = tk.Spinbox(form_frame, from_=0, to=100, textvariable=var_instances, 
-                                    bg="#343638", fg="white", buttonbackground="#2B2B2B")
-        spin_instances.pack(anchor="w", pady=2)
-        
-        ctk.CTkLabel(form_frame, text="Will automatically update your monitoring script.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
-
-        btn_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
-        btn_frame.pack(pady=20, fill="x")
-
-        ctk.CTkButton(btn_frame, text="Open Config", command=lambda: os.startfile(CONFIG_LOCAL) if os.path.exists(CONFIG_LOCAL) else None).pack(fill="x", pady=2)
-        
-        def save_and_return(should_return=True):
-            if not entry_discord.get() or not entry_pass.get() or var_instances.get() == 0:
-                messagebox.showerror("Error", "Missing required fields.")
-                return False
-
-            did = entry_discord.get()
-            pwd = entry_pass.get()
-            base_serverdb = f"ws://g.echovrce.com:80/serverdb?discordid={did}&password={pwd}"
-            if entry_region.get(): base_serverdb += f"&regions={entry_region.get()}"
-            if entry_cgnat.get(): base_serverdb += f"&serveraddr={entry_cgnat.get()}"
-            if entry_args.get(): base_serverdb += f"{entry_args.get()}"
-
-            new_config = {
-                "apiservice_host": "http://g.echovrce.com:80/api",
-                "configservice_host": "ws://g.echovrce.com:80/config",
-                "loginservice_host": f"ws://g.echovrce.com:80/login?discordid={did}&password={pwd}",
-                "matchingservice_host": "ws://g.echovrce.com:80/matching",
-                "serverdb_host": base_serverdb,
-                "transactionservice_host": "ws://g.echovrce.com:80/transaction",
-                "publisher_lock": "echovrce"
-            }
-            
-            if not os.path.exists(os.path.dirname(CONFIG_LOCAL)): os.makedirs(os.path.dirname(CONFIG_LOCAL))
-            with open(CONFIG_LOCAL, 'w') as f: json.dump(new_config, f, indent=4)
-
-            current_instances = self.setup_data.get("numInstances", 0)
-            if current_instances == "": current_instances = 0
-            current_instances = int(current_instances)
-
-            current_lower = self.setup_data.get("lowerPort", 6792)
-            
-            if current_instances != var_instances.get() or current_lower != var_lower.get():
-                self.setup_data["chklst_portFwd"] = False 
-
-            num_instances = var_instances.get()
-            lower_port = var_lower.get()
-            upper_port = lower_port + (num_instances * 2) - 1
-            
-            self.setup_data["numInstances"] = num_instances
-            self.setup_data["lowerPort"] = lower_port
-            self.setup_data["upperPort"] = upper_port
-            self.setup_data["isConfigured"] = True
-            self.save_setup()
-
-            if should_return: self.build_main_menu()
-            return True
-
-        def generate_client():
-            if not save_and_return(should_return=False): return
-            desktop = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
-            target = os.path.join(desktop, "config.json")
-            with open(CONFIG_LOCAL, 'r') as f: data = json.load(f)
-            did = entry_discord.get()
-            pwd = entry_pass.get()
-            data["serverdb_host"] = f"ws://g.echovrce.com:80/serverdb?discordid={did}&password={pwd}"
-            with open(target, 'w') as f: json.dump(data, f, indent=4)
-            messagebox.showinfo("Done", "Changes saved. New client config generated on Desktop.")
-            self.build_main_menu()
-
-        ctk.CTkButton(btn_frame, text="Generate Client Config", command=generate_client).pack(fill="x", pady=5)
-        
-        footer = ctk.CTkFrame(btn_frame, fg_color="transparent")
-        footer.pack(fill="x", pady=5)
-        ctk.CTkButton(footer, text="Save & Return", fg_color="green", command=save_and_return).pack(side="left", expand=True, fill="x", padx=2)
-        ctk.CTkButton(footer, text="Discard & Return", fg_color="firebrick", command=self.build_main_menu).pack(side="right", expand=True, fill="x", padx=2)
+# Setup logic lives in echovr_setup/core.py, the window in echovr_setup/gui.py.
+# Run with no arguments for the GUI, or see --help for the headless commands.
 
 if __name__ == "__main__":
-    app = EchoServerConfig()
-    app.mainloop()
\ No newline at end of file
+    # Log archiving uses a process pool, which needs this in a frozen .exe
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+serverdb_host generation and parsing, as the configure form and client-config export do it.
+"""
+from harness import measure
+
+from echovr_setup.core import build_server_config, parse_serverdb_host
+
+
+def run(quick=False):
+    ops = 2000 if quick else 20000
+    url = build_server_config("123456789012345678", "hunter2", "us-east,us-west", "203.0.113.7:6792",
+                              "&tags=bench&features=a,b")["serverdb_host"]
+
+    def build():
+        for i in range(ops):
+            build_server_config(str(i), "hunter2", "us-east", "203.0.113.7:6792", "&tags=bench")
+
+    def parse():
+        for _ in range(ops):
+            parse_serverdb_host(url)
+
+    repeat = 3 if quick else 5
+    return [
+        measure("config.build_server_config", build, repeat, params={"ops": ops}),
+        measure("config.parse_serverdb_host", parse, repeat, params={"ops": ops}),
+    ]
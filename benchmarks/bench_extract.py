@@ -0,0 +1,58 @@
+"""
+Extracting a gunpatch-sized zip: plain zipfile.extractall against extract_incremental on an
+empty folder and on an already extracted one. Uses misc/gunpatch.zip when it's there.
+"""
+import os
+import zipfile
+
+from harness import MB, REPO_ROOT, make_file, measure, remove, temp_root
+
+from echovr_setup.extract import extract_incremental
+
+
+def synthetic_gunpatch(path, root):
+    """Same layout as misc/gunpatch.zip: two patch files, a 15 MB tool and patch.bat."""
+    src = os.path.join(root, "src")
+    tool = make_file(os.path.join(src, "evrFileTools.exe"), 15 * MB)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, name in enumerate(("0x11a8523ed4724ca7", "0xf8d40525c88885d8")):
+            zf.writestr(f"combatGunPatchFiles/0/0x607d858c90268f9a/{name}", os.urandom(64 * 1024 * (i + 1)))
+        zf.write(tool, "evrFileTools.exe")
+        zf.writestr("patch.bat", "@echo off\r\n")
+    return path
+
+
+def run(quick=False):
+    root = temp_root()
+    try:
+        zip_path = os.path.join(REPO_ROOT, "misc", "gunpatch.zip")
+        if not os.path.exists(zip_path):
+            zip_path = synthetic_gunpatch(os.path.join(root, "gunpatch.zip"), root)
+        with zipfile.ZipFile(zip_path) as zf:
+            total = sum(info.file_size for info in zf.infolist())
+        repeat = 3 if quick else 10
+        out = os.path.join(root, "out")
+        manifest = os.path.join(root, "manifest.json")
+
+        def clean():
+            remove(out)
+            if os.path.exists(manifest):
+                os.remove(manifest)
+
+        def extractall():
+            with zipfile.ZipFile(zip_path) as zf:
+                zf.extractall(out)
+
+        params = {"archive": os.path.basename(zip_path), "mb": round(total / MB, 1)}
+        results = [
+            measure("extract.zipfile_extractall", extractall, repeat, setup=clean, params=params, bytes_processed=total),
+            measure("extract.incremental_cold", lambda: extract_incremental(zip_path, out, manifest),
+                    repeat, setup=clean, params=params, bytes_processed=total),
+        ]
+        clean()
+        extract_incremental(zip_path, out, manifest)
+        results.append(measure("extract.incremental_warm", lambda: extract_incremental(zip_path, out, manifest),
+                               repeat, params=params))
+        return results
+    finally:
+        remove(root)
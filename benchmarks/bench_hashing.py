@@ -0,0 +1,46 @@
+"""
+verify_hash on a large file (cold: streamed through MD5 + SHA-256, warm: integrity cache hit)
+and a hashed download of the same file from a local HTTP stand-in.
+"""
+import os
+
+from harness import MB, LocalServer, make_echo_install, make_file, measure, remove, temp_root
+
+from echovr_setup.core import SetupCore
+from echovr_setup.downloads import DownloadManager
+from echovr_setup.integrity import IntegrityCache, hash_file
+
+
+def run(quick=False):
+    size = (64 if quick else 512) * MB
+    root = make_echo_install(temp_root())
+    try:
+        path = make_file(os.path.join(root, "serve", "big.bin"), size)
+        digests = hash_file(path, ("md5", "sha256"))
+        core = SetupCore(root)
+        core.open()
+
+        def reset():
+            core.integrity = IntegrityCache()
+
+        results = [
+            measure("verify_hash.cold", lambda: core.verify_hash(path, digests["md5"], digests["sha256"]),
+                    repeat=3, setup=reset, params={"mb": size // MB}, bytes_processed=size),
+            measure("verify_hash.warm", lambda: core.verify_hash(path, digests["md5"], digests["sha256"]),
+                    repeat=20, params={"mb": size // MB}),
+        ]
+
+        dest = os.path.join(root, "downloaded.bin")
+        with LocalServer(os.path.join(root, "serve")) as server:
+            def fetch():
+                DownloadManager().download(server.url("big.bin"), dest, (digests["md5"], digests["sha256"]))
+
+            def clear():
+                if os.path.exists(dest):
+                    os.remove(dest)
+
+            results.append(measure("download.hashed", fetch, repeat=3, setup=clear,
+                                   params={"mb": size // MB}, bytes_processed=size))
+        return results
+    finally:
+        remove(root)
@@ -0,0 +1,110 @@
+"""
+Archives a synthetic r14logs folder with each codec and worker count. Part of run.py's
+suites; run on its own it prints one archive summary per codec and worker count as JSON:
+
+    python benchmarks/bench_logarchive.py --logs 200 --size-kb 512
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from harness import measure, remove, temp_root
+
+from echovr_setup.logarchive import LogArchiver, zstandard
+
+LINES = [
+    "[NETGAME] Session state changed to running\n",
+    "[NSLOBBY] Player joined lobby, playerid 1234567\n",
+    "[R14NETSERVER] Sent session update to 8 peers\n",
+    "[SCRIPT] Loading level mpl_combat_dyson\n",
+    "[ERROR] Failed to resolve asset 0x2b47aab238f60515\n",
+]
+
+
+def make_logs(log_dir, count, size_kb, now):
+    os.makedirs(log_dir, exist_ok=True)
+    rng = random.Random(1)
+    for i in range(count):
+        path = os.path.join(log_dir, f"r14_{i:05d}_{10000 + i}.log")
+        with open(path, "w") as f:
+            written = 0
+            while written < size_kb * 1024:
+                line = f"[{i}:{written}] " + rng.choice(LINES)
+                f.write(line)
+                written += len(line)
+        # Spread across the last three weeks, all older than a day
+        mtime = now - 2 * 86400 - rng.random() * 21 * 86400
+        os.utime(path, (mtime, mtime))
+
+
+def codecs():
+    return ["gzip", "xz"] + (["zstd"] if zstandard else [])
+
+
+def ratio(summary):
+    return round(summary["bytes_in"] / summary["bytes_out"], 2) if summary["bytes_out"] else None
+
+
+def run(quick=False):
+    logs, size_kb = (24, 256) if quick else (120, 512)
+    workers = min(4, os.cpu_count() or 1)
+    repeat = 1 if quick else 3
+    now = time.time()
+    root = temp_root()
+    log_dir = os.path.join(root, "r14logs")
+    results = []
+    try:
+        for codec in codecs():
+            for count in sorted({1, workers}):
+                summary = {}
+
+                def reset():
+                    remove(log_dir)
+                    make_logs(log_dir, logs, size_kb, now)
+
+                def archive():
+                    summary.update(LogArchiver(log_dir, codec=codec, workers=count).archive(now=now))
+
+                result = measure(f"logarchive.{codec}", archive, repeat, setup=reset,
+                                 params={"workers": count, "logs": logs, "size_kb": size_kb},
+                                 bytes_processed=logs * size_kb * 1024)
+                result["ratio"] = ratio(summary)
+                results.append(result)
+        return results
+    finally:
+        remove(root)
+
+
+def archive_once(codec, workers, args, now):
+    root = temp_root()
+    try:
+        log_dir = os.path.join(root, "r14logs")
+        make_logs(log_dir, args.logs, args.size_kb, now)
+        summary = LogArchiver(log_dir, codec=codec, workers=workers, part_bytes=args.part_mb * 1024 * 1024).archive(now=now)
+        summary.update(codec=codec, workers=workers, ratio=ratio(summary),
+                       mb_per_s=round(summary["bytes_in"] / 1048576 / summary["seconds"], 1) if summary["seconds"] else None)
+        return summary
+    finally:
+        remove(root)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logs", type=int, default=120)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--part-mb", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    now = time.time()
+    results = []
+    for codec in codecs():
+        for workers in sorted({1, args.workers}):
+            results.append(archive_once(codec, workers, args, now))
+    print(json.dumps({"benchmark": "logarchive", "logs": args.logs, "size_kb": args.size_kb, "results": results}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+The win10 rebuild: placing the untouched package by copy vs link (a hardlink), and
+restoring patched output from the patch cache instead of re-running the tool (entries are
+reflinks or block clones where the filesystem has them, copies here otherwise).
+"""
+import os
+
+from harness import MB, make_file, measure, remove, temp_root
+
+from echovr_setup.rebuild import PatchOutputStore, clone_path
+
+KEPT_PACKAGE = "2b47aab238f60515"
+PATCH_PACKAGE = "48037dc70b0ecab2"
+
+
+def run(quick=False):
+    kept_size = (64 if quick else 512) * MB
+    patched_size = (16 if quick else 128) * MB
+    root = temp_root()
+    try:
+        orig = os.path.join(root, "original_files")
+        make_file(os.path.join(orig, "packages", f"{KEPT_PACKAGE}_0"), kept_size, seed=1)
+        make_file(os.path.join(orig, "manifests", KEPT_PACKAGE), 256 * 1024, seed=2)
+
+        # Stand-in for evrFileTools output
+        produced = os.path.join(root, "produced")
+        make_file(os.path.join(produced, "packages", f"{PATCH_PACKAGE}_0"), patched_size, seed=3)
+        make_file(os.path.join(produced, "manifests", PATCH_PACKAGE), 256 * 1024, seed=4)
+
+        win10 = os.path.join(root, "win10")
+        repeat = 3 if quick else 5
+        params = {"kept_mb": kept_size // MB}
+
+        def reset():
+            remove(win10)
+            os.makedirs(win10)
+
+        def place(mode):
+            for rel in (("manifests", KEPT_PACKAGE), ("packages", f"{KEPT_PACKAGE}_0")):
+                dst = os.path.join(win10, *rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                clone_path(os.path.join(orig, *rel), dst, mode)
+
+        results = [
+            measure("rebuild.kept_copy", lambda: place("copy"), repeat, setup=reset, params=params, bytes_processed=kept_size),
+            measure("rebuild.kept_link", lambda: place("link"), repeat, setup=reset, params=params),
+        ]
+
+        store = PatchOutputStore(os.path.join(root, "patch_cache"), copies=True)
+        results.append(measure("rebuild.cache_ingest", lambda: store.ingest("key", produced), repeat,
+                               params={"patched_mb": patched_size // MB}))
+        results.append(measure("rebuild.cache_restore", lambda: store.restore("key", win10), repeat, setup=reset,
+                               params={"patched_mb": patched_size // MB}))
+        return results
+    finally:
+        remove(root)
@@ -0,0 +1,40 @@
+"""
+setup.json churn: load_setup and repeated save_setup, with an integrity cache and startup
+history the size a long-lived install accumulates.
+"""
+import os
+
+from harness import make_echo_install, make_file, measure, remove, temp_root
+
+from echovr_setup.core import SetupCore
+
+
+def run(quick=False):
+    root = make_echo_install(temp_root())
+    try:
+        core = SetupCore(root)
+        core.open()
+        for i in range(200):
+            path = os.path.join(root, "cached", f"file_{i}.bin")
+            make_file(path, 16)
+            core.integrity.record(path, {"md5": "0" * 32, "sha256": "0" * 64})
+        core.setup_data["firstPaintHistory"] = [123.4] * 20
+        core.flush_setup()
+
+        saves = 50 if quick else 500
+        counter = [0]
+
+        def churn():
+            for _ in range(saves):
+                counter[0] += 1
+                core.setup_data["benchCounter"] = counter[0]
+                core.save_setup()
+            core.flush_setup()
+
+        repeat = 3 if quick else 5
+        return [
+            measure("setup_json.load", core.load_setup, repeat=20 if quick else 100),
+            measure("setup_json.save_churn", churn, repeat, params={"saves": saves}),
+        ]
+    finally:
+        remove(root)
@@ -0,0 +1,100 @@
+"""
+Shared pieces for the benchmark scripts: timing, synthetic fixtures and a local HTTP
+stand-in for the GitHub downloads.
+"""
+import functools
+import http.server
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+MB = 1024 * 1024
+
+
+def measure(name, fn, repeat=5, setup=None, params=None, bytes_processed=None):
+    """
+    Runs setup() (untimed) then fn() repeat times. Returns a result dict with min/median/mean
+    seconds and, given bytes_processed, MB/s at the median.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    result = {
+        "name": name,
+        "params": params or {},
+        "runs": repeat,
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+    }
+    if bytes_processed:
+        result["mb_per_s"] = round(bytes_processed / MB / result["median_s"], 1) if result["median_s"] else None
+    return result
+
+
+def temp_root(prefix="echovr-bench-"):
+    return tempfile.mkdtemp(prefix=prefix)
+
+
+def remove(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def make_file(path, size, seed=0):
+    """Writes size bytes of incompressible data (a random block with a per-block counter)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    block = random.Random(seed).randbytes(MB)
+    with open(path, "wb") as f:
+        written = 0
+        counter = 0
+        while written < size:
+            chunk = (counter.to_bytes(8, "little") + block[8:])[:size - written]
+            f.write(chunk)
+            written += len(chunk)
+            counter += 1
+    return path
+
+
+def make_echo_install(root):
+    """The minimum SetupCore accepts as an echo folder."""
+    os.makedirs(os.path.join(root, "bin", "win10"), exist_ok=True)
+    open(os.path.join(root, "bin", "win10", "echovr.exe"), "wb").close()
+    return root
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """Serves a directory over HTTP on 127.0.0.1 in a background thread."""
+
+    def __init__(self, directory):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.httpd.server_port}/{name}"
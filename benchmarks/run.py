@@ -0,0 +1,71 @@
+"""
+Runs the setup-tool benchmarks headless against synthetic fixtures and prints one JSON document.
+
+    python benchmarks/run.py --quick
+    python benchmarks/run.py --only hashing,extract --out results.json
+
+bench_logarchive.py can also be run on its own to sweep other log counts and sizes.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import REPO_ROOT
+
+SUITES = ["hashing", "extract", "rebuild", "setup_json", "config", "logarchive"]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="Smaller fixtures and fewer runs")
+    parser.add_argument("--only", default="", help="Comma separated: " + ",".join(SUITES))
+    parser.add_argument("--out", help="Also write the JSON here")
+    args = parser.parse_args()
+
+    suites = [s for s in args.only.split(",") if s] or SUITES
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error("unknown suite(s): " + ", ".join(sorted(unknown)))
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "quick": args.quick,
+        "results": [],
+    }
+    for suite in suites:
+        started = time.perf_counter()
+        results = importlib.import_module(f"bench_{suite}").run(quick=args.quick)
+        for result in results:
+            result["suite"] = suite
+        report["results"].extend(results)
+        print(f"{suite}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    text = json.dumps(report, indent=4)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
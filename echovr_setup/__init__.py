@@ -0,0 +1,5 @@
+"""Support code for the EchoVR Server Setup Tool."""
+import time
+
+# Reference point for startup timings (time-to-first-paint etc.)
+STARTED = time.perf_counter()
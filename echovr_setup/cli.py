@@ -0,0 +1,378 @@
+"""
+Non-interactive entry point for the setup tool. With no arguments the GUI is launched;
+customtkinter/tkinter are only imported in that case.
+
+    EchoVR-Server-Setup.exe status
+    EchoVR-Server-Setup.exe configure --discord-id 123 --password hunter2 --instances 4
+    EchoVR-Server-Setup.exe patch
+    EchoVR-Server-Setup.exe fleet hosts.csv --parallel 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from echovr_setup.core import MONITOR_EXE, MONITOR_SCRIPT, SetupCore, SetupError
+from echovr_setup.downloads import DownloadError
+from echovr_setup.rad15 import Rad15Error
+from echovr_setup.sources import is_local
+from echovr_setup.tracing import format_stages
+
+
+def _print_progress(done, total, stage="Downloading..."):
+    if total:
+        sys.stdout.write(f"\r{stage} {done * 100 // total}%")
+    else:
+        sys.stdout.write(f"\r{stage} {done / 1048576:.1f} MB")
+    sys.stdout.flush()
+
+
+def cmd_status(core, args):
+    status = {
+        "root": core.root_dir,
+        "isPatched": core.setup_data.get("isPatched", False),
+        "isConfigured": core.setup_data.get("isConfigured", False),
+        "checkCGNAT": core.setup_data.get("checkCGNAT", "Fail"),
+        "hasUnifi": core.setup_data.get("hasUnifi", False),
+        "numInstances": core.setup_data.get("numInstances", ""),
+        "ports": [core.setup_data.get("lowerPort"), core.setup_data.get("upperPort")],
+        "checklist": {key: done for key, _, done in core.checklist()},
+        "ready": core.is_ready(),
+    }
+    print(json.dumps(status, indent=4))
+    return 0
+
+
+def cmd_check(core, args):
+    core.startup_checks()
+    return cmd_status(core, args)
+
+
+def cmd_patch(core, args):
+    # Last stage name, and whether a progress line is left open after it
+    last = [None, False]
+
+    def status(text):
+        if text != last[0]:
+            print(("\n" if last[1] else "") + text)
+            last[:] = [text, False]
+
+    def progress(done, total):
+        _print_progress(done, total, last[0] or "Downloading...")
+        last[1] = True
+
+    try:
+        ok = core.run_patch_sequence(status=status, progress=None if args.quiet else progress)
+    finally:
+        if core.last_patch_trace:
+            print(format_stages(core.last_patch_trace))
+            print(f"Trace: {core.last_patch_trace['file']}")
+    print("Server Patched Successfully!" if ok else "Patch verification failed.")
+    return 0 if ok else 1
+
+
+def _dll_pin(algorithm, length):
+    def parse(value):
+        name, _, digest = value.partition("=")
+        if not name or len(digest) != length or any(c not in "0123456789abcdefABCDEF" for c in digest):
+            raise argparse.ArgumentTypeError(f"expected NAME={algorithm.upper()}, got {value!r}")
+        return name, algorithm, digest
+    return parse
+
+
+def cmd_update_dlls(core, args):
+    pins = {}
+    for name, algorithm, digest in (args.md5 or []) + (args.sha256 or []):
+        pins.setdefault(name, {})[algorithm] = digest
+    for entry in core.update_dlls(pins=pins):
+        size = f"{entry['bytes'] / 1024:.1f} KB" if entry["bytes"] else "-"
+        reason = f" ({entry['reason']})" if entry.get("reason") else ""
+        print(f"{entry['file']}: {entry['method']}, {size}{reason}")
+    ok = all(core.verify_hash(t.path, *t.hashes) for t in core.dll_updater(pins).targets)
+    return 0 if ok else 1
+
+
+def cmd_verify_data(core, args):
+    report = core.verify_game_data(full=args.full, progress=None if args.quiet else
+                                   lambda done, total: _print_progress(done, total, "Hashing..."))
+    if report["hashed"] and not args.quiet:
+        print()
+    for rel, ranges in report["corrupt"].items():
+        spans = ", ".join(f"{start:#x}-{end:#x}" for start, end in ranges)
+        print(f"CORRUPT {rel}: {spans}")
+    for rel in report["missing"]:
+        print(f"MISSING {rel}")
+    if report["recorded"]:
+        print(f"Recorded {len(report['recorded'])} new file(s) as the baseline")
+    print(f"{report['checked']} file(s) checked, {report['hashed']} hashed, {report['sampled']} unchanged chunk(s) "
+          f"spot-checked ({report['bytes'] / 1048576:.0f} MB) in {report['seconds']:.1f}s")
+    if not args.full:
+        print("Other files with unchanged size and modification time were trusted; use --full to re-hash everything")
+    return 1 if report["corrupt"] or report["missing"] else 0
+
+
+def cmd_sources(core, args):
+    sources = list(core.setup_data.get("artifactSources", []))
+    if args.action != "list" and not args.source:
+        raise SetupError(f"'sources {args.action}' needs a URL or folder")
+    if args.action == "add" and is_local(args.source):
+        args.source = os.path.abspath(args.source)
+    if args.action == "add" and args.source not in sources:
+        sources.append(args.source)
+    elif args.action == "remove" and args.source in sources:
+        sources.remove(args.source)
+    if args.action != "list":
+        core.setup_data["artifactSources"] = sources
+        core.save_setup()
+    for source in sources + ["GitHub (always raced)"]:
+        print(source)
+    return 0
+
+
+def cmd_configure(core, args):
+    core.configure(args.discord_id, args.password, args.instances, args.base_port,
+                   regions=args.regions, serveraddr=args.serveraddr, extra_args=args.extra_args)
+    print(f"Wrote {core.config_local}")
+    return 0
+
+
+def cmd_client_config(core, args):
+    print(f"Wrote {core.write_client_config(args.output)}")
+    return 0
+
+
+def cmd_download_monitor(core, args):
+    filename = MONITOR_EXE if args.kind == "exe" else MONITOR_SCRIPT
+    print(f"Downloaded {core.download_monitor(filename)}")
+    return 0
+
+
+def cmd_done(core, args):
+    keys = [key for key, _, _ in core.checklist()]
+    if args.item not in keys:
+        raise SetupError(f"Unknown checklist item '{args.item}'. Choose from: {', '.join(keys)}")
+    core.complete_checklist_item(args.item)
+    return 0
+
+
+def cmd_supervise(core, args):
+    from echovr_setup.metrics import serve_metrics
+    from echovr_setup.supervisor import Supervisor
+
+    def report(supervisor):
+        states = ", ".join(f"{i.pid}:{i.mode_tray}/{i.player_count}" for i in supervisor.instances)
+        print(f"{len(supervisor.instances)} running, tick {supervisor.last_tick * 1000:.1f} ms  {states}")
+        if supervisor.link_code:
+            print(f"Link code: {supervisor.link_code} (spawning paused; link it, then restart supervise)")
+
+    async def run():
+        if args.metrics_port:
+            await serve_metrics(supervisor, args.metrics_host, args.metrics_port)
+        await supervisor.run(on_tick=report)
+
+    supervisor = Supervisor(core.root_dir)
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.close()
+    return 0
+
+
+def cmd_archive_logs(core, args):
+    from echovr_setup.logarchive import LogArchiver
+
+    archiver = LogArchiver(core.log_dir, codec=args.codec)
+    print(json.dumps(archiver.archive(manual=args.all), indent=4))
+    if args.purge:
+        print(f"Purged {archiver.purge(args.purge)} old file(s)")
+    return 0
+
+
+def cmd_search_logs(core, args):
+    from echovr_setup.logindex import LogIndex
+
+    index = LogIndex(core.log_index, core.log_dir)
+    try:
+        if not args.no_update:
+            index.update()
+        events = index.search(text=args.text, player=args.player, kind=args.kind, pid=args.pid,
+                              since=args.since, until=args.until, limit=args.limit)
+    finally:
+        index.close()
+    for event in events:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["ts"])) if event["ts"] else "?"
+        print(f"{when}  {event['kind']:<13} pid {event['pid']}  {event['log']}: {event['line']}")
+    return 0
+
+
+def run_fleet(args):
+    from echovr_setup.fleet import FleetProvisioner, load_inventory
+
+    def report(result):
+        state = "ok" if result["ok"] else f"FAILED: {result['error']}"
+        print(f"{result['root']}: {state} ({result['seconds']}s)", file=sys.stderr)
+
+    try:
+        rows = load_inventory(args.inventory)
+    except (SetupError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    provisioner = FleetProvisioner(rows, os.path.abspath(args.cache), parallel=args.parallel,
+                                   patch=not args.no_patch, mirror=args.mirror, on_result=report)
+    summary = provisioner.run()
+    text = json.dumps(summary, indent=4)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(text)
+    print(text)
+    return 0 if not summary["failed"] else 1
+
+
+def run_build_dll_release(args):
+    from echovr_setup.dllupdate import build_release
+
+    manifest = build_release(args.dll_dir, args.previous, args.out)
+    for name, entry in manifest["files"].items():
+        deltas = ", ".join(f"{d['size'] / 1024:.1f} KB" for d in entry["deltas"].values()) or "none"
+        print(f"{name}: {entry['size'] / 1024:.0f} KB, deltas: {deltas}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="EchoVR-Server-Setup", description="EchoVR Server Setup Tool")
+    parser.add_argument("--root", default=None, help="ready-at-dawn-echo-arena folder (default: current directory)")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("gui", help="Open the setup window (default)")
+    sub.add_parser("status", help="Print setup state as JSON")
+    sub.add_parser("check", help="Run the startup checks, then print status")
+
+    p = sub.add_parser("patch", help="Download DLLs and gun patch, then patch the game data")
+    p.add_argument("--quiet", action="store_true", help="No download progress")
+
+    p = sub.add_parser("update-dlls", help="Update dbgcore.dll/pnsradgameserver.dll, by binary delta where possible")
+    p.add_argument("--md5", action="append", type=_dll_pin("md5", 32), metavar="NAME=MD5",
+                   help="Target this MD5 for a DLL instead of the built-in hashes (repeatable)")
+    p.add_argument("--sha256", action="append", type=_dll_pin("sha256", 64), metavar="NAME=SHA256",
+                   help="Target this SHA-256 for a DLL instead of the built-in hashes (repeatable)")
+
+    p = sub.add_parser("build-dll-release", help="Maintainers: write dll/manifest.json and deltas from earlier builds")
+    p.add_argument("dll_dir", help="Folder with the new DLLs")
+    p.add_argument("previous", nargs="*", help="Folders with earlier releases of the same DLLs")
+    p.add_argument("--out", default=None, help="Where manifest.json and deltas/ go (default: dll_dir)")
+
+    p = sub.add_parser("verify-data", help="Check the rad15 package files for corruption (changed files plus a rotating sample are re-hashed)")
+    p.add_argument("--full", action="store_true", help="Re-hash every file, not just ones whose size/mtime changed")
+    p.add_argument("--quiet", action="store_true", help="No hashing progress")
+
+    p = sub.add_parser("sources", help="List, add or remove mirrors/local folders raced against GitHub for downloads")
+    p.add_argument("action", choices=["list", "add", "remove"], nargs="?", default="list")
+    p.add_argument("source", nargs="?", help="Base URL of a mirror of this repo, or a folder laid out the same way")
+
+    p = sub.add_parser("configure", help="Write _local/config.json")
+    p.add_argument("--discord-id", required=True)
+    p.add_argument("--password", required=True)
+    p.add_argument("--instances", type=int, required=True)
+    p.add_argument("--base-port", type=int, default=6792)
+    p.add_argument("--regions", default="")
+    p.add_argument("--serveraddr", default="", help="Tunnel IP:Port")
+    p.add_argument("--extra-args", default="", help="Raw text appended to serverdb_host")
+
+    p = sub.add_parser("client-config", help="Write a client config.json")
+    p.add_argument("output")
+
+    p = sub.add_parser("download-monitor", help="Download the Server Monitor from the latest release")
+    p.add_argument("kind", choices=["exe", "ps1"])
+
+    p = sub.add_parser("supervise", help="Run and poll the server instances from dashboard/monitor.json")
+    p.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus /metrics on this port")
+    p.add_argument("--metrics-host", default="127.0.0.1")
+
+    p = sub.add_parser("archive-logs", help="Compress old r14 logs into weekly archives")
+    p.add_argument("--all", action="store_true", help="Include logs from the last day (not ones still being written)")
+    p.add_argument("--codec", choices=["gzip", "xz", "zstd"], default=None, help="Default: zstd if installed, else gzip")
+    p.add_argument("--purge", choices=["Daily", "Weekly", "Monthly"], default=None, help="Also apply this retention")
+
+    p = sub.add_parser("search-logs", help="Search indexed log events (link codes, sessions, errors, players, ports)")
+    p.add_argument("text", nargs="?", default=None, help="Full-text query, e.g. an error signature in quotes")
+    p.add_argument("--player", default=None, help="Player ID, e.g. OVR-ORG-123456789")
+    p.add_argument("--kind", choices=["link_code", "session_start", "session_end", "error", "crash", "player", "port"])
+    p.add_argument("--pid", type=int, default=None)
+    p.add_argument("--since", default=None, help="ISO date/time or epoch seconds")
+    p.add_argument("--until", default=None, help="ISO date/time or epoch seconds")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--no-update", action="store_true", help="Query without indexing new log lines first")
+
+    p = sub.add_parser("fleet", help="Configure and patch every install listed in an inventory (CSV or JSON)")
+    p.add_argument("inventory", help="root,discord_id,password,regions,serveraddr,base_port,instances per row")
+    p.add_argument("--parallel", type=int, default=4, help="Installs set up at once")
+    p.add_argument("--cache", default="fleet_cache", help="Download cache shared by every install")
+    p.add_argument("--mirror", default=None, help="Fetch the DLLs and gun patch from this base URL instead of GitHub")
+    p.add_argument("--no-patch", action="store_true", help="Only write config.json/setup.json")
+    p.add_argument("--report", default=None, help="Also write the summary JSON here")
+
+    p = sub.add_parser("done", help="Mark a checklist item as complete")
+    p.add_argument("item")
+
+    return parser
+
+
+COMMAND_ERRORS = (SetupError, DownloadError, OSError, Rad15Error)
+
+COMMANDS = {
+    "status": cmd_status,
+    "check": cmd_check,
+    "patch": cmd_patch,
+    "update-dlls": cmd_update_dlls,
+    "sources": cmd_sources,
+    "verify-data": cmd_verify_data,
+    "configure": cmd_configure,
+    "client-config": cmd_client_config,
+    "download-monitor": cmd_download_monitor,
+    "done": cmd_done,
+    "supervise": cmd_supervise,
+    "archive-logs": cmd_archive_logs,
+    "search-logs": cmd_search_logs,
+}
+
+
+def run_gui(root_dir=None):
+    from echovr_setup.gui import EchoServerConfig
+
+    app = EchoServerConfig(SetupCore(root_dir))
+    app.mainloop()
+    return 0
+
+
+def _run(command, *args):
+    """Runs a command; the failures it can expect print one line and exit 1 instead of a traceback."""
+    try:
+        return command(*args)
+    except COMMAND_ERRORS as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command in (None, "gui"):
+        return run_gui(args.root)
+    if args.command == "fleet":
+        return _run(run_fleet, args)
+    if args.command == "build-dll-release":
+        return _run(run_build_dll_release, args)
+
+    core = SetupCore(os.path.abspath(args.root) if args.root else None)
+    if not core.is_echo_install():
+        print("Error: bin/win10/echovr.exe not found. Run this in the ready-at-dawn-echo-arena folder or pass --root.", file=sys.stderr)
+        return 2
+
+    try:
+        return _run(lambda: COMMANDS[args.command](core.open(), args))
+    finally:
+        core.flush_setup()
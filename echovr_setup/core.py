@@ -0,0 +1,680 @@
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import time
+
+from echovr_setup.dllupdate import DllTarget, DllUpdater
+from echovr_setup.downloads import DownloadJob, DownloadManager
+from echovr_setup.extract import extract_incremental, extract_member
+from echovr_setup.httpcache import HttpCache
+from echovr_setup.integrity import IntegrityCache
+from echovr_setup.merkle import TreeVerifier
+from echovr_setup.netprobe import URL_IPIFY, HttpReflector, NetworkProbe
+from echovr_setup import rad15
+from echovr_setup.ports import PortPlanError, format_ranges, load_plan, occupied_ports, plan_ports, port_ranges, save_plan
+from echovr_setup.rebuild import PatchOutputStore, clone_path, list_files, patch_cache_key
+from echovr_setup.sources import MultiSourceFetcher
+from echovr_setup.startup import Probe, ProbeRunner
+from echovr_setup.store import SetupStore
+from echovr_setup.tracing import Tracer, tree_size
+
+# SSL Fix
+try:
+    _create_unverified_https_context = ssl._create_unverified_context
+except AttributeError:
+    pass
+else:
+    ssl._create_default_https_context = _create_unverified_https_context
+
+# URLs
+URL_GUNPATCH = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/misc/gunpatch.zip"
+URL_PNSRAD = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/dll/pnsradgameserver.dll"
+URL_DBGCORE = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/dll/dbgcore.dll"
+# Hashes + deltas for the DLLs above (see dllupdate.build_release)
+URL_DLL_MANIFEST = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/dll/manifest.json"
+GITHUB_API_LATEST = "https://api.github.com/repos/EchoTools/EchoVR-Windows-Hosts-Resources/releases/latest"
+URL_FONTS = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/misc/"
+
+# Monitor Filenames
+MONITOR_EXE = "EchoVR-Server-Monitor.exe"
+MONITOR_SCRIPT = "EchoVR-Server-Monitor.ps1"
+
+# MD5 Hashes
+HASH_DBGCORE = "7E7998C29A1E588AF659E19C3DD27265"
+HASH_PNSRAD = "67E6E9B3BE315EA784D69E5A31815B89"
+
+# SHA-256 Hashes
+HASH_DBGCORE_SHA256 = "0A62D6DBFFDC89E320DDED8ADA0A9CBC24CE24F4CF8C217BC0D5F82195E11ADE"
+HASH_PNSRAD_SHA256 = "25176F0BAB6BBA8C742E5109FB6E6BDEF84BDC26E7F53F248A48139DF8672A03"
+HASH_GUNPATCH_SHA256 = "3562BCBB62B97BBA2085FF20196E4DE27755E6DA39B7D2FB1956E3B530EF2B48"
+# Font file -> SHA-256, fetched from URL_FONTS
+FONT_HASHES = {
+    "EchoStencil.ttf": "6336E2BD5D362FBD17F5EC89C775B7DA523361561D1012F44D0A956B0D32D1CB",
+    "Neuropol-X-Rg.otf": "12D821396D9728531FEFDAAD15E86F6FD20991F9ADDA154287B9E467F1CE8213",
+}
+
+# Game Data
+PATCH_PACKAGE = "48037dc70b0ecab2"
+KEPT_PACKAGE = "2b47aab238f60515"
+# Package folders covered by the game data check (see verify_game_data), relative to the root
+RAD15_WIN10 = "_data/5932408047/rad15/win10"
+RAD15_ORIGINAL = "_data/5932408047/rad15/original_files"
+
+# Checklist (key, label); the port label is filled in from setup data
+CHECKLIST_ITEMS = [
+    ("chklst_privateNet", "Set Network Profile to Private"),
+    ("chklst_staticIP", "Create a Static LAN IP for This Machine"),
+    ("chklst_portFwd", "Forward Ports {ports} (TCP + UDP)"),
+    ("chklst_unifiAllowP2P", "Allow P2P traffic to reach your server"),
+    ("chklst_usedNewConfig", "Log In with New Client Config"),
+    ("chklst_hasMonitorScript", "Download Server Monitoring Script"),
+]
+
+SERVICE_HOST = "g.echovrce.com:80"
+
+# A fresh setup.json; filePath is filled in with the install folder on load
+DEFAULT_SETUP = {
+    "isPatched": False,
+    "isConfigured": False,
+    "checkCGNAT": "Fail",
+    "hasUnifi": False,
+    "numInstances": "",
+    "lowerPort": 6792,
+    "upperPort": 6793,
+    "chklst_privateNet": False,
+    "chklst_staticIP": False,
+    "chklst_portFwd": False,
+    "chklst_unifiAllowP2P": False,
+    "chklst_usedNewConfig": False,
+    "chklst_hasMonitorScript": False
+}
+
+
+def _migrate_defaults(data):
+    """v1: fills in keys that older setup.json files (and new installs) don't have."""
+    for key, value in DEFAULT_SETUP.items():
+        data.setdefault(key, value)
+
+
+# setup.json schema upgrades, oldest first (see SetupStore)
+SETUP_MIGRATIONS = [_migrate_defaults]
+
+
+class SetupError(Exception):
+    pass
+
+
+def hidden_startupinfo():
+    """STARTUPINFO that hides console windows on Windows; None elsewhere."""
+    if os.name != "nt":
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return startupinfo
+
+
+def parse_serverdb_host(serverdb_url):
+    """Splits a serverdb_host URL back into the fields the configure form edits."""
+    fields = {"discord_id": "", "password": "", "regions": "", "serveraddr": "", "extra_args": ""}
+    if "?" not in serverdb_url:
+        return fields
+
+    _, query = serverdb_url.split("?", 1)
+    remaining_params = []
+    for p in query.split("&"):
+        if p.startswith("discordid="): fields["discord_id"] = p.split("=", 1)[1]
+        elif p.startswith("password="): fields["password"] = p.split("=", 1)[1]
+        elif p.startswith("regions="): fields["regions"] = p.split("=", 1)[1]
+        elif p.startswith("serveraddr="): fields["serveraddr"] = p.split("=", 1)[1]
+        else: remaining_params.append(p)
+    if remaining_params: fields["extra_args"] = "&" + "&".join(remaining_params)
+    return fields
+
+
+def build_server_config(discord_id, password, regions="", serveraddr="", extra_args=""):
+    base_serverdb = f"ws://{SERVICE_HOST}/serverdb?discordid={discord_id}&password={password}"
+    if regions: base_serverdb += f"&regions={regions}"
+    if serveraddr: base_serverdb += f"&serveraddr={serveraddr}"
+    if extra_args: base_serverdb += f"{extra_args}"
+
+    return {
+        "apiservice_host": f"http://{SERVICE_HOST}/api",
+        "configservice_host": f"ws://{SERVICE_HOST}/config",
+        "loginservice_host": f"ws://{SERVICE_HOST}/login?discordid={discord_id}&password={password}",
+        "matchingservice_host": f"ws://{SERVICE_HOST}/matching",
+        "serverdb_host": base_serverdb,
+        "transactionservice_host": f"ws://{SERVICE_HOST}/transaction",
+        "publisher_lock": "echovrce"
+    }
+
+
+class SetupCore:
+    """
+    Everything the setup tool does that doesn't need a window: setup.json state,
+    network/patch checks, patching and config generation. The GUI and CLI both drive this.
+    """
+
+    def __init__(self, root_dir=None, http_cache=None):
+        self.root_dir = root_dir or os.getcwd()
+        self.dashboard_dir = os.path.join(self.root_dir, "dashboard")
+        self.setup_json = os.path.join(self.dashboard_dir, "setup.json")
+        self.cache_dir = os.path.join(self.dashboard_dir, "cache")
+        self.temp_dir = os.path.join(self.dashboard_dir, "temp")
+        self.extract_manifest = os.path.join(self.dashboard_dir, "gunpatch_manifest.json")
+        self.patch_cache_dir = os.path.join(self.dashboard_dir, "patch_cache")
+        self.port_plan = os.path.join(self.dashboard_dir, "portplan.json")
+        self.ports_json = os.path.join(self.temp_dir, "ports.json")
+        self.bin_dir = os.path.join(self.root_dir, "bin", "win10")
+        self.config_local = os.path.join(self.root_dir, "_local", "config.json")
+        self.log_dir = os.path.join(self.root_dir, "_local", "r14logs")
+        self.log_index = os.path.join(self.dashboard_dir, "logindex.db")
+        self.trace_dir = os.path.join(self.dashboard_dir, "traces")
+        self.merkle_store = os.path.join(self.dashboard_dir, "merkle.json")
+
+        self.setup_data = SetupStore(self.setup_json, SETUP_MIGRATIONS)
+        self.integrity = IntegrityCache(lock=self.setup_data.lock)
+        self._http_cache = http_cache
+
+    @property
+    def http_cache(self):
+        if self._http_cache is None:
+            self._http_cache = HttpCache(self.cache_dir)
+        return self._http_cache
+
+    def is_echo_install(self):
+        return os.path.exists(os.path.join(self.bin_dir, "echovr.exe"))
+
+    # --- setup.json ---
+
+    def ensure_setup_exists(self):
+        os.makedirs(self.dashboard_dir, exist_ok=True)
+
+    def load_setup(self):
+        """Reads and migrates setup.json; only writes it back if something changed."""
+        self.setup_data.load()
+        self.setup_data.setdefault("filePath", self.root_dir)
+
+        # Cached file digests, keyed by path + size + mtime
+        self.integrity = IntegrityCache(self.setup_data.setdefault("integrityCache", {}), lock=self.setup_data.lock)
+        self.integrity.prune()
+        if self.integrity.dirty:
+            self.save_setup()
+
+    def save_setup(self):
+        """Queues a write; changes made within FLUSH_DELAY of each other land as one write."""
+        with self.setup_data.lock:
+            self.integrity.dirty = False
+            self.setup_data.mark_dirty()
+
+    def flush_setup(self):
+        """Writes pending changes now (before exit, or when another process needs to read them)."""
+        self.setup_data.flush()
+
+    def open(self):
+        """Creates/loads setup.json. Call once before anything else."""
+        self.ensure_setup_exists()
+        self.load_setup()
+        return self
+
+    # --- Checks ---
+
+    def sync_file_path(self):
+        if self.setup_data["filePath"] != self.root_dir:
+            self.setup_data["filePath"] = self.root_dir
+            self.save_setup()
+
+    def has_monitor(self):
+        return os.path.exists(os.path.join(self.root_dir, MONITOR_EXE)) or \
+            os.path.exists(os.path.join(self.root_dir, MONITOR_SCRIPT))
+
+    def startup_probes(self):
+        """
+        The launch checks as independent probes. Each detect_* runs on its own thread;
+        the apply step writes setup_data and must run on the consuming thread.
+        """
+        probes = [
+            Probe("network", self.detect_network, 20, self._apply_network),
+            Probe("monitor", self.has_monitor, 2, self._apply_monitor),
+        ]
+        if not self.setup_data["isPatched"]:
+            probes.append(Probe("patch", self.detect_patch, 60, self._setter("isPatched")))
+        return probes
+
+    def _setter(self, key):
+        def apply(value):
+            self.setup_data[key] = value
+        return apply
+
+    def _apply_monitor(self, found):
+        if found:
+            self.setup_data["chklst_hasMonitorScript"] = True
+
+    def startup_checks(self):
+        """Runs every launch check concurrently and saves setup.json once at the end."""
+        self.sync_file_path()
+        for probe, result in ProbeRunner(self.startup_probes()).run():
+            if result.ok and probe.apply:
+                probe.apply(result.value)
+        self.save_setup()
+
+    def record_startup_timings(self, marks, probe_results):
+        """Keeps the latest startup timings (and a short first-paint history) in setup.json."""
+        timings = {"marks": dict(marks), "probes": {}}
+        for result in probe_results:
+            timings["probes"][result.name] = "timeout" if result.timed_out else round(result.elapsed * 1000, 1)
+        self.setup_data["startupTimings"] = timings
+        if "first_paint" in marks:
+            history = self.setup_data.get("firstPaintHistory", [])[-19:]
+            self.setup_data["firstPaintHistory"] = history + [marks["first_paint"]]
+
+    @property
+    def is_cgnat(self):
+        return self.setup_data.get("checkCGNAT") == "Pass"
+
+    def is_network_private(self):
+        """Silently checks if the current network profile is set to Private."""
+        try:
+            output = subprocess.check_output(
+                ["powershell", "-NoProfile", "-Command", "(Get-NetConnectionProfile).NetworkCategory"],
+                startupinfo=hidden_startupinfo(), text=True, timeout=5
+            ).strip()
+            return output.lower() == "private"
+        except Exception:
+            return False
+
+    def network_probe(self):
+        """The tracert replacement; wanIpReflector in setup.json can point the WAN IP lookup elsewhere."""
+        return NetworkProbe(HttpReflector(self.setup_data.get("wanIpReflector", URL_IPIFY)))
+
+    def detect_network(self):
+        """hasUnifi/checkCGNAT for the current network, reused from setup.json until the gateway or WAN IP changes."""
+        return self.network_probe().check(self.setup_data.get("netProbe"))
+
+    def _apply_network(self, entry):
+        self.setup_data["netProbe"] = entry
+        self.setup_data["hasUnifi"] = entry["hasUnifi"]
+        self.setup_data["checkCGNAT"] = entry["checkCGNAT"]
+
+    def check_network(self):
+        self._apply_network(self.detect_network())
+        self.save_setup()
+
+    def detect_patch(self):
+        path_dbg = os.path.join(self.bin_dir, "dbgcore.dll")
+        path_pns = os.path.join(self.bin_dir, "pnsradgameserver.dll")
+        path_gun = os.path.join(self.root_dir, "combatGunPatchFiles")
+
+        is_patched = True
+        if not os.path.exists(path_gun):
+            is_patched = False
+        else:
+            if not self.verify_hash(path_dbg, HASH_DBGCORE, HASH_DBGCORE_SHA256) or \
+               not self.verify_hash(path_pns, HASH_PNSRAD, HASH_PNSRAD_SHA256):
+                is_patched = False
+        # Only changed package files (plus a small rotating sample of chunks) are re-hashed,
+        # so this stays cheap once a baseline exists
+        if is_patched and os.path.exists(self.merkle_store):
+            report = self.game_data_verifier().verify([RAD15_WIN10], record_new=False)
+            if report["corrupt"] or report["missing"]:
+                is_patched = False
+        return is_patched
+
+    def game_data_verifier(self):
+        return TreeVerifier(self.root_dir, self.merkle_store)
+
+    def verify_game_data(self, full=False, progress=None):
+        """
+        Checks the rad15 package files against the Merkle trees recorded after the last patch
+        (files seen for the first time become the baseline). Unchanged files only get a
+        rotating spot-check of some chunks unless full. Returns the TreeVerifier.verify report.
+        """
+        report = self.game_data_verifier().verify([RAD15_WIN10, RAD15_ORIGINAL], full=full, progress=progress)
+        self.setup_data["gameDataCheck"] = {
+            "time": int(time.time()), "full": full, "seconds": report["seconds"],
+            "corrupt": sorted(report["corrupt"]), "missing": report["missing"],
+        }
+        self.save_setup()
+        return report
+
+    def check_patch_status(self):
+        is_patched = self.detect_patch()
+        self.setup_data["isPatched"] = is_patched
+        self.save_setup()
+        return is_patched
+
+    def verify_hash(self, filepath, *expected_hashes):
+        """Streams the file through MD5/SHA-256 once, then serves repeat checks from the integrity cache."""
+        try:
+            return self.integrity.verify(filepath, *expected_hashes)
+        except OSError:
+            return False
+
+    # --- Checklist ---
+
+    def checklist(self):
+        """The checklist items that apply to this host, as (key, label, done)."""
+        lower_port = self.setup_data.get('lowerPort', 6792)
+        upper_port = self.setup_data.get('upperPort', 6793)
+        ports = self.setup_data.get("portRanges") or f"{lower_port}-{upper_port}"
+        items = []
+        for key, label in CHECKLIST_ITEMS:
+            if key == "chklst_unifiAllowP2P" and not self.setup_data.get("hasUnifi", False):
+                continue
+            items.append((key, label.format(ports=ports), self.setup_data.get(key, False)))
+        return items
+
+    def is_ready(self):
+        all_checklist_complete = all(done for _, _, done in self.checklist())
+        return self.setup_data["isConfigured"] and self.setup_data["isPatched"] and all_checklist_complete
+
+    def complete_checklist_item(self, key):
+        self.setup_data[key] = True
+        self.save_setup()
+
+    # --- Patching ---
+
+    def run_patch_sequence(self, status=None, progress=None, downloads=None):
+        """
+        Downloads the DLLs and gun patch, extracts it and rebuilds rad15/win10.
+        status(text) receives stage names, progress(done, total) download bytes.
+        Every stage is timed into a Chrome trace under dashboard/traces (see last_patch_trace).
+        Returns the result of check_patch_status.
+        """
+        status = status or (lambda text: None)
+        temp_dir = self.temp_dir
+        tracer = Tracer("patch")
+        if self.setup_data.get("patchProfiler"):
+            tracer.start_profiler()
+        try:
+            try:
+                status("Downloading...")
+                if not os.path.exists(temp_dir): os.makedirs(temp_dir)
+
+                # DLLs and patch are fetched in parallel and hashed as they stream in
+                gunpatch_zip_path = os.path.join(temp_dir, "gunpatch.zip")
+                with tracer.span("dll_update") as span:
+                    # Current DLLs are left alone and outdated ones patched by delta where possible;
+                    # whatever is left is downloaded in full alongside the gun patch
+                    dll_report, dll_jobs = self.dll_updater().update()
+                    span.update(files={e["file"]: e["method"] for e in dll_report},
+                                bytes=sum(e["bytes"] or 0 for e in dll_report))
+
+                with tracer.span("download") as span:
+                    downloads = downloads or self.downloader(progress)
+                    gunpatch_job = DownloadJob(URL_GUNPATCH, gunpatch_zip_path, (HASH_GUNPATCH_SHA256,))
+                    jobs = downloads.download_all(dll_jobs + [gunpatch_job])
+                    for job in jobs:
+                        if job.digests: self.integrity.record(job.dest, job.digests)
+                    span.update(files=len(jobs), bytes=sum(tree_size(job.dest) for job in jobs))
+
+                status("Extracting Patch...")
+                with tracer.span("extract") as span:
+                    if os.path.exists(gunpatch_zip_path):
+                        # Only entries that changed on disk are rewritten
+                        written, skipped = extract_incremental(gunpatch_zip_path, self.root_dir, self.extract_manifest,
+                                                               prefix="combatGunPatchFiles/")
+                        span.update(written=written, skipped=skipped,
+                                    bytes=tree_size(os.path.join(self.root_dir, "combatGunPatchFiles")))
+
+                status("Getting Ready...")
+                data_dir = os.path.join(self.root_dir, "_data")
+                if not os.path.exists(data_dir):
+                    raise SetupError("Missing _data folder. Ensure you are in the correct directory.")
+                # win10 is torn down from here on; if this run dies partway the next launch re-detects
+                self.setup_data["isPatched"] = False
+                self.save_setup()
+                self.rebuild_packages(gunpatch_zip_path, status, tracer, progress)
+
+                status("Recording Game Data...")
+                with tracer.span("merkle_baseline") as span:
+                    # The fresh win10 output becomes the known-good state for later checks
+                    verifier = self.game_data_verifier()
+                    verifier.forget([RAD15_WIN10])
+                    report = verifier.verify([RAD15_WIN10, RAD15_ORIGINAL], progress=progress)
+                    span.update(files=report["checked"], bytes=report["bytes"], corrupt=sorted(report["corrupt"]))
+
+                status("Cleaning Up...")
+            finally:
+                with tracer.span("cleanup"):
+                    if os.path.exists(temp_dir):
+                        shutil.rmtree(temp_dir)
+                    if os.path.exists(os.path.join(self.root_dir, "patch.bat")):
+                        os.remove(os.path.join(self.root_dir, "patch.bat"))
+                    if os.path.exists(os.path.join(self.root_dir, "evrFileTools.exe")):
+                        os.remove(os.path.join(self.root_dir, "evrFileTools.exe"))
+
+            with tracer.span("verify"):
+                return self.check_patch_status()
+        finally:
+            self._save_trace(tracer)
+
+    def downloader(self, progress=None):
+        """
+        artifactSources in setup.json (mirror base URLs or local folders laid out like this repo)
+        are raced against GitHub for every repo artifact; without it, GitHub via the HTTP cache.
+        """
+        sources = self.setup_data.get("artifactSources")
+        if sources:
+            return MultiSourceFetcher(sources, progress=progress)
+        return DownloadManager(progress=progress, cache=self.http_cache)
+
+    def dll_updater(self, pins=None):
+        """
+        dllManifest in setup.json can point at another release manifest (e.g. a LAN mirror).
+        pins ({file name: {"md5": ..., "sha256": ...}}) replaces the built-in hashes of a DLL,
+        so a caller that knows of a newer build than this tool targets that build instead.
+        """
+        targets = [
+            DllTarget("dbgcore.dll", os.path.join(self.bin_dir, "dbgcore.dll"), URL_DBGCORE, HASH_DBGCORE, HASH_DBGCORE_SHA256),
+            DllTarget("pnsradgameserver.dll", os.path.join(self.bin_dir, "pnsradgameserver.dll"), URL_PNSRAD,
+                      HASH_PNSRAD, HASH_PNSRAD_SHA256),
+        ]
+        for target in targets:
+            pin = (pins or {}).get(target.name)
+            if pin:
+                target.md5, target.sha256 = pin.get("md5", "").upper(), pin.get("sha256", "").upper()
+        return DllUpdater(targets, self.setup_data.get("dllManifest", URL_DLL_MANIFEST), self.integrity, self.http_cache)
+
+    def update_dlls(self, downloads=None, pins=None):
+        """Brings both DLLs up to date (delta first, full download as fallback). Returns the per-file report."""
+        report = self.dll_updater(pins).run(downloads or self.downloader())
+        self.save_setup()
+        return report
+
+    def _save_trace(self, tracer):
+        """Writes the trace file and keeps a summary of the run in setup.json for the UI/CLI."""
+        try:
+            path = tracer.save(self.trace_dir)
+        except OSError:
+            path = None
+        self.setup_data["lastPatchTrace"] = {"file": path, "startedAt": tracer.started_at,
+                                             "seconds": tracer.seconds, "stages": tracer.stages}
+
+    @property
+    def last_patch_trace(self):
+        return self.setup_data.get("lastPatchTrace")
+
+    def rebuild_packages(self, gunpatch_zip_path, status, tracer=None, progress=None):
+        tracer = tracer or Tracer("patch")
+        rad_base = os.path.join(self.root_dir, "_data", "5932408047", "rad15")
+        path_win10 = os.path.join(rad_base, "win10")
+        path_orig = os.path.join(rad_base, "original_files")
+
+        with tracer.span("prepare_win10") as span:
+            if not os.path.exists(path_orig):
+                if os.path.exists(path_win10):
+                    os.rename(path_win10, path_orig)
+                    span["renamed"] = True
+
+            if os.path.exists(path_win10):
+                span["bytes"] = tree_size(path_win10)
+                shutil.rmtree(path_win10)
+
+            os.makedirs(os.path.join(path_win10, "packages"), exist_ok=True)
+            os.makedirs(os.path.join(path_win10, "manifests"), exist_ok=True)
+
+        # "link" hardlinks untouched files and reuses cached patch output, "copy" is the old behavior
+        rebuild_mode = self.setup_data.get("patchRebuildMode", "link")
+        status("Linking Files..." if rebuild_mode == "link" else "Copying Files...")
+        with tracer.span("place_kept", mode=rebuild_mode) as span:
+            for rel in (("manifests", KEPT_PACKAGE), ("packages", f"{KEPT_PACKAGE}_0")):
+                src = os.path.join(path_orig, *rel)
+                if os.path.exists(src):
+                    clone_path(src, os.path.join(path_win10, *rel), rebuild_mode)
+            untouched = set(list_files(path_win10))
+            span["bytes"] = tree_size(path_win10)
+
+        patch_dir = os.path.join(self.root_dir, "combatGunPatchFiles")
+        tool_args = ["-mode", "replace", "-packageName", PATCH_PACKAGE]
+        # "native" patches in-process (needs zstandard); "evrFileTools" always runs the bundled exe
+        backend = self.setup_data.get("patchBackend", "native")
+        native = backend == "native" and rad15.available()
+        # Cache entries are kept where they can be cloned; "patchCacheCopies" keeps full copies too
+        store = PatchOutputStore(self.patch_cache_dir, copies=self.setup_data.get("patchCacheCopies", False)) \
+            if rebuild_mode == "link" else None
+        cache_key = None
+
+        if store:
+            status("Checking Patch Cache...")
+            with tracer.span("patch_cache_key"):
+                pkg_dir = os.path.join(path_orig, "packages")
+                inputs = [os.path.join(path_orig, "manifests", PATCH_PACKAGE), patch_dir]
+                if os.path.isdir(pkg_dir):
+                    inputs += [os.path.join(pkg_dir, n) for n in sorted(os.listdir(pkg_dir)) if n.startswith(f"{PATCH_PACKAGE}_")]
+                cache_key = patch_cache_key(self.integrity, inputs, extra=" ".join(tool_args + (["native"] if native else [])))
+
+        restored = False
+        if store:
+            with tracer.span("patch_cache_restore") as span:
+                restored = store.restore(cache_key, path_win10)
+                span["hit"] = restored
+
+        if not restored:
+            status("Patching...")
+            returncode = None
+            if backend == "native" and not native:
+                with tracer.span("rad15_patch") as span:
+                    span["fallback"] = "zstandard is not installed"
+            if native:
+                with tracer.span("rad15_patch") as span:
+                    try:
+                        span.update(rad15.replace_files(path_orig, patch_dir, path_win10, PATCH_PACKAGE,
+                                                        mode=rebuild_mode, progress=progress))
+                        returncode = 0
+                    except (rad15.Rad15Error, OSError) as e:
+                        # Anything the reader doesn't understand is left to evrFileTools; replace_files
+                        # has already removed its partial output, so the exe starts from a clean win10
+                        span["fallback"] = str(e)
+
+            if returncode is None:
+                with tracer.span("evrFileTools") as span:
+                    tool_path = extract_member(gunpatch_zip_path, "evrFileTools.exe", self.root_dir)
+                    args = [
+                        tool_path, *tool_args,
+                        "-dataDir", path_orig + os.sep, "-inputDir", patch_dir,
+                        "-outputDir", path_win10 + os.sep, "-ignoreOutputRestrictions"
+                    ]
+                    returncode = subprocess.call(args, startupinfo=hidden_startupinfo())
+                    span.update(returncode=returncode, bytes=tree_size(path_win10) - sum(
+                        tree_size(os.path.join(path_win10, *rel.split("/"))) for rel in untouched))
+                if native and store:
+                    cache_key = patch_cache_key(self.integrity, inputs, extra=" ".join(tool_args))
+
+            if returncode == 0 and store:
+                with tracer.span("patch_cache_ingest"):
+                    store.ingest(cache_key, path_win10, exclude=untouched)
+
+    # --- Config ---
+
+    def read_server_config(self):
+        """Fields of the current _local/config.json, as parse_serverdb_host returns them."""
+        if os.path.exists(self.config_local):
+            try:
+                with open(self.config_local, 'r') as f:
+                    existing_conf = json.load(f)
+                return parse_serverdb_host(existing_conf.get("serverdb_host", ""))
+            except Exception:
+                pass
+        return parse_serverdb_host("")
+
+    def configure(self, discord_id, password, num_instances, lower_port=6792, regions="", serveraddr="", extra_args="",
+                  reserved=frozenset()):
+        """
+        Writes _local/config.json, plans a free GS/API pair per instance and saves it to
+        dashboard/portplan.json. Ports in reserved (planned for other installs on this machine)
+        are treated as taken; ports this install's own instances hold are not (see own_ports).
+        Raises SetupError on missing fields or too few free ports.
+        """
+        if not discord_id or not password or not num_instances:
+            raise SetupError("Missing required fields.")
+
+        own = self.own_ports()
+        try:
+            pairs = plan_ports(num_instances, lower_port,
+                               lambda ports: (occupied_ports(ports) - own) | (set(ports) & reserved))
+        except PortPlanError as e:
+            raise SetupError(str(e))
+        ranges = format_ranges(port_ranges(pairs))
+
+        new_config = build_server_config(discord_id, password, regions, serveraddr, extra_args)
+        if not os.path.exists(os.path.dirname(self.config_local)): os.makedirs(os.path.dirname(self.config_local))
+        with open(self.config_local, 'w') as f: json.dump(new_config, f, indent=4)
+
+        save_plan(self.port_plan, pairs, lower_port)
+
+        # Forwarding only needs redoing if the ports themselves moved
+        current_ranges = self.setup_data.get("portRanges") or \
+            f"{self.setup_data.get('lowerPort', 6792)}-{self.setup_data.get('upperPort', 6793)}"
+        if current_ranges != ranges:
+            self.setup_data["chklst_portFwd"] = False
+
+        self.setup_data["numInstances"] = num_instances
+        self.setup_data["lowerPort"] = pairs[0][0]
+        self.setup_data["upperPort"] = pairs[-1][1]
+        self.setup_data["portRanges"] = ranges
+        self.setup_data["isConfigured"] = True
+        self.save_setup()
+        return pairs
+
+    def own_ports(self):
+        """
+        Ports planned for this install (portplan.json) or held by its running instances (the
+        monitor's/supervisor's ports.json). They look taken while the servers run, but
+        reconfiguring shouldn't move the instances off them.
+        """
+        return {port for path in (self.port_plan, self.ports_json) for pair in load_plan(path) for port in pair}
+
+    def write_client_config(self, target):
+        """Client copy of the server config: same services, serverdb without server-only params."""
+        with open(self.config_local, 'r') as f: data = json.load(f)
+        fields = parse_serverdb_host(data.get("serverdb_host", ""))
+        data["serverdb_host"] = f"ws://{SERVICE_HOST}/serverdb?discordid={fields['discord_id']}&password={fields['password']}"
+        with open(target, 'w') as f: json.dump(data, f, indent=4)
+        return target
+
+    # --- Monitor ---
+
+    def download_monitor(self, filename):
+        """Fetches the monitor from the latest GitHub release into the echo folder. Returns its path."""
+        target_path = os.path.join(self.root_dir, filename)
+        # Revalidated against the cached copy; 304s don't count toward GitHub's rate limit
+        data = json.loads(self.http_cache.get(GITHUB_API_LATEST, timeout=5).decode())
+
+        download_url = None
+        for asset in data.get("assets", []):
+            if asset["name"].lower() == filename.lower():
+                download_url = asset["browser_download_url"]
+                break
+
+        if not download_url:
+            raise SetupError(f"Could not find '{filename}' in the latest GitHub release.")
+
+        DownloadManager(cache=self.http_cache).download(download_url, target_path)
+        if not os.path.exists(target_path):
+            raise SetupError("Download appeared to finish but file is missing.")
+
+        self.setup_data["chklst_hasMonitorScript"] = True
+        self.save_setup()
+        return target_path
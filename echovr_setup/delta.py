@@ -0,0 +1,159 @@
+"""
+Binary deltas between two versions of a file. A delta is a list of COPY (range of the
+old file) and ADD (literal bytes) operations, xz-compressed, behind a header naming the
+exact source and target by size and SHA-256 so it can't be applied to the wrong file.
+
+    magic | source size, sha256 | target size, sha256 | xz(ops)
+    op:    b"C" offset length   |   b"A" length bytes
+"""
+import hashlib
+import lzma
+import mmap
+import os
+import struct
+
+MAGIC = b"EVRDELTA1\n"
+HEADER = struct.Struct("<Q32sQ32s")
+COPY = struct.Struct("<cQQ")
+ADD = struct.Struct("<cQ")
+# Matching granularity: blocks of the old file are indexed at this stride
+BLOCK = 32
+# Matches are extended a slice at a time before falling back to single bytes
+EXTEND_STEP = 4096
+
+
+class DeltaError(Exception):
+    pass
+
+
+def _extend(target, t, source, s):
+    """Length of the common run of target[t:] and source[s:]."""
+    start = t
+    n, m = len(target), len(source)
+    while t + EXTEND_STEP <= n and s + EXTEND_STEP <= m and target[t:t + EXTEND_STEP] == source[s:s + EXTEND_STEP]:
+        t += EXTEND_STEP
+        s += EXTEND_STEP
+    while t < n and s < m and target[t] == source[s]:
+        t += 1
+        s += 1
+    return t - start
+
+
+def diff(source, target, block=BLOCK):
+    """COPY/ADD operations that turn source into target, as ("C", offset, length) / ("A", data)."""
+    index = {}
+    for off in range(0, len(source) - block + 1, block):
+        index.setdefault(source[off:off + block], off)
+
+    ops = []
+    literal_start = i = 0
+    n = len(target)
+    while i + block <= n:
+        off = index.get(target[i:i + block])
+        if off is None:
+            i += 1
+            continue
+        # Grow the match back into the pending literal, then forward as far as it goes
+        start = i
+        while start > literal_start and off > 0 and target[start - 1] == source[off - 1]:
+            start -= 1
+            off -= 1
+        length = _extend(target, start, source, off)
+        if start > literal_start:
+            ops.append(("A", target[literal_start:start]))
+        if ops and ops[-1][0] == "C" and ops[-1][1] + ops[-1][2] == off:
+            ops[-1] = ("C", ops[-1][1], ops[-1][2] + length)
+        else:
+            ops.append(("C", off, length))
+        i = literal_start = start + length
+    if literal_start < n:
+        ops.append(("A", target[literal_start:]))
+    return ops
+
+
+def make_delta(source, target, block=BLOCK):
+    """Encoded delta from source bytes to target bytes."""
+    body = bytearray()
+    for op in diff(source, target, block):
+        if op[0] == "C":
+            body += COPY.pack(b"C", op[1], op[2])
+        else:
+            body += ADD.pack(b"A", len(op[1]))
+            body += op[1]
+    header = HEADER.pack(len(source), hashlib.sha256(source).digest(), len(target), hashlib.sha256(target).digest())
+    return MAGIC + header + lzma.compress(bytes(body), preset=9 | lzma.PRESET_EXTREME)
+
+
+def read_header(delta):
+    """(source size, source sha256 hex, target size, target sha256 hex)."""
+    if not delta.startswith(MAGIC) or len(delta) < len(MAGIC) + HEADER.size:
+        raise DeltaError("Not a delta file")
+    source_size, source_hash, target_size, target_hash = HEADER.unpack_from(delta, len(MAGIC))
+    return source_size, source_hash.hex().upper(), target_size, target_hash.hex().upper()
+
+
+def apply_delta(source_path, delta, out_path):
+    """
+    Rebuilds the target from source_path (memory-mapped) into out_path, checking the source
+    before and the target SHA-256 after. out_path is only replaced once the result verifies.
+    """
+    source_size, source_hash, target_size, target_hash = read_header(delta)
+    try:
+        body = lzma.decompress(delta[len(MAGIC) + HEADER.size:])
+    except lzma.LZMAError as e:
+        raise DeltaError(f"Corrupt delta: {e}")
+
+    tmp_path = out_path + ".delta.tmp"
+    with open(source_path, "rb") as src:
+        if os.fstat(src.fileno()).st_size != source_size:
+            raise DeltaError("Delta is for a different source file")
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if source_size else _Empty() as view:
+            if hashlib.sha256(view).hexdigest().upper() != source_hash:
+                raise DeltaError("Delta is for a different source file")
+
+            hasher = hashlib.sha256()
+            written = pos = 0
+            try:
+                with open(tmp_path, "wb") as out:
+                    while pos < len(body):
+                        kind = body[pos:pos + 1]
+                        if kind == b"C":
+                            _, offset, length = COPY.unpack_from(body, pos)
+                            pos += COPY.size
+                            if offset + length > source_size:
+                                raise DeltaError("COPY past the end of the source")
+                            chunk = view[offset:offset + length]
+                        elif kind == b"A":
+                            _, length = ADD.unpack_from(body, pos)
+                            pos += ADD.size
+                            chunk = body[pos:pos + length]
+                            if len(chunk) != length:
+                                raise DeltaError("Truncated ADD")
+                            pos += length
+                        else:
+                            raise DeltaError("Unknown delta operation")
+                        out.write(chunk)
+                        hasher.update(chunk)
+                        written += len(chunk)
+                if written != target_size or hasher.hexdigest().upper() != target_hash:
+                    raise DeltaError("Patched file does not match the delta's target hash")
+            except BaseException as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if isinstance(e, struct.error):
+                    raise DeltaError("Truncated delta operation")
+                raise
+
+    # Swapped in after the source is unmapped; Windows won't replace a mapped file
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class _Empty(bytes):
+    """mmap can't map an empty file; an empty bytes object stands in."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
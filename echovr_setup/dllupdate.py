@@ -0,0 +1,186 @@
+"""
+Delta updates for the server DLLs. A release manifest next to the DLLs lists each file's
+hashes and the deltas available from earlier builds:
+
+    {"version": 1, "files": {"dbgcore.dll": {"size": ..., "md5": ..., "sha256": ...,
+        "deltas": {"<installed sha256>": {"path": "deltas/dbgcore.dll/<hash>.evrdelta", "size": ..., "sha256": ...}}}}}
+
+The updater only trusts a manifest entry whose hashes match the ones the target is pinned
+to, so a stale or tampered manifest can at worst cost a full download. The pins are the
+tool's own unless the caller passes newer ones (the monitor passes its hashes to
+update-dlls), and a pin may be MD5 or SHA-256 alone.
+"""
+import hashlib
+import json
+import os
+import urllib.parse
+import urllib.request
+
+from echovr_setup.delta import DeltaError, apply_delta, make_delta, read_header
+from echovr_setup.downloads import DownloadError, DownloadJob, DownloadManager
+
+MANIFEST_NAME = "manifest.json"
+DELTA_DIR = "deltas"
+DELTA_SUFFIX = ".evrdelta"
+
+
+class DllTarget:
+    """A pinned DLL: where it lives, its full-download URL and expected hashes ("" if not pinned)."""
+
+    def __init__(self, name, path, url, md5, sha256):
+        self.name = name
+        self.path = path
+        self.url = url
+        self.md5 = (md5 or "").upper()
+        self.sha256 = (sha256 or "").upper()
+
+    @property
+    def hashes(self):
+        return tuple(h for h in (self.md5, self.sha256) if h)
+
+    def matches(self, entry):
+        """True if a manifest entry has every hash this target is pinned to."""
+        return bool(self.hashes) and all(entry.get(algorithm, "").upper() == pin
+                                         for algorithm, pin in (("md5", self.md5), ("sha256", self.sha256)) if pin)
+
+    def full_job(self):
+        return DownloadJob(self.url, self.path, self.hashes)
+
+
+class DllUpdater:
+    """
+    Brings each target up to date with the least transfer: nothing if it already matches,
+    the delta from the installed build if the manifest has one, otherwise a full download.
+    """
+
+    def __init__(self, targets, manifest_url, integrity, http_cache=None, timeout=10):
+        self.targets = list(targets)
+        self.manifest_url = manifest_url
+        self.integrity = integrity
+        self.http_cache = http_cache
+        self.timeout = timeout
+
+    def load_manifest(self):
+        """The release manifest, or None if it can't be fetched or read."""
+        try:
+            if self.http_cache:
+                data = self.http_cache.get(self.manifest_url, timeout=self.timeout)
+            else:
+                with urllib.request.urlopen(self.manifest_url, timeout=self.timeout) as resp:
+                    data = resp.read()
+            manifest = json.loads(data.decode())
+            return manifest if isinstance(manifest.get("files"), dict) else None
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def installed_sha256(self, target):
+        try:
+            return self.integrity.digests(target.path, ("sha256",))["sha256"]
+        except OSError:
+            return None
+
+    def apply(self, target, entry, installed):
+        """Fetches and applies the delta from installed to target. Returns bytes transferred."""
+        delta_info = entry.get("deltas", {}).get(installed)
+        if not delta_info:
+            raise DeltaError("No delta from the installed build")
+        # A pin without a SHA-256 takes it from the entry, which matched the pins it does have
+        expected = target.sha256 or entry["sha256"].upper()
+        delta_url = urllib.parse.urljoin(self.manifest_url, delta_info["path"])
+        delta_path = target.path + DELTA_SUFFIX
+        try:
+            DownloadManager(cache=self.http_cache, timeout=self.timeout).download(
+                delta_url, delta_path, (delta_info["sha256"],))
+            with open(delta_path, "rb") as f:
+                delta = f.read()
+        finally:
+            if os.path.exists(delta_path):
+                os.remove(delta_path)
+        if read_header(delta)[3] != expected:
+            raise DeltaError("Delta builds a different DLL than the pinned one")
+        apply_delta(target.path, delta, target.path)
+        if not self.integrity.verify(target.path, *target.hashes):
+            raise DeltaError("Patched DLL failed verification")
+        return len(delta)
+
+    def update(self):
+        """
+        Applies what it can in place. Returns (report, jobs): a report entry per target and the
+        full-download DownloadJobs still needed, so callers can batch them with other downloads.
+        """
+        manifest = self.load_manifest()
+        report, jobs = [], []
+        for target in self.targets:
+            if self.integrity.verify(target.path, *target.hashes):
+                report.append({"file": target.name, "method": "current", "bytes": 0})
+                continue
+
+            installed = self.installed_sha256(target)
+            entry = (manifest or {}).get("files", {}).get(target.name) or {}
+            pinned = target.matches(entry)
+            if installed and pinned:
+                try:
+                    report.append({"file": target.name, "method": "delta", "bytes": self.apply(target, entry, installed)})
+                    continue
+                except (DeltaError, DownloadError, OSError, KeyError) as e:
+                    reason = str(e)
+            else:
+                reason = "no manifest entry for this build" if not pinned else "not installed"
+            report.append({"file": target.name, "method": "full", "bytes": None, "reason": reason})
+            jobs.append(target.full_job())
+        return report, jobs
+
+    def run(self, downloads=None):
+        """update(), then the full downloads. Returns the report with their sizes filled in."""
+        report, jobs = self.update()
+        if jobs:
+            for job in (downloads or DownloadManager(cache=self.http_cache)).download_all(jobs):
+                if job.digests:
+                    self.integrity.record(job.dest, job.digests)
+            sizes = {job.dest: os.path.getsize(job.dest) for job in jobs}
+            for entry, target in zip(report, self.targets):
+                if entry["method"] == "full":
+                    entry["bytes"] = sizes.get(target.path)
+        return report
+
+
+def _digests(path):
+    md5, sha256 = hashlib.md5(), hashlib.sha256()
+    with open(path, "rb") as f:
+        data = f.read()
+    md5.update(data)
+    sha256.update(data)
+    return data, md5.hexdigest().upper(), sha256.hexdigest().upper()
+
+
+def build_release(dll_dir, previous_dirs, out_dir=None):
+    """
+    Maintainer side: writes manifest.json and deltas/ for every DLL in dll_dir, with a delta
+    from each differing copy of it in previous_dirs (earlier releases). Returns the manifest.
+    """
+    out_dir = out_dir or dll_dir
+    manifest = {"version": 1, "files": {}}
+    for name in sorted(n for n in os.listdir(dll_dir) if n.lower().endswith(".dll")):
+        data, md5, sha256 = _digests(os.path.join(dll_dir, name))
+        entry = {"size": len(data), "md5": md5, "sha256": sha256, "deltas": {}}
+        for previous in previous_dirs:
+            old_path = os.path.join(previous, name)
+            if not os.path.exists(old_path):
+                continue
+            old, _, old_sha256 = _digests(old_path)
+            if old_sha256 == sha256 or old_sha256 in entry["deltas"]:
+                continue
+            delta = make_delta(old, data)
+            rel = f"{DELTA_DIR}/{name}/{old_sha256[:16]}{DELTA_SUFFIX}"
+            path = os.path.join(out_dir, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(delta)
+            entry["deltas"][old_sha256] = {"path": rel, "size": len(delta),
+                                           "sha256": hashlib.sha256(delta).hexdigest().upper()}
+        manifest["files"][name] = entry
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
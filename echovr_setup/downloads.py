@@ -0,0 +1,211 @@
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from echovr_setup.integrity import algorithm_for
+
+USER_AGENT = "Mozilla/5.0"
+CHUNK_SIZE = 256 * 1024
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadJob:
+    """One file to fetch. expected_hashes may hold MD5 and/or SHA-256 hex digests."""
+
+    def __init__(self, url, dest, expected_hashes=()):
+        self.url = url
+        self.dest = dest
+        self.expected_hashes = tuple(h for h in expected_hashes if h)
+        self.total = 0
+        self.done = 0
+        self.digests = {}
+
+    @property
+    def part_path(self):
+        return self.dest + ".part"
+
+    @property
+    def meta_path(self):
+        return self.dest + ".part.json"
+
+
+class DownloadManager:
+    """
+    Fetches files on a bounded thread pool. Partial files are kept as <dest>.part and
+    resumed with HTTP Range (guarded by If-Range) after a dropped connection. Expected
+    hashes are computed while streaming, so a finished job needs no second read.
+    With an HttpCache attached, fresh downloads are revalidated and a 304 is served from disk.
+    """
+
+    def __init__(self, max_workers=3, retries=3, timeout=15, progress=None, chunk_size=CHUNK_SIZE, cache=None):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._jobs = []
+
+    def download(self, url, dest, expected_hashes=()):
+        return self.download_all([DownloadJob(url, dest, expected_hashes)])[0]
+
+    def download_all(self, jobs):
+        """Runs every job, then raises the first failure (if any) once all have settled."""
+        self._jobs = list(jobs)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            futures = [pool.submit(self._run, job) for job in self._jobs]
+        for f in futures:
+            f.result()
+        return self._jobs
+
+    # --- Internals ---
+
+    def _report(self):
+        if not self.progress:
+            return
+        with self._lock:
+            done = sum(j.done for j in self._jobs)
+            total = sum(j.total for j in self._jobs) if all(j.total for j in self._jobs) else 0
+        self.progress(done, total)
+
+    def _run(self, job):
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(min(2 ** (attempt - 1), 8))
+            try:
+                self._fetch(job)
+                return job
+            except urllib.error.HTTPError as e:
+                # Client errors will not fix themselves
+                if 400 <= e.code < 500 and e.code not in (408, 416, 429):
+                    raise DownloadError(f"{job.url}: {e.code} {e.reason}") from e
+                if e.code == 416:
+                    self._discard_partial(job)
+                last_error = e
+            except DownloadError as e:
+                self._discard_partial(job)
+                if self.cache:
+                    self.cache.forget(job.url)
+                last_error = e
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                last_error = e
+        raise DownloadError(f"Failed to download {job.url}: {last_error}")
+
+    def _discard_partial(self, job):
+        for path in (job.part_path, job.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _fetch(self, job):
+        algorithms = tuple(algorithm_for(h) for h in job.expected_hashes)
+        hashers = {a: hashlib.new(a) for a in algorithms}
+
+        offset = os.path.getsize(job.part_path) if os.path.exists(job.part_path) else 0
+        validator = None
+        if offset and os.path.exists(job.meta_path):
+            try:
+                with open(job.meta_path, "r") as f:
+                    meta = json.load(f)
+                if meta.get("url") == job.url:
+                    validator = meta.get("validator")
+            except (OSError, ValueError):
+                pass
+        if not validator:
+            offset = 0
+
+        headers = {"User-Agent": USER_AGENT}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        elif self.cache:
+            headers.update(self.cache.conditional_headers(job.url))
+
+        req = urllib.request.Request(job.url, headers=headers)
+        try:
+            resp = urllib.request.urlopen(req, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            cached = self.cache.lookup(job.url) if self.cache else None
+            if e.code != 304 or not cached:
+                raise
+            e.close()
+            self.cache.touch(job.url)
+            self._copy_cached(job, cached, hashers)
+            return self._finish(job, algorithms, hashers)
+
+        with resp:
+            resumed = offset and resp.status == 206 and \
+                resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-")
+            if not resumed:
+                offset = 0
+
+            length = resp.headers.get("Content-Length")
+            job.total = offset + int(length) if length else 0
+            job.done = offset
+
+            os.makedirs(os.path.dirname(job.dest) or ".", exist_ok=True)
+            validator = resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+            if validator:
+                with open(job.meta_path, "w") as f:
+                    json.dump({"url": job.url, "validator": validator}, f)
+
+            # Catch the hashers up on bytes kept from an earlier attempt
+            if resumed and hashers:
+                with open(job.part_path, "rb") as f:
+                    while True:
+                        chunk = f.read(self.chunk_size)
+                        if not chunk:
+                            break
+                        for h in hashers.values():
+                            h.update(chunk)
+
+            self._report()
+            with open(job.part_path, "ab" if resumed else "wb") as out:
+                self._pump(job, resp, out, hashers)
+
+        if job.total and job.done != job.total:
+            raise OSError(f"Connection closed after {job.done} of {job.total} bytes")
+
+        self._finish(job, algorithms, hashers)
+        if self.cache:
+            self.cache.store_file(job.url, job.dest, resp.headers)
+        return job
+
+    def _pump(self, job, src, out, hashers):
+        while True:
+            chunk = src.read(self.chunk_size)
+            if not chunk:
+                break
+            out.write(chunk)
+            for h in hashers.values():
+                h.update(chunk)
+            job.done += len(chunk)
+            self._report()
+
+    def _copy_cached(self, job, cached, hashers):
+        job.total = os.path.getsize(cached)
+        job.done = 0
+        os.makedirs(os.path.dirname(job.dest) or ".", exist_ok=True)
+        with open(cached, "rb") as src, open(job.part_path, "wb") as out:
+            self._pump(job, src, out, hashers)
+
+    def _finish(self, job, algorithms, hashers):
+        job.digests = {a: h.hexdigest().upper() for a, h in hashers.items()}
+        for a, expected in zip(algorithms, job.expected_hashes):
+            if job.digests[a] != expected.upper():
+                raise DownloadError(f"{os.path.basename(job.dest)}: {a.upper()} mismatch")
+
+        os.replace(job.part_path, job.dest)
+        if os.path.exists(job.meta_path):
+            os.remove(job.meta_path)
+        return job
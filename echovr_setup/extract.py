@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+import zipfile
+import zlib
+
+from echovr_setup.integrity import CHUNK_SIZE, hash_file
+
+
+def crc32_file(filepath, chunk_size=CHUNK_SIZE):
+    crc = 0
+    with open(filepath, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+    return crc & 0xFFFFFFFF
+
+
+def _target_path(dest_dir, name):
+    """Resolves a zip member under dest_dir, refusing entries that escape it."""
+    root = os.path.abspath(dest_dir)
+    target = os.path.abspath(os.path.join(root, *name.split("/")))
+    if os.path.commonpath([root, target]) != root:
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return target
+
+
+def _write_member(zf, info, target):
+    """Streams one member to a temp file beside the target, then swaps it into place."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + ".extracting"
+    with zf.open(info) as src, open(tmp, "wb") as out:
+        shutil.copyfileobj(src, out, CHUNK_SIZE)
+    os.replace(tmp, target)
+
+
+def _load_manifest(manifest_path):
+    try:
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest_path, manifest):
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp, manifest_path)
+
+
+def _on_disk_matches(target, info, recorded):
+    """Cheap stat check against the manifest first, CRC32 of the file only when that is inconclusive."""
+    try:
+        st = os.stat(target)
+    except OSError:
+        return False
+    if st.st_size != info.file_size:
+        return False
+    if recorded and recorded.get("crc") == info.CRC and recorded.get("size") == st.st_size \
+            and recorded.get("mtime") == st.st_mtime_ns:
+        return True
+    return crc32_file(target) == info.CRC
+
+
+def extract_incremental(zip_path, dest_dir, manifest_path, prefix="", progress=None):
+    """
+    Extracts the members of zip_path under prefix into dest_dir, writing only entries that
+    are missing or whose size/CRC32 differ from what is on disk. A manifest records the
+    archive hash and per-entry stat so an unchanged archive skips the stage entirely.
+    Returns (written, skipped) member counts.
+    """
+    archive_hash = hash_file(zip_path, ("sha256",))["sha256"]
+    manifest = _load_manifest(manifest_path)
+    recorded_entries = manifest.get("entries", {}) if manifest.get("prefix", "") == prefix else {}
+
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        members = [i for i in zf.infolist() if not i.is_dir() and i.filename.startswith(prefix)]
+
+        if manifest.get("archive") == archive_hash and recorded_entries:
+            fast = True
+            for info in members:
+                rec = recorded_entries.get(info.filename)
+                try:
+                    st = os.stat(_target_path(dest_dir, info.filename))
+                except OSError:
+                    fast = False
+                    break
+                if not rec or rec.get("size") != st.st_size or rec.get("mtime") != st.st_mtime_ns:
+                    fast = False
+                    break
+            if fast:
+                return 0, len(members)
+
+        written = skipped = 0
+        entries = {}
+        for n, info in enumerate(members, 1):
+            target = _target_path(dest_dir, info.filename)
+            if _on_disk_matches(target, info, recorded_entries.get(info.filename)):
+                skipped += 1
+            else:
+                _write_member(zf, info, target)
+                written += 1
+            st = os.stat(target)
+            entries[info.filename] = {"crc": info.CRC, "size": st.st_size, "mtime": st.st_mtime_ns}
+            if progress:
+                progress(n, len(members))
+
+    # Remove files we extracted last time that the new archive no longer ships
+    for name in set(recorded_entries) - set(entries):
+        try:
+            os.remove(_target_path(dest_dir, name))
+        except (OSError, ValueError):
+            pass
+
+    _save_manifest(manifest_path, {"archive": archive_hash, "prefix": prefix, "entries": entries})
+    return written, skipped
+
+
+def extract_member(zip_path, name, dest_dir):
+    """Extracts a single member (e.g. evrFileTools.exe) atomically. Returns its path."""
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        info = zf.getinfo(name)
+        target = _target_path(dest_dir, info.filename)
+        if not _on_disk_matches(target, info, None):
+            _write_member(zf, info, target)
+    return target
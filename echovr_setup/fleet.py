@@ -0,0 +1,188 @@
+"""
+Batch setup for many installs: an inventory with one row per install root is configured
+and patched on a bounded pool, with the DLLs and gun patch downloaded once for the whole run.
+
+Inventory (CSV with a header row, or a JSON list of objects with the same keys):
+
+    root,discord_id,password,regions,serveraddr,base_port,instances
+    D:\\echo-a,123456789012345678,hunter2,us-east,,6792,4
+    D:\\echo-b,123456789012345678,hunter2,us-east,,6812,4
+"""
+import csv
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from echovr_setup.core import SetupCore, SetupError
+from echovr_setup.downloads import DownloadError, DownloadManager
+from echovr_setup.httpcache import HttpCache
+
+DEFAULT_PARALLEL = 4
+
+FIELDS = ("root", "discord_id", "password", "regions", "serveraddr", "base_port", "instances")
+
+InventoryRow = namedtuple("InventoryRow", FIELDS)
+
+
+def load_inventory(path):
+    """Reads and validates the inventory. Relative roots are taken from the inventory's folder."""
+    with open(path, "r", newline="") as f:
+        if path.lower().endswith(".json"):
+            records = json.load(f)
+        else:
+            records = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    rows = []
+    for line, record in enumerate(records, start=1):
+        record = {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in record.items() if k}
+        missing = [k for k in ("root", "discord_id", "password", "instances") if not record.get(k)]
+        if missing:
+            raise SetupError(f"Inventory row {line}: missing {', '.join(missing)}")
+        try:
+            rows.append(InventoryRow(
+                root=os.path.normpath(os.path.join(base_dir, record["root"])),
+                discord_id=str(record["discord_id"]),
+                password=str(record["password"]),
+                regions=record.get("regions") or "",
+                serveraddr=record.get("serveraddr") or "",
+                base_port=int(record.get("base_port") or 6792),
+                instances=int(record["instances"]),
+            ))
+        except ValueError as e:
+            raise SetupError(f"Inventory row {line}: {e}")
+
+    roots = [os.path.normcase(row.root) for row in rows]
+    duplicates = sorted({r for r in roots if roots.count(r) > 1})
+    if duplicates:
+        raise SetupError(f"Inventory lists the same install more than once: {', '.join(duplicates)}")
+    return rows
+
+
+class SharedDownloads:
+    """
+    Stands in for DownloadManager in run_patch_sequence. Each URL is fetched once per run into
+    the shared cache folder (and revalidated through the shared HttpCache on later runs);
+    every install then gets a local copy with the digests of the shared file.
+    mirror replaces the scheme/host/path of each URL, keeping the file name.
+    """
+
+    def __init__(self, cache_dir, mirror=None, http_cache=None):
+        self.files_dir = os.path.join(cache_dir, "artifacts")
+        self.http_cache = http_cache or HttpCache(os.path.join(cache_dir, "http"))
+        self.mirror = mirror
+        self.fetched = 0
+        self.copied = 0
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def source_url(self, url):
+        if not self.mirror:
+            return url
+        return f"{self.mirror.rstrip('/')}/{url.rsplit('/', 1)[-1]}"
+
+    def fetch(self, url, expected_hashes=()):
+        """The shared DownloadJob for url; concurrent callers wait on the first one's download."""
+        with self._lock:
+            future = self._futures.get(url)
+            owner = future is None
+            if owner:
+                future = self._futures[url] = Future()
+        if owner:
+            name = hashlib.sha1(url.encode()).hexdigest()[:12] + "_" + url.rsplit("/", 1)[-1]
+            try:
+                # One manager per fetch, since a DownloadManager tracks a single batch
+                job = DownloadManager(cache=self.http_cache).download(
+                    self.source_url(url), os.path.join(self.files_dir, name), expected_hashes)
+                with self._lock:
+                    self.fetched += 1
+                future.set_result(job)
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def download_all(self, jobs):
+        for job in jobs:
+            shared = self.fetch(job.url, job.expected_hashes)
+            os.makedirs(os.path.dirname(job.dest) or ".", exist_ok=True)
+            shutil.copyfile(shared.dest, job.part_path)
+            os.replace(job.part_path, job.dest)
+            job.digests = dict(shared.digests)
+            job.total = job.done = os.path.getsize(job.dest)
+            with self._lock:
+                self.copied += 1
+        return jobs
+
+
+class FleetProvisioner:
+    """
+    Configures (and optionally patches) every inventory row on up to parallel threads.
+    Port plans are made one install at a time so installs on the same machine never get
+    the same GS/API pair; downloads, extraction and the rebuild run concurrently.
+    """
+
+    def __init__(self, rows, cache_dir, parallel=DEFAULT_PARALLEL, patch=True, mirror=None, on_result=None):
+        self.rows = list(rows)
+        self.parallel = max(1, parallel)
+        self.patch = patch
+        self.downloads = SharedDownloads(cache_dir, mirror=mirror)
+        self.on_result = on_result
+        self._plan_lock = threading.Lock()
+        self._reserved = set()
+
+    def provision(self, row):
+        result = {"root": row.root, "ok": False, "configured": False, "patched": None,
+                  "ports": None, "ready": False, "seconds": 0.0, "error": None}
+        started = time.perf_counter()
+        core = SetupCore(row.root, http_cache=self.downloads.http_cache)
+        try:
+            if not core.is_echo_install():
+                raise SetupError("bin/win10/echovr.exe not found")
+            core.open()
+            core.sync_file_path()
+            with self._plan_lock:
+                pairs = core.configure(row.discord_id, row.password, row.instances, row.base_port,
+                                       regions=row.regions, serveraddr=row.serveraddr,
+                                       reserved=frozenset(self._reserved))
+                self._reserved.update(p for pair in pairs for p in pair)
+            result["configured"] = True
+            result["ports"] = core.setup_data["portRanges"]
+
+            if self.patch:
+                result["patched"] = core.run_patch_sequence(downloads=self.downloads)
+            result["ready"] = core.is_ready()
+            result["ok"] = result["patched"] is not False
+        except (SetupError, DownloadError, OSError) as e:
+            result["error"] = str(e)
+        except Exception as e:
+            # Anything else is a bug, but one broken install must not lose the rest of the report
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            try:
+                core.flush_setup()
+            except OSError:
+                pass
+            result["seconds"] = round(time.perf_counter() - started, 2)
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+    def run(self):
+        """Provisions every row; returns the summary report."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            results = list(pool.map(self.provision, self.rows))
+        return {
+            "installs": len(results),
+            "ok": sum(r["ok"] for r in results),
+            "failed": sum(not r["ok"] for r in results),
+            "parallel": self.parallel,
+            "seconds": round(time.perf_counter() - started, 2),
+            "downloads": {"fetched": self.downloads.fetched, "copied": self.downloads.copied},
+            "results": results,
+        }
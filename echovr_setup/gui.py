@@ -0,0 +1,582 @@
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import messagebox
+import os
+import sys
+import subprocess
+import urllib.error
+import ctypes
+
+from echovr_setup.core import FONT_HASHES, MONITOR_EXE, MONITOR_SCRIPT, URL_FONTS, SetupCore, SetupError, hidden_startupinfo
+from echovr_setup.startup import Probe, ProbeRunner, StartupTimeline
+from echovr_setup.tasks import TaskCancelled, TaskScheduler
+from echovr_setup.tracing import format_stages
+from echovr_setup.viewmodel import changed_parts, diff_rows, menu_state
+
+# Theme Setup
+ctk.set_appearance_mode("Dark")
+ctk.set_default_color_theme("dark-blue")
+
+# Globals
+FONT_MAIN = "Arial"
+BUTTON_COLOR = ["#3B8ED0", "#1F6AA5"]
+# Downloads plus the package rebuild; a stuck patch is abandoned after this
+PATCH_TIMEOUT = 1800
+
+class EchoServerConfig(ctk.CTk):
+    def __init__(self, core=None):
+        super().__init__()
+        self.core = core or SetupCore()
+        self.timeline = StartupTimeline()
+        self.probe_results = []
+        
+        self.title("EchoVR Server Setup Tool")
+ 
+        screen_height = self.winfo_screenheight()
+        default_width = 490
+        default_height = 840
+
+        if screen_height < default_height:
+            calc_height = int(screen_height * 0.8)
+            self.geometry(f"{default_width + 20}x{calc_height}") 
+            self.use_scroll = True
+        else:
+            self.geometry(f"{default_width}x{default_height}")
+            self.use_scroll = False
+
+        self.resizable(False, False)
+        
+        # State variables
+        self.patch_task = None
+        self.patch_status_text = "Patch Server"
+
+        # Worker results are only ever applied from the Tk loop
+        self.tasks = TaskScheduler()
+        self.tasks.attach(self)
+
+        # Initialization check
+        if not self.core.is_echo_install():
+            messagebox.showerror("Error", "Place this program in the ready-at-dawn-echo-arena folder.")
+            self.destroy()
+            sys.exit()
+
+        self.core.open()
+        self.core.sync_file_path()
+
+        # Paint the last known state right away, checks fill in as they finish
+        self.build_main_menu()
+        self.update_idletasks()
+        self.timeline.mark("first_paint")
+        self.startup_checks()
+
+    @property
+    def setup_data(self):
+        return self.core.setup_data
+
+    def save_setup(self):
+        self.core.save_setup()
+
+    def destroy(self):
+        self.tasks.shutdown()
+        self.core.flush_setup()
+        super().destroy()
+
+    def initialize_fonts(self):
+        """Runs as a startup probe; returns the font family to use."""
+        fonts_dir = os.path.join(self.core.root_dir, "content", "engine", "core", "fonts")
+        os.makedirs(fonts_dir, exist_ok=True)
+        
+        font_files = list(FONT_HASHES)
+        base_url = URL_FONTS
+        fonts_loaded = True
+        
+        for font_file in font_files:
+            font_path = os.path.join(fonts_dir, font_file)
+            try:
+                if not os.path.exists(font_path):
+                    self.core.downloader().download(base_url + font_file, font_path, (FONT_HASHES[font_file],))
+                
+                # Temporarily load font into Windows GDI 
+                if os.name == 'nt':
+                    FR_PRIVATE = 0x10
+                    res = ctypes.windll.gdi32.AddFontResourceExW(font_path, FR_PRIVATE, 0)
+                    if res == 0:
+                        fonts_loaded = False
+                else:
+                    fonts_loaded = False
+            except Exception:
+                fonts_loaded = False
+                
+        return "Neuropol X" if fonts_loaded else "Arial"
+
+    def apply_font(self, family):
+        global FONT_MAIN
+        FONT_MAIN = family
+
+    def startup_checks(self):
+        """Runs fonts + core probes concurrently; each result is applied on the UI thread as it lands."""
+        probes = [Probe("fonts", self.initialize_fonts, 10, self.apply_font)] + self.core.startup_probes()
+        runner = ProbeRunner(probes)
+        runner.start(lambda probe, result: self.tasks.call_main(self.apply_probe, probe, result),
+                     on_done=lambda: self.tasks.call_main(self.finish_startup))
+
+    def apply_probe(self, probe, result):
+        self.probe_results.append(result)
+        if not result.ok or not probe.apply:
+            return
+        probe.apply(result.value)
+        self.render_main_menu()
+
+    def finish_startup(self):
+        self.timeline.mark("checks_done")
+        self.core.record_startup_timings(self.timeline.marks, self.probe_results)
+        self.save_setup()
+
+    # --- GUI Construction ---
+
+    def clear_window(self):
+        for widget in self.winfo_children():
+            widget.destroy()
+
+    def is_on_main_menu(self):
+        return hasattr(self, 'btn_patch') and self.btn_patch.winfo_exists()
+
+    def build_main_menu(self):
+        """Builds the main menu skeleton; render_main_menu fills it in from setup state."""
+        self.clear_window()
+        
+        # Pick which ui mode to use based on screen height
+        if self.use_scroll:
+            main_frame = ctk.CTkScrollableFrame(self)
+        else:
+            main_frame = ctk.CTkFrame(self)
+
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        # Shown while anything is left to do
+        self.lbl_warning = ctk.CTkLabel(main_frame, text="Complete all actions before starting your server.", font=(FONT_MAIN, 12), text_color="#FFA500")
+
+        # Buttons side-by-side
+        self.btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        self.btn_frame.pack(pady=10)
+
+        self.btn_patch = ctk.CTkButton(self.btn_frame, text="Patch Server", command=self.action_patch_server, font=(FONT_MAIN, 14), width=180, height=40)
+        self.btn_patch.pack(side="left", padx=10)
+
+        self.btn_config = ctk.CTkButton(self.btn_frame, text="Configure Server", command=self.action_configure_server, font=(FONT_MAIN, 14), width=180, height=40)
+        self.btn_config.pack(side="right", padx=10)
+
+        # Shown while a patch runs
+        self.patch_row = ctk.CTkFrame(main_frame, fg_color="transparent")
+        self.patch_progress = ctk.CTkProgressBar(self.patch_row)
+        self.patch_progress.set(0)
+        self.patch_progress.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.btn_cancel_patch = ctk.CTkButton(self.patch_row, text="Cancel", width=60, command=self.cancel_patch)
+        self.btn_cancel_patch.pack(side="right")
+
+        self.checklist_frame = ctk.CTkFrame(main_frame)
+        self.lbl_checklist = ctk.CTkLabel(self.checklist_frame, text="Setup Checklist", font=(FONT_MAIN, 14))
+        self.lbl_checklist.pack(anchor="w", padx=10, pady=(10,5))
+        self.checklist_rows = {}
+
+        # Shown once everything is done
+        self.ready_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        ctk.CTkLabel(self.ready_frame, text="Ready to Launch", font=(FONT_MAIN, 20, "bold"), text_color="green").pack(pady=(20, 5))
+        ctk.CTkButton(self.ready_frame, text="Start Server",
+                      command=self.action_launch_monitor,
+                      fg_color="green", text_color="white", font=(FONT_MAIN, 14), height=40).pack(pady=5)
+        ctk.CTkLabel(self.ready_frame, text="This will close the setup tool.", font=(FONT_MAIN, 10), text_color="gray").pack(pady=0)
+
+        self.menu_state = None
+        self.render_main_menu()
+
+    def render_main_menu(self):
+        """Brings the main menu in line with setup state, touching only the widgets whose state changed."""
+        if not self.is_on_main_menu():
+            return
+        state = menu_state(self.core, FONT_MAIN)
+        previous, self.menu_state = self.menu_state, state
+        parts = changed_parts(previous, state)
+        if previous and "font" in parts:
+            # The font is baked into every widget
+            return self.build_main_menu()
+
+        if "ready" in parts:
+            if state.ready:
+                self.lbl_warning.pack_forget()
+                self.ready_frame.pack(fill="x")
+            else:
+                self.lbl_warning.pack(pady=(10, 15), before=self.btn_frame)
+                self.ready_frame.pack_forget()
+        if "patched" in parts:
+            self.update_patch_button()
+        if "configured" in parts:
+            if state.configured:
+                self.btn_config.configure(text="Config Ready", fg_color="green")
+            else:
+                self.btn_config.configure(text="Configure Server", fg_color=BUTTON_COLOR)
+        if "checklist" in parts:
+            self.render_checklist(previous.checklist if previous else (), state.checklist)
+
+    def update_patch_button(self):
+        if self.patch_task:
+            self.btn_patch.configure(text=self.patch_status_text, state="disabled")
+            self.patch_row.pack(fill="x", padx=30, after=self.btn_frame)
+            self.btn_cancel_patch.configure(state="disabled" if self.patch_task.cancelled else "normal")
+            return
+        self.patch_row.pack_forget()
+        self.patch_progress.set(0)
+
+        if self.setup_data["isPatched"]:
+            self.btn_patch.configure(text="Server Patched", fg_color="green", state="normal", font=(FONT_MAIN, 14))
+        else:
+            self.btn_patch.configure(text="Patch Server", fg_color=BUTTON_COLOR, state="normal", font=(FONT_MAIN, 14)) 
+
+    def render_checklist(self, old_rows, new_rows):
+        if not new_rows:
+            self.checklist_frame.pack_forget()
+        else:
+            above = self.patch_row if self.patch_row.winfo_manager() else self.btn_frame
+            self.checklist_frame.pack(fill="x", pady=20, padx=10, after=above)
+
+        removed, added, changed = diff_rows(old_rows, new_rows)
+        for key in removed:
+            self.checklist_rows.pop(key)["frame"].destroy()
+        for row in changed:
+            widgets = self.checklist_rows[row.key]
+            widgets["label"].configure(text=row.label)
+            if widgets["button"] is not None:
+                widgets["button"].configure(state="normal" if row.enabled else "disabled")
+        for row in added:
+            self.checklist_rows[row.key] = self.build_checklist_row(row)
+
+        if added:
+            # New rows (e.g. the UniFi step once it's detected) go back into checklist order
+            previous = self.lbl_checklist
+            for row in new_rows:
+                frame = self.checklist_rows[row.key]["frame"]
+                frame.pack(fill="x", after=previous)
+                previous = frame
+
+    def build_checklist_row(self, item):
+        frame = ctk.CTkFrame(self.checklist_frame, fg_color="transparent")
+        row = ctk.CTkFrame(frame, fg_color="transparent")
+        row.pack(fill="x", pady=2, padx=5)
+        
+        lbl = ctk.CTkLabel(row, text=item.label, anchor="w")
+        lbl.pack(side="left", fill="x", expand=True, padx=5)
+
+        btn = None
+        if item.key == "chklst_hasMonitorScript":
+            btn_dl_frame = ctk.CTkFrame(row, fg_color="transparent")
+            btn_dl_frame.pack(side="right")
+            
+            ctk.CTkButton(btn_dl_frame, text="Download .exe", width=80,
+                     command=lambda: self.download_monitor_file(MONITOR_EXE)).pack(side="left", padx=2)
+            ctk.CTkButton(btn_dl_frame, text="Download .ps1", width=80,
+                     command=lambda: self.download_monitor_file(MONITOR_SCRIPT)).pack(side="left", padx=2)
+        elif item.key == "chklst_privateNet":
+            ctk.CTkButton(row, text="Set", width=60, command=self.action_set_private_network).pack(side="right", padx=5)
+        else:
+            btn = ctk.CTkButton(row, text="Done", width=60, state="normal" if item.enabled else "disabled",
+                                command=lambda k=item.key: self.complete_checklist_item(k))
+            btn.pack(side="right", padx=5)
+
+        if item.note:
+            ctk.CTkLabel(frame, text=item.note, font=("Arial", 11), text_color="gray", anchor="w").pack(fill="x", padx=30, pady=(0, 5))
+        return {"frame": frame, "label": lbl, "button": btn}
+
+    def complete_checklist_item(self, key):
+        self.core.complete_checklist_item(key)
+        self.render_main_menu()
+
+    # --- Actions ---
+    
+    def action_set_private_network(self):
+        """Creates a self-deleting batch file that requests UAC and sets network profile to Private."""
+        temp_dir = self.core.temp_dir
+        os.makedirs(temp_dir, exist_ok=True)
+        bat_path = os.path.join(temp_dir, "Set-PrivateNetwork.bat")
+        
+        bat_content = """@echo off
+net session >nul 2>&1
+if %errorLevel% neq 0 (
+    powershell -WindowStyle Hidden -Command "Start-Process -WindowStyle Hidden -Wait -Verb RunAs -FilePath '%~f0'"
+    exit /b
+)
+powershell -WindowStyle Hidden -NoProfile -Command "Get-NetConnectionProfile | Set-NetConnectionProfile -NetworkCategory Private"
+del "%~f0"
+"""
+        try:
+            with open(bat_path, "w") as f:
+                f.write(bat_content)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not run network profile script: {e}")
+            return
+
+        def run_and_verify(task):
+            # Execute script and wait
+            subprocess.run(bat_path, startupinfo=hidden_startupinfo(), shell=True)
+            task.check()
+
+            # Verify profile was successfully changed
+            return self.core.is_network_private()
+
+        def update_ui(is_private):
+            if is_private:
+                self.setup_data["chklst_privateNet"] = True
+                self.save_setup()
+                self.render_main_menu()
+            else:
+                messagebox.showwarning("Incomplete", "The network profile was not updated. Did you decline the Administrator prompt?")
+
+        self.tasks.submit("private-network", run_and_verify, timeout=300, on_done=update_ui,
+                          on_error=lambda e: messagebox.showerror("Error", f"Could not run network profile script: {e}"))
+    
+    def action_update_exec_policy(self):
+        """Creates a self-deleting batch file that requests UAC and sets the PS policy."""
+        bat_path = os.path.join(self.core.root_dir, "Set-ExecPolicy.bat")
+        
+        bat_content = """@echo off
+net session >nul 2>&1
+if %errorLevel% neq 0 (
+    powershell -WindowStyle Hidden -Command "Start-Process -WindowStyle Hidden -Wait -Verb RunAs -FilePath '%~f0'"
+    exit /b
+)
+
+:: Force update for 64-bit Windows PowerShell (5.1)
+if exist "%SystemRoot%\\sysnative\\WindowsPowerShell\\v1.0\\powershell.exe" (
+    "%SystemRoot%\\sysnative\\WindowsPowerShell\\v1.0\\powershell.exe" -WindowStyle Hidden -NoProfile -Command "Set-ExecutionPolicy Bypass -Scope LocalMachine -Force"
+) else (
+    powershell -WindowStyle Hidden -NoProfile -Command "Set-ExecutionPolicy Bypass -Scope LocalMachine -Force"
+)
+
+del "%~f0"
+"""
+        try:
+            with open(bat_path, "w") as f:
+                f.write(bat_content)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not run policy update script: {e}")
+            return
+
+        self.tasks.submit("exec-policy", lambda task: subprocess.run(bat_path, startupinfo=hidden_startupinfo(), shell=True),
+                          timeout=300, on_done=lambda _: self.render_main_menu(),
+                          on_error=lambda e: messagebox.showerror("Error", f"Could not run policy update script: {e}"))
+
+    def download_monitor_file(self, filename):
+        if self.tasks.running("download-monitor"):
+            return
+
+        def downloaded(_):
+            messagebox.showinfo("Success", f"Downloaded {filename} successfully!")
+            if filename == MONITOR_SCRIPT:
+                # Always run the policy update
+                self.action_update_exec_policy()
+            else:
+                self.render_main_menu()
+
+        def failed(e):
+            if isinstance(e, SetupError):
+                messagebox.showerror("Error", str(e))
+            elif isinstance(e, urllib.error.HTTPError):
+                messagebox.showerror("GitHub API Error", f"Failed to check GitHub: {e.code} {e.reason}")
+            else:
+                messagebox.showerror("Download Error", str(e))
+
+        self.tasks.submit("download-monitor", lambda task: self.core.download_monitor(filename), timeout=600,
+                          on_done=downloaded, on_error=failed)
+
+    def action_launch_monitor(self):
+        # The monitor reads setup.json as soon as it starts
+        self.core.flush_setup()
+        path_exe = os.path.join(self.core.root_dir, MONITOR_EXE)
+        path_ps1 = os.path.join(self.core.root_dir, MONITOR_SCRIPT)
+
+        if os.path.exists(path_exe):
+            try:
+                os.startfile(path_exe)
+                self.destroy() 
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not launch .exe monitor: {e}")
+
+        elif os.path.exists(path_ps1):
+            try:
+                bat_filename = "Launch-Monitor.bat"
+                bat_path = os.path.join(self.core.root_dir, bat_filename)
+                
+                cmd_content = f"start /min powershell -windowstyle hidden -file {MONITOR_SCRIPT}"
+                with open(bat_path, "w") as f:
+                    f.write(cmd_content)
+                
+                os.startfile(bat_path)
+                self.destroy() 
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not launch .ps1 monitor: {e}")
+        else:
+            messagebox.showerror("Error", "Monitor executable or script not found.")
+
+    def action_patch_server(self):
+        # A timed out patch keeps its worker until it reaches a cancellation point
+        if self.patch_task or self.tasks.running("patch"):
+            return
+        self.patch_status_text = "Downloading..."
+        self.patch_task = self.tasks.submit("patch", self.run_patch_sequence, timeout=PATCH_TIMEOUT,
+                                            on_progress=self.show_patch_progress,
+                                            on_done=self.finish_patching, on_error=self.patch_failed,
+                                            on_exit=self.patch_exited)
+        self.update_patch_button()
+
+    def run_patch_sequence(self, task):
+        """Worker thread: stages and download bytes go out as progress events, which also check for cancellation."""
+        return self.core.run_patch_sequence(status=lambda text: task.progress(stage=text),
+                                            progress=lambda done, total: task.progress(done=done, total=total))
+
+    def cancel_patch(self):
+        if self.patch_task:
+            self.patch_task.cancel()
+            self.patch_status_text = "Cancelling..."
+            self.update_patch_button()
+
+    def show_patch_progress(self, event):
+        text = event.stage or self.patch_status_text
+        if event.done is not None and event.stage:
+            text = f"{event.stage} {event.done * 100 // event.total}%" if event.total else \
+                f"{event.stage} {event.done / 1048576:.1f} MB"
+        if not self.patch_task.cancelled:
+            self.patch_status_text = text
+        if self.is_on_main_menu():
+            self.update_patch_button()
+            if event.total:
+                self.patch_progress.set(event.done / event.total)
+
+    def finish_patching(self, is_success):
+        timings = format_stages(self.core.last_patch_trace) if self.core.last_patch_trace else ""
+        if is_success:
+            messagebox.showinfo("Success", f"Server Patched Successfully!\n\n{timings}")
+            self.render_main_menu()
+        else:
+            messagebox.showerror("Failed", f"Patch verification failed.\n\n{timings}")
+        if self.is_on_main_menu(): self.update_patch_button()
+
+    def patch_failed(self, error):
+        if not self.patch_task.exited:
+            self.patch_status_text = "Stopping..."
+        if isinstance(error, TaskCancelled):
+            messagebox.showinfo("Cancelled", "Patching was cancelled.")
+        else:
+            trace = self.core.last_patch_trace
+            detail = f"\n\n{format_stages(trace)}" if trace else ""
+            messagebox.showerror("Error", f"{error}{detail}")
+        if self.is_on_main_menu(): self.update_patch_button()
+
+    def patch_exited(self):
+        """The patch worker has returned; only now can another patch start."""
+        self.patch_task = None
+        if self.is_on_main_menu(): self.update_patch_button()
+
+    def action_configure_server(self):
+        self.clear_window()
+        
+        fields = self.core.read_server_config()
+        discord_id = fields["discord_id"]
+        password = fields["password"]
+        region_val = fields["regions"]
+        cgnat_val = fields["serveraddr"]
+        args_val = fields["extra_args"]
+
+        # Frame selection
+        if self.use_scroll:
+            form_frame = ctk.CTkScrollableFrame(self)
+        else:
+            form_frame = ctk.CTkFrame(self)
+
+        form_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        cgnat_status = self.setup_data.get("checkCGNAT", "Fail")
+        if cgnat_status == "Pass":
+            lbl_cgnat = ctk.CTkLabel(form_frame, text="No CGNAT Detected!", text_color="green", font=(FONT_MAIN, 14))
+        else:
+            lbl_cgnat = ctk.CTkLabel(form_frame, text="CGNAT Detected. Use a tunnel service to host.", text_color="red", font=(FONT_MAIN, 14))
+        lbl_cgnat.pack(anchor="w", pady=(0, 10))
+
+        ctk.CTkLabel(form_frame, text="Discord User ID (Required)").pack(anchor="w")
+        entry_discord = ctk.CTkEntry(form_frame, width=400)
+        entry_discord.insert(0, discord_id)
+        entry_discord.pack(anchor="w")
+        ctk.CTkLabel(form_frame, text="NOT your username. Get your user ID by right clicking your profile > Copy User ID.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        ctk.CTkLabel(form_frame, text="Password (Required)").pack(anchor="w")
+        entry_pass = ctk.CTkEntry(form_frame, width=400)
+        entry_pass.insert(0, password)
+        entry_pass.pack(anchor="w")
+        ctk.CTkLabel(form_frame, text="Do not use a password you typically use.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        ctk.CTkLabel(form_frame, text="Region ID").pack(anchor="w")
+        entry_region = ctk.CTkEntry(form_frame, width=400)
+        entry_region.insert(0, region_val)
+        entry_region.pack(anchor="w")
+        ctk.CTkLabel(form_frame, text="Leave blank unless otherwise instructed. Separate multiple IDs with commas.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        ctk.CTkLabel(form_frame, text="Tunnel IP:Port").pack(anchor="w")
+        entry_cgnat = ctk.CTkEntry(form_frame, width=400)
+        entry_cgnat.insert(0, cgnat_val)
+        entry_cgnat.pack(anchor="w")
+        ctk.CTkLabel(form_frame, text="Required for hosts behind a CGNAT, optional otherwise.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        ctk.CTkLabel(form_frame, text="Additional Arguments").pack(anchor="w")
+        entry_args = ctk.CTkEntry(form_frame, width=400)
+        entry_args.insert(0, args_val)
+        entry_args.pack(anchor="w")
+        ctk.CTkLabel(form_frame, text="Raw text appended to serverdb_host. Leave blank unless you know what you're doing!", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        # Base Port Addition
+        ctk.CTkLabel(form_frame, text="Base Port").pack(anchor="w")
+        saved_lower = self.setup_data.get("lowerPort", 6792)
+        var_lower = tk.IntVar(value=int(saved_lower))
+        spin_lower = tk.Spinbox(form_frame, from_=1024, to=65535, textvariable=var_lower, 
+                                    bg="#343638", fg="white", buttonbackground="#2B2B2B")
+        spin_lower.pack(anchor="w", pady=2)
+        ctk.CTkLabel(form_frame, text="Default is 6792.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        ctk.CTkLabel(form_frame, text="Number of Instances (Required)").pack(anchor="w")
+        saved_instances = self.setup_data.get("numInstances", 0)
+        if saved_instances == "": saved_instances = 0
+        var_instances = tk.IntVar(value=int(saved_instances))
+        
+        spin_instances = tk.Spinbox(form_frame, from_=0, to=100, textvariable=var_instances, 
+                                    bg="#343638", fg="white", buttonbackground="#2B2B2B")
+        spin_instances.pack(anchor="w", pady=2)
+        
+        ctk.CTkLabel(form_frame, text="Will automatically update your monitoring script.", font=("Arial", 11), text_color="gray").pack(anchor="w", pady=(0, 5))
+
+        btn_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
+        btn_frame.pack(pady=20, fill="x")
+
+        ctk.CTkButton(btn_frame, text="Open Config", command=lambda: os.startfile(self.core.config_local) if os.path.exists(self.core.config_local) else None).pack(fill="x", pady=2)
+        
+        def save_and_return(should_return=True):
+            try:
+                self.core.configure(entry_discord.get(), entry_pass.get(), var_instances.get(), var_lower.get(),
+                                    regions=entry_region.get(), serveraddr=entry_cgnat.get(), extra_args=entry_args.get())
+            except SetupError as e:
+                messagebox.showerror("Error", str(e))
+                return False
+
+            if should_return: self.build_main_menu()
+            return True
+
+        def generate_client():
+            if not save_and_return(should_return=False): return
+            desktop = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
+            target = os.path.join(desktop, "config.json")
+            self.core.write_client_config(target)
+            messagebox.showinfo("Done", "Changes saved. New client config generated on Desktop.")
+            self.build_main_menu()
+
+        ctk.CTkButton(btn_frame, text="Generate Client Config", command=generate_client).pack(fill="x", pady=5)
+        
+        footer = ctk.CTkFrame(btn_frame, fg_color="transparent")
+        footer.pack(fill="x", pady=5)
+        ctk.CTkButton(footer, text="Save & Return", fg_color="green", command=save_and_return).pack(side="left", expand=True, fill="x", padx=2)
+        ctk.CTkButton(footer, text="Discard & Return", fg_color="firebrick", command=self.build_main_menu).pack(side="right", expand=True, fill="x", padx=2)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+USER_AGENT = "Mozilla/5.0"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class HttpCache:
+    """
+    On-disk cache of GET responses under dashboard/cache. Each entry keeps the ETag and
+    Last-Modified validators so repeat requests go out as If-None-Match / If-Modified-Since
+    and a 304 is answered from disk. Least recently used bodies are evicted past max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose body went missing
+        return {url: e for url, e in index.items() if os.path.exists(os.path.join(self.cache_dir, e["file"]))}
+
+    def _save_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+
+    def _body_name(self, url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    # --- Lookups ---
+
+    def lookup(self, url):
+        """Path of the cached body for url, or None."""
+        with self._lock:
+            entry = self.index.get(url)
+            return os.path.join(self.cache_dir, entry["file"]) if entry else None
+
+    def conditional_headers(self, url):
+        with self._lock:
+            entry = self.index.get(url)
+            if not entry:
+                return {}
+            headers = {}
+            if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def touch(self, url):
+        with self._lock:
+            if url in self.index:
+                self.index[url]["used"] = time.time()
+                self._save_index()
+
+    # --- Updates ---
+
+    def store_file(self, url, src_path, headers):
+        """Copies a freshly downloaded file into the cache if the response carried validators."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return None
+
+        name = self._body_name(url)
+        body_path = os.path.join(self.cache_dir, name)
+        tmp = self._temp_path(".tmp")
+        try:
+            shutil.copyfile(src_path, tmp)
+            os.replace(tmp, body_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        with self._lock:
+            self.index[url] = {
+                "file": name,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": os.path.getsize(body_path),
+                "used": time.time(),
+            }
+            self._evict()
+            self._save_index()
+        return body_path
+
+    def store_bytes(self, url, data, headers):
+        tmp = self._temp_path(".new")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            return self.store_file(url, tmp, headers)
+        finally:
+            os.remove(tmp)
+
+    def _temp_path(self, suffix):
+        """A fresh file in the cache dir; names are unique, so concurrent writers of one URL don't collide."""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.cache_dir)
+        os.close(fd)
+        return path
+
+    def forget(self, url):
+        with self._lock:
+            entry = self.index.pop(url, None)
+            if entry:
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry["file"]))
+                except OSError:
+                    pass
+                self._save_index()
+
+    def _evict(self):
+        total = sum(e["size"] for e in self.index.values())
+        for url, entry in sorted(self.index.items(), key=lambda kv: kv[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+            total -= entry["size"]
+            del self.index[url]
+
+    # --- Small responses ---
+
+    def get(self, url, timeout=5, headers=None):
+        """
+        Revalidating GET for small bodies (e.g. the GitHub releases API). Returns the body bytes.
+        Falls back to the cached copy if the origin errors out (rate limits, outages).
+        """
+        req_headers = {"User-Agent": USER_AGENT}
+        req_headers.update(headers or {})
+        req_headers.update(self.conditional_headers(url))
+        req = urllib.request.Request(url, headers=req_headers)
+
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                data = response.read()
+                self.store_bytes(url, data, response.headers)
+                return data
+        except (urllib.error.URLError, OSError) as e:
+            cached = self.lookup(url)
+            if not cached:
+                raise
+            if isinstance(e, urllib.error.HTTPError) and e.code == 304:
+                self.touch(url)
+            with open(cached, "rb") as f:
+                return f.read()
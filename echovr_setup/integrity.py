@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+
+# Read size for streaming hashes, large enough to keep syscalls cheap on cold disks
+CHUNK_SIZE = 1024 * 1024
+
+# Digest length (hex chars) -> hashlib algorithm
+ALGORITHMS_BY_LENGTH = {32: "md5", 40: "sha1", 64: "sha256"}
+
+
+def algorithm_for(expected_hash):
+    """Guesses the hashlib algorithm from the length of a hex digest."""
+    algorithm = ALGORITHMS_BY_LENGTH.get(len(expected_hash))
+    if algorithm is None:
+        raise ValueError(f"Unrecognized hash length: {expected_hash}")
+    return algorithm
+
+
+def hash_file(filepath, algorithms=("md5",), chunk_size=CHUNK_SIZE):
+    """Streams a file through one or more hashers in a single pass. Returns {algorithm: HEX}."""
+    hashers = {name: hashlib.new(name) for name in algorithms}
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(filepath, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            for h in hashers.values():
+                h.update(view[:n])
+    return {name: h.hexdigest().upper() for name, h in hashers.items()}
+
+
+class IntegrityCache:
+    """
+    File digests keyed by path, size and mtime. Entries live in a plain dict
+    (stored under "integrityCache" in setup.json) so unchanged files are never re-hashed.
+    """
+
+    def __init__(self, entries=None, lock=None):
+        self.entries = entries if entries is not None else {}
+        self.dirty = False
+        # Held while entries change so setup.json can be serialized from another thread
+        self.lock = lock or threading.RLock()
+
+    @staticmethod
+    def _key(filepath):
+        return os.path.normcase(os.path.abspath(filepath))
+
+    def digests(self, filepath, algorithms=("md5",)):
+        st = os.stat(filepath)
+        key = self._key(filepath)
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry or entry.get("size") != st.st_size or entry.get("mtime") != st.st_mtime_ns:
+                entry = {"size": st.st_size, "mtime": st.st_mtime_ns, "digests": {}}
+            cached = {a: entry["digests"][a] for a in algorithms if a in entry["digests"]}
+
+        missing = [a for a in algorithms if a not in cached]
+        if missing:
+            cached.update(hash_file(filepath, missing))
+            with self.lock:
+                entry["digests"].update(cached)
+                self.entries[key] = entry
+                self.dirty = True
+
+        return {a: cached[a] for a in algorithms}
+
+    def digest(self, filepath, algorithm="md5"):
+        return self.digests(filepath, (algorithm,))[algorithm]
+
+    def verify(self, filepath, *expected_hashes):
+        """True if the file exists and matches every expected hash (MD5 and/or SHA-256)."""
+        if not os.path.exists(filepath):
+            return False
+        algorithms = tuple(algorithm_for(h) for h in expected_hashes)
+        actual = self.digests(filepath, algorithms)
+        return all(actual[a] == h.upper() for a, h in zip(algorithms, expected_hashes))
+
+    def record(self, filepath, digests):
+        """Stores digests computed elsewhere (e.g. while downloading) for the file as it is now."""
+        st = os.stat(filepath)
+        with self.lock:
+            self.entries[self._key(filepath)] = {"size": st.st_size, "mtime": st.st_mtime_ns, "digests": dict(digests)}
+            self.dirty = True
+
+    def forget(self, filepath):
+        with self.lock:
+            if self.entries.pop(self._key(filepath), None) is not None:
+                self.dirty = True
+
+    def prune(self):
+        """Drops entries for files that no longer exist."""
+        with self.lock:
+            for key in [k for k in self.entries if not os.path.exists(k)]:
+                del self.entries[key]
+                self.dirty = True
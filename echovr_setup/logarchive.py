@@ -0,0 +1,360 @@
+"""
+Log maintenance without compact.exe: old r14 logs are streamed into compressed tar parts,
+one or more per week folder (old/Week_<Sun>_to_<Sat>), on a process pool. Each part is
+written under a temp name, decompressed and checked against the source hashes, renamed
+into place and recorded in the week's manifest.json; only then are the originals removed.
+"""
+import datetime
+import glob
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = {"gzip": ".tar.gz", "xz": ".tar.xz", "zstd": ".tar.zst"}
+MANIFEST = "manifest.json"
+PART_BYTES = 256 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+PURGE_DAYS = {"Daily": 1, "Weekly": 7, "Monthly": 30}
+
+# Logs touched more recently than this are assumed to still be open
+ACTIVE_SECONDS = 10 * 60
+
+
+def default_codec():
+    return "zstd" if zstandard else "gzip"
+
+
+def purge_days(interval):
+    return PURGE_DAYS.get(interval, 7)
+
+
+def week_folder(mtime):
+    """The monitor's Week_MMM_dd_to_MMM_dd_yyyy name; weeks start on Sunday."""
+    day = datetime.date.fromtimestamp(mtime)
+    start = day - datetime.timedelta(days=(day.weekday() + 1) % 7)
+    end = start + datetime.timedelta(days=6)
+    return f"Week_{start.strftime('%b_%d')}_to_{end.strftime('%b_%d_%Y')}"
+
+
+class _HashingWriter:
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+class _HashingReader:
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def read(self, n=-1):
+        data = self.f.read(n)
+        self.sha.update(data)
+        return data
+
+
+def compressor(codec, f):
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0)
+    if codec == "xz":
+        return lzma.LZMAFile(f, "wb", preset=3)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=9).stream_writer(f, closefd=False)
+    raise ValueError(f"Unknown codec {codec}")
+
+
+def decompressor(codec, f):
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if codec == "xz":
+        return lzma.LZMAFile(f, "rb")
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=False)
+    raise ValueError(f"Unknown codec {codec}")
+
+
+def read_members(path, codec):
+    """{name: (size, sha256)} for every file in an archive part, by decompressing it."""
+    members = {}
+    with open(path, "rb") as raw, decompressor(codec, raw) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+        for info in tar:
+            if not info.isfile():
+                continue
+            sha = hashlib.sha256()
+            src = tar.extractfile(info)
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+            members[info.name] = (info.size, sha.hexdigest())
+    return members
+
+
+def archive_part(week_dir, part_name, codec, files):
+    """
+    Worker: streams files into week_dir/part_name, verifies it and returns its manifest
+    entry. Runs in a child process, so it only touches its own part file.
+    """
+    final_path = os.path.join(week_dir, part_name)
+    tmp_path = final_path + ".tmp"
+    members = {}
+    newest = 0
+    try:
+        with open(tmp_path, "wb") as raw:
+            out = _HashingWriter(raw)
+            with compressor(codec, out) as stream, tarfile.open(fileobj=stream, mode="w|") as tar:
+                for path in files:
+                    with open(path, "rb") as src:
+                        st = os.fstat(src.fileno())
+                        info = tarfile.TarInfo(os.path.basename(path))
+                        info.size = st.st_size
+                        info.mtime = st.st_mtime
+                        reader = _HashingReader(src)
+                        tar.addfile(info, reader)
+                    members[info.name] = {"size": st.st_size, "sha256": reader.sha.hexdigest(), "mtime": st.st_mtime}
+                    newest = max(newest, st.st_mtime)
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        found = read_members(tmp_path, codec)
+        for name, entry in members.items():
+            if found.get(name) != (entry["size"], entry["sha256"]):
+                raise OSError(f"{part_name}: {name} did not verify")
+
+        # The part ages like its newest log, so retention treats it like the loose files it replaces
+        os.utime(tmp_path, (newest, newest))
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {"codec": codec, "size": out.size, "sha256": out.sha.hexdigest(), "newest": newest, "members": members}
+
+
+def load_manifest(week_dir):
+    try:
+        with open(os.path.join(week_dir, MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"parts": {}}
+
+
+def save_manifest(week_dir, manifest):
+    path = os.path.join(week_dir, MANIFEST)
+    if not manifest["parts"]:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+class LogArchiver:
+    def __init__(self, log_dir, codec=None, workers=None, part_bytes=PART_BYTES):
+        self.log_dir = log_dir
+        self.old_dir = os.path.join(log_dir, "old")
+        self.codec = codec or default_codec()
+        if self.codec == "zstd" and not zstandard:
+            self.codec = "gzip"
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.part_bytes = part_bytes
+
+    def candidates(self, now=None, manual=False, exclude=()):
+        """
+        Loose logs to archive: r14logs/*.log, old/*.log and old/Week_*/*.log (compact.exe era).
+        Like the monitor, only logs untouched for a day unless manual.
+        """
+        now = now if now is not None else time.time()
+        exclude = {os.path.normcase(os.path.abspath(p)) for p in exclude}
+        patterns = [os.path.join(self.log_dir, "*.log"), os.path.join(self.old_dir, "*.log"),
+                    os.path.join(self.old_dir, "Week_*", "*.log")]
+        found = []
+        for pattern in patterns:
+            for path in glob.glob(pattern):
+                if os.path.normcase(os.path.abspath(path)) in exclude:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                age = now - st.st_mtime
+                if age < ACTIVE_SECONDS or (not manual and age < 86400):
+                    continue
+                found.append((path, st.st_size, st.st_mtime))
+        return found
+
+    def plan(self, logs):
+        """Groups logs by week and splits each week into parts of at most part_bytes. Returns [(week_dir, [paths])]."""
+        weeks = {}
+        for path, size, mtime in sorted(logs, key=lambda entry: entry[2]):
+            weeks.setdefault(os.path.join(self.old_dir, week_folder(mtime)), []).append((path, size))
+        tasks = []
+        for week_dir, entries in weeks.items():
+            part, part_size, names = [], 0, set()
+            for path, size in entries:
+                # Members are keyed by file name, so a repeated name starts a new part
+                name = os.path.basename(path)
+                if part and (part_size + size > self.part_bytes or name in names):
+                    tasks.append((week_dir, part))
+                    part, part_size, names = [], 0, set()
+                part.append(path)
+                part_size += size
+                names.add(name)
+            if part:
+                tasks.append((week_dir, part))
+        return tasks
+
+    def _drop_archived(self, week_dir, manifest, paths):
+        """Deletes logs a previous (interrupted) run already archived; returns the rest."""
+        archived = {}
+        for entry in manifest["parts"].values():
+            for name, member in entry["members"].items():
+                archived[name] = (member["size"], member["sha256"])
+        remaining = []
+        for path in paths:
+            known = archived.get(os.path.basename(path))
+            if known and os.path.getsize(path) == known[0] and _sha256(path) == known[1]:
+                os.remove(path)
+            else:
+                remaining.append(path)
+        return remaining
+
+    def archive(self, now=None, manual=False, exclude=()):
+        """Archives old logs. Returns a summary: parts, files, bytes_in, bytes_out, failed, seconds."""
+        started = time.perf_counter()
+        summary = {"parts": 0, "files": 0, "bytes_in": 0, "bytes_out": 0, "failed": 0}
+        tasks = []
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        seq = 0
+        manifests = {}
+        for week_dir, paths in self.plan(self.candidates(now, manual, exclude)):
+            os.makedirs(week_dir, exist_ok=True)
+            manifest = manifests.setdefault(week_dir, load_manifest(week_dir))
+            paths = self._drop_archived(week_dir, manifest, paths)
+            if paths:
+                part_name = f"logs-{stamp}-{seq:03d}{CODECS[self.codec]}"
+                while part_name in manifest["parts"] or os.path.exists(os.path.join(week_dir, part_name)):
+                    seq += 1
+                    part_name = f"logs-{stamp}-{seq:03d}{CODECS[self.codec]}"
+                seq += 1
+                tasks.append((week_dir, part_name, self.codec, paths))
+
+        def finished(task, entry):
+            week_dir, part_name, _, paths = task
+            manifests[week_dir]["parts"][part_name] = entry
+            save_manifest(week_dir, manifests[week_dir])
+            for path in paths:
+                summary["bytes_in"] += entry["members"][os.path.basename(path)]["size"]
+                os.remove(path)
+            summary["parts"] += 1
+            summary["files"] += len(paths)
+            summary["bytes_out"] += entry["size"]
+
+        if len(tasks) <= 1 or self.workers <= 1:
+            for task in tasks:
+                try:
+                    finished(task, archive_part(*task))
+                except Exception:
+                    summary["failed"] += 1
+        else:
+            # Originals go as soon as their own part verifies, keeping disk use bounded
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [(task, pool.submit(archive_part, *task)) for task in tasks]
+                for task, future in futures:
+                    try:
+                        finished(task, future.result())
+                    except Exception:
+                        summary["failed"] += 1
+
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def verify(self, week_dir):
+        """Names of parts in week_dir whose contents no longer match the manifest."""
+        bad = []
+        manifest = load_manifest(week_dir)
+        for part_name, entry in manifest["parts"].items():
+            path = os.path.join(week_dir, part_name)
+            try:
+                found = read_members(path, entry["codec"])
+            except (OSError, EOFError, tarfile.TarError, lzma.LZMAError, ValueError):
+                bad.append(part_name)
+                continue
+            expected = {name: (m["size"], m["sha256"]) for name, m in entry["members"].items()}
+            if found != expected:
+                bad.append(part_name)
+        return bad
+
+    def purge(self, interval="Weekly", now=None):
+        """
+        The monitor's retention rule: anything under old/ last written before the cutoff is
+        deleted (parts carry their newest log's mtime), then empty folders go.
+        """
+        now = now if now is not None else time.time()
+        cutoff = now - purge_days(interval) * 86400
+        removed = 0
+        for root, dirs, files in os.walk(self.old_dir, topdown=False):
+            manifest = load_manifest(root) if MANIFEST in files else None
+            for name in files:
+                if name == MANIFEST:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                        if manifest:
+                            manifest["parts"].pop(name, None)
+                except OSError:
+                    pass
+            if manifest is not None:
+                save_manifest(root, manifest)
+            if root != self.old_dir:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+        return removed
+
+
+def _sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def run_maintenance(config, log_dir, manual_archive=False, manual_purge=False, exclude=()):
+    """Invoke-LogMaintenance: archive when autoArchive (or asked), purge when autoPurge (or asked)."""
+    manual = manual_archive or manual_purge
+    archiver = LogArchiver(log_dir, codec=config.get("archiveCodec"))
+    result = {}
+    if manual_archive or (not manual and config.get("autoArchive", True)):
+        result["archive"] = archiver.archive(manual=manual_archive, exclude=exclude)
+    if manual_purge or (not manual and config.get("autoPurge", False)):
+        result["purged"] = archiver.purge(config.get("purgeInterval", "Weekly"))
+    return result
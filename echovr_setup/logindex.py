@@ -0,0 +1,269 @@
+"""
+Searchable index of events pulled from r14 logs: link codes, session start/end, errors and
+crashes, players, PIDs and ports, kept in SQLite (FTS5 for free-text search where the
+sqlite build has it). Updates are incremental: loose logs are read from the last indexed
+byte, and logs that get archived are re-pointed at their part via its manifest.json
+without decompressing anything already indexed.
+"""
+import bisect
+import datetime
+import glob
+import json
+import os
+import re
+import sqlite3
+import tarfile
+import time
+
+from echovr_setup.logarchive import MANIFEST, decompressor
+from echovr_setup.logtail import ERRORS, LINK_CODE, LOG_NAME, SESSION_END, SESSION_START, Matcher
+
+PLAYER = Matcher("player", r"((?:OVR-ORG|OVR|DMO|STM|BOT)-\d{5,})\b")
+PORT = Matcher("port", r"-(?:http)?port\s+(\d+)")
+CRASH = Matcher("crash", r"\b(?i:crash(?:ed)?|access violation|unhandled exception|minidump)\b.*")
+
+EXTRACTORS = (LINK_CODE, SESSION_START, SESSION_END, ERRORS, CRASH, PLAYER, PORT)
+
+# r14 lines start with "[MM-DD-YYYY] [HH:MM:SS]:"
+TIMESTAMP = re.compile(r"^\[(\d\d)-(\d\d)-(\d{4})\] \[(\d\d):(\d\d):(\d\d)\]")
+NEWLINE = re.compile("\n")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs(
+    id INTEGER PRIMARY KEY, name TEXT UNIQUE, pid INTEGER, location TEXT,
+    size INTEGER, indexed_bytes INTEGER, line_no INTEGER, mtime REAL);
+CREATE TABLE IF NOT EXISTS events(
+    id INTEGER PRIMARY KEY, log_id INTEGER, line_no INTEGER, ts REAL, kind TEXT,
+    pid INTEGER, port INTEGER, player TEXT, value TEXT, line TEXT);
+CREATE INDEX IF NOT EXISTS events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS events_player ON events(player, ts);
+CREATE INDEX IF NOT EXISTS events_kind ON events(kind, ts);
+CREATE INDEX IF NOT EXISTS events_log ON events(log_id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(line, content='events', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts(rowid, line) VALUES (new.id, new.line);
+END;
+CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts(events_fts, rowid, line) VALUES ('delete', old.id, old.line);
+END;
+"""
+
+
+def parse_timestamp(line):
+    m = TIMESTAMP.match(line)
+    if not m:
+        return None
+    month, day, year, hour, minute, second = (int(g) for g in m.groups())
+    try:
+        return time.mktime((year, month, day, hour, minute, second, 0, 0, -1))
+    except (OverflowError, ValueError):
+        return None
+
+
+def parse_when(value):
+    """Epoch seconds from a number or an ISO date/time string (CLI --since/--until)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class LogIndex:
+    def __init__(self, db_path, log_dir, extractors=EXTRACTORS):
+        self.db_path = db_path
+        self.log_dir = log_dir
+        self.old_dir = os.path.join(log_dir, "old")
+        self.extractors = list(extractors)
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+
+    def close(self):
+        self.db.close()
+
+    # --- Indexing ---
+
+    def _events(self, log_id, pid, data, first_line_no, fallback_ts):
+        """
+        Runs each extractor's regex over the whole chunk (not line by line) and maps matches
+        back to their lines; most lines match nothing, so this stays in the regex engine.
+        """
+        text = data.decode("utf-8", "replace")
+        line_starts = None
+        rows = []
+        for extractor in self.extractors:
+            regex = extractor.regex
+            for m in regex.finditer(text):
+                if line_starts is None:
+                    line_starts = [0] + [nl.end() for nl in NEWLINE.finditer(text)]
+                index = bisect.bisect_right(line_starts, m.start()) - 1
+                start = line_starts[index]
+                end = line_starts[index + 1] - 1 if index + 1 < len(line_starts) else len(text)
+                line = text[start:end].rstrip("\r")
+                value = m.group(1) if regex.groups else m.group(0)
+                ts = parse_timestamp(line) or fallback_ts
+                rows.append((log_id, first_line_no + index, ts, extractor.name, pid,
+                             int(value) if extractor.name == "port" else None,
+                             value if extractor.name == "player" else None, value, line))
+        return rows
+
+    def _log_row(self, name, location, mtime):
+        row = self.db.execute("SELECT id, indexed_bytes, line_no FROM logs WHERE name = ?", (name,)).fetchone()
+        if row:
+            self.db.execute("UPDATE logs SET location = ? WHERE id = ?", (location, row[0]))
+            return row
+        m = LOG_NAME.search(name)
+        cur = self.db.execute("INSERT INTO logs(name, pid, location, size, indexed_bytes, line_no, mtime) VALUES (?, ?, ?, 0, 0, 0, ?)",
+                              (name, int(m.group(1)) if m else None, location, mtime))
+        return cur.lastrowid, 0, 0
+
+    def _index_stream(self, name, location, mtime, size, read_from, final=True):
+        """
+        Indexes a log past what's already indexed; read_from(offset) gives the remaining bytes.
+        A trailing line without a newline is left for next time unless the log is final.
+        """
+        log_id, indexed, line_no = self._log_row(name, location, mtime)
+        if size <= indexed:
+            return 0
+        data = read_from(indexed)
+        end = len(data) if final else data.rfind(b"\n") + 1
+        data = data[:end]
+        m = LOG_NAME.search(name)
+        rows = self._events(log_id, int(m.group(1)) if m else None, data, line_no, mtime)
+        self.db.executemany("INSERT INTO events(log_id, line_no, ts, kind, pid, port, player, value, line) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+        self.db.execute("UPDATE logs SET size = ?, indexed_bytes = ?, line_no = ?, mtime = ? WHERE id = ?",
+                        (size, indexed + end, line_no + lines, mtime, log_id))
+        return len(rows)
+
+    def _index_loose(self, path, seen):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        name = os.path.basename(path)
+        seen.add(name)
+
+        def read_from(offset):
+            with open(path, "rb") as f:
+                f.seek(offset)
+                return f.read(st.st_size - offset)
+
+        # Logs written in the last ten minutes may still be mid-line
+        final = time.time() - st.st_mtime >= 600
+        return self._index_stream(name, path, st.st_mtime, st.st_size, read_from, final)
+
+    def _index_part(self, week_dir, part_name, entry, seen):
+        """Re-points already indexed members at the part; only decompresses if a member has unindexed bytes."""
+        path = os.path.join(week_dir, part_name)
+        pending = {}
+        for name, member in entry["members"].items():
+            seen.add(name)
+            row = self.db.execute("SELECT indexed_bytes FROM logs WHERE name = ?", (name,)).fetchone()
+            if row and row[0] >= member["size"]:
+                self.db.execute("UPDATE logs SET location = ? WHERE name = ?", (path, name))
+            else:
+                pending[name] = member
+        if not pending:
+            return 0
+
+        added = 0
+        with open(path, "rb") as raw, decompressor(entry["codec"], raw) as stream, \
+                tarfile.open(fileobj=stream, mode="r|") as tar:
+            for info in tar:
+                member = pending.get(info.name)
+                if member is None:
+                    continue
+                data = tar.extractfile(info).read()
+                added += self._index_stream(info.name, path, member["mtime"], info.size, lambda offset: data[offset:])
+        return added
+
+    def update(self):
+        """Brings the index up to date. Returns the number of events added."""
+        seen = set()
+        added = 0
+        with self.db:
+            for manifest_path in glob.glob(os.path.join(self.old_dir, "*", MANIFEST)):
+                week_dir = os.path.dirname(manifest_path)
+                try:
+                    with open(manifest_path, "r") as f:
+                        parts = json.load(f)["parts"]
+                except (OSError, ValueError, KeyError):
+                    continue
+                for part_name, entry in parts.items():
+                    try:
+                        added += self._index_part(week_dir, part_name, entry, seen)
+                    except (OSError, EOFError, tarfile.TarError, ValueError):
+                        pass
+            for pattern in ("*.log", os.path.join("old", "*.log"), os.path.join("old", "Week_*", "*.log")):
+                for path in glob.glob(os.path.join(self.log_dir, pattern)):
+                    added += self._index_loose(path, seen)
+
+            # Logs that were purged take their events with them
+            gone = [(log_id,) for log_id, name in self.db.execute("SELECT id, name FROM logs") if name not in seen]
+            self.db.executemany("DELETE FROM events WHERE log_id = ?", gone)
+            self.db.executemany("DELETE FROM logs WHERE id = ?", gone)
+        return added
+
+    # --- Queries ---
+
+    def search(self, text=None, player=None, kind=None, pid=None, since=None, until=None, limit=100):
+        """
+        Events newest first, as dicts (ts, kind, pid, port, player, value, line, log, location).
+        text is an FTS5 query (e.g. an error signature in quotes) when available, else a substring;
+        text that isn't valid FTS5 syntax (e.g. foo.bar(1) failed) is searched as a substring too.
+        """
+        if text and self.fts:
+            try:
+                return self._search(text, True, player, kind, pid, since, until, limit)
+            except sqlite3.OperationalError:
+                pass
+        return self._search(text, False, player, kind, pid, since, until, limit)
+
+    def _search(self, text, fts, player, kind, pid, since, until, limit):
+        where, params = [], []
+        if text:
+            if fts:
+                where.append("e.id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+            else:
+                where.append("e.line LIKE ? ESCAPE '\\'")
+                text = "%" + re.sub(r"([\\%_])", r"\\\1", text) + "%"
+            params.append(text)
+        if player:
+            where.append("e.player = ?")
+            params.append(player)
+        if kind:
+            where.append("e.kind = ?")
+            params.append(kind)
+        if pid is not None:
+            where.append("e.pid = ?")
+            params.append(pid)
+        if since is not None:
+            where.append("e.ts >= ?")
+            params.append(parse_when(since))
+        if until is not None:
+            where.append("e.ts < ?")
+            params.append(parse_when(until))
+        sql = ("SELECT e.ts, e.kind, e.pid, e.port, e.player, e.value, e.line, l.name, l.location "
+               "FROM events e JOIN logs l ON l.id = e.log_id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.ts DESC, e.id DESC LIMIT ?"
+        params.append(limit)
+        keys = ("ts", "kind", "pid", "port", "player", "value", "line", "log", "location")
+        return [dict(zip(keys, row)) for row in self.db.execute(sql, params)]
+
+    def logs_for_player(self, player):
+        """Log names (and where they live now) a player appears in."""
+        return self.db.execute("SELECT DISTINCT l.name, l.location FROM events e JOIN logs l ON l.id = e.log_id "
+                               "WHERE e.player = ? ORDER BY l.mtime DESC", (player,)).fetchall()
@@ -0,0 +1,260 @@
+"""
+Incremental tailing of _local/r14logs. Keeps a PID -> newest "*_<pid>.log" index and a
+byte offset per file, so each poll only lists the folder when it changed and only reads
+bytes appended since the last poll. New lines are run through pluggable matchers.
+"""
+import ctypes
+import os
+import re
+import struct
+from collections import namedtuple
+
+LOG_NAME = re.compile(r"_(\d+)\.log$", re.IGNORECASE)
+
+# How far back to start when a log is first seen (the monitor looked at the last 15 lines)
+TAIL_START = 64 * 1024
+MAX_PARTIAL = 64 * 1024
+
+LogEvent = namedtuple("LogEvent", "pid path matcher value line")
+
+
+class Matcher:
+    """Named regex; match(line) returns group 1 (or the whole match if there are no groups), else None."""
+
+    def __init__(self, name, pattern, flags=0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+
+    def match(self, line):
+        m = self.regex.search(line)
+        if not m:
+            return None
+        return m.group(1) if self.regex.groups else m.group(0)
+
+
+LINK_CODE = Matcher("link_code", r">>>\s*([A-Z0-9]+)\s*<<<")
+# Case is spelled out in the leading word rather than with re.IGNORECASE so the regex engine
+# can still look for its first letters; the log indexer runs these over whole files.
+ERRORS = Matcher("error", r"\b(?:ERROR|FATAL|Fatal error|Exception)\b.*")
+SESSION_START = Matcher("session_start", r"\b[Ss][Ee][Ss][Ss][Ii][Oo][Nn]\b.*\b(?i:started|starting|created|loaded)\b")
+SESSION_END = Matcher("session_end", r"\b[Ss][Ee][Ss][Ss][Ii][Oo][Nn]\b.*\b(?i:ended|ending|terminated|closed)\b")
+
+DEFAULT_MATCHERS = (LINK_CODE, ERRORS, SESSION_START, SESSION_END)
+
+
+# --- Change notification ---
+
+class PollingWatcher:
+    """Fallback: the folder's mtime changes when logs are created, renamed or deleted."""
+
+    exact = False
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.mtime = None
+
+    def changes(self):
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.mtime:
+            self.mtime = mtime
+            return None
+        return set()
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux: reports exactly which files were created, written, moved or deleted."""
+
+    exact = True
+    IN_MODIFY, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE, IN_Q_OVERFLOW = 0x2, 0x40, 0x80, 0x100, 0x200, 0x4000
+    IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.first = True
+
+    def changes(self):
+        if self.first:
+            self.first = False
+            return None
+        names = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset + 16 <= len(buf):
+                _, mask, _, length = struct.unpack_from("iIII", buf, offset)
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                names.add(os.fsdecode(buf[offset + 16:offset + 16 + length].rstrip(b"\0")))
+                offset += 16 + length
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ChangeNotificationWatcher:
+    """
+    Windows: FindFirstChangeNotification says the folder changed, not which file. It only
+    watches file names (logs created, renamed or deleted); appends don't need a rescan, as
+    every poll reads whatever was added to the indexed logs anyway.
+    """
+
+    exact = False
+    FILE_NOTIFY_CHANGE_FILE_NAME = 0x1
+
+    def __init__(self, directory):
+        self.kernel32 = ctypes.windll.kernel32
+        self.kernel32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        self.handle = self.kernel32.FindFirstChangeNotificationW(directory, False, self.FILE_NOTIFY_CHANGE_FILE_NAME)
+        if self.handle in (None, ctypes.c_void_p(-1).value):
+            raise OSError(f"FindFirstChangeNotification failed for {directory}")
+        self.first = True
+
+    def changes(self):
+        if self.first:
+            self.first = False
+            return None
+        if self.kernel32.WaitForSingleObject(ctypes.c_void_p(self.handle), 0) != 0:
+            return set()
+        self.kernel32.FindNextChangeNotification(ctypes.c_void_p(self.handle))
+        return None
+
+    def close(self):
+        self.kernel32.FindCloseChangeNotification(ctypes.c_void_p(self.handle))
+
+
+def make_watcher(directory):
+    try:
+        if os.name == "nt":
+            return ChangeNotificationWatcher(directory)
+        if hasattr(os, "fsencode") and os.path.exists("/proc/sys/fs/inotify"):
+            return InotifyWatcher(directory)
+    except (OSError, AttributeError):
+        pass
+    return PollingWatcher(directory)
+
+
+# --- Tailer ---
+
+class LogTailer:
+    def __init__(self, log_dir, matchers=DEFAULT_MATCHERS, watcher=None):
+        self.log_dir = log_dir
+        self.matchers = list(matchers)
+        self.watcher = watcher
+        self.index = {}      # pid -> (path, mtime_ns) of its newest log
+        self.offsets = {}    # path -> bytes already consumed
+        self.partial = {}    # path -> trailing bytes without a newline yet
+
+    def log_for(self, pid):
+        entry = self.index.get(pid)
+        return entry[0] if entry else None
+
+    def _consider(self, name, st):
+        m = LOG_NAME.search(name)
+        if not m:
+            return
+        pid = int(m.group(1))
+        path = os.path.join(self.log_dir, name)
+        current = self.index.get(pid)
+        if current is None or current[0] == path or st.st_mtime_ns >= current[1]:
+            self.index[pid] = (path, st.st_mtime_ns)
+
+    def _rescan(self):
+        self.index = {}
+        try:
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self._consider(entry.name, entry.stat())
+        except OSError:
+            pass
+        live = {path for path, _ in self.index.values()}
+        for path in [p for p in self.offsets if p not in live]:
+            self.offsets.pop(path, None)
+            self.partial.pop(path, None)
+
+    def _update(self, name):
+        path = os.path.join(self.log_dir, name)
+        try:
+            self._consider(name, os.stat(path))
+        except OSError:
+            m = LOG_NAME.search(name)
+            if m and self.log_for(int(m.group(1))) == path:
+                del self.index[int(m.group(1))]
+            self.offsets.pop(path, None)
+            self.partial.pop(path, None)
+
+    def _read_new(self, path):
+        """Lines appended since the last read (complete lines only)."""
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                offset = self.offsets.get(path)
+                skip_partial = False
+                if offset is None:
+                    offset = max(0, size - TAIL_START)
+                    skip_partial = offset > 0
+                elif size < offset:
+                    # Truncated or replaced
+                    offset = 0
+                    self.partial.pop(path, None)
+                if size == offset:
+                    self.offsets[path] = offset
+                    return []
+                f.seek(offset)
+                data = f.read(size - offset)
+        except OSError:
+            return []
+
+        self.offsets[path] = offset + len(data)
+        data = self.partial.pop(path, b"") + data
+        lines = data.split(b"\n")
+        tail = lines.pop()
+        if tail:
+            self.partial[path] = tail[-MAX_PARTIAL:]
+        if skip_partial and lines:
+            lines.pop(0)
+        return [line.rstrip(b"\r").decode("utf-8", "replace") for line in lines]
+
+    def poll(self, pids=None):
+        """Reads whatever was appended to the logs of pids (all indexed logs if None). Returns LogEvents."""
+        if self.watcher is None:
+            self.watcher = make_watcher(self.log_dir)
+        changes = self.watcher.changes()
+        if changes is None:
+            self._rescan()
+        else:
+            for name in changes:
+                self._update(name)
+
+        targets = self.index if pids is None else {pid: self.index[pid] for pid in pids if pid in self.index}
+        events = []
+        for pid, (path, _) in targets.items():
+            if self.watcher.exact and changes is not None and path in self.offsets and \
+                    os.path.basename(path) not in changes:
+                continue
+            for line in self._read_new(path):
+                for matcher in self.matchers:
+                    value = matcher.match(line)
+                    if value is not None:
+                        events.append(LogEvent(pid, path, matcher.name, value, line))
+        return events
+
+    def close(self):
+        if self.watcher:
+            self.watcher.close()
@@ -0,0 +1,245 @@
+"""
+Chunked Merkle-tree verification for the multi-GB rad15 package files. Each file is hashed
+in fixed-size chunks (memory-mapped, spread over a worker pool) into a tree whose leaves
+are the chunk digests. Trees are persisted next to setup.json, so a later check:
+
+- re-hashes only the files whose size or mtime changed (everything if full=True),
+- spot-checks a rotating sample of chunks from the unchanged files, so silent corruption
+  that keeps the size and mtime is still found within a few runs, and
+- walks the old and new trees to report the exact byte ranges that differ.
+"""
+import hashlib
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# A multiple of mmap.ALLOCATIONGRANULARITY (64 KiB on Windows), so chunks map directly
+CHUNK_SIZE = 4 * 1024 * 1024
+STORE_VERSION = 1
+# Chunks of unchanged files re-hashed per check (64 x 4 MiB = 256 MiB)
+SAMPLE_CHUNKS = 64
+
+
+def hash_chunk(path, offset, length):
+    """SHA-256 of path[offset:offset + length], read through a mapping of just that range."""
+    if not length:
+        return hashlib.sha256().digest()
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), length, offset=offset, access=mmap.ACCESS_READ) as view:
+            return hashlib.sha256(view).digest()
+
+
+def build_tree(leaves):
+    """Levels from leaves up to [root]; an odd node out is promoted unchanged."""
+    levels = [list(leaves) or [hashlib.sha256().digest()]]
+    while len(levels[-1]) > 1:
+        below = levels[-1]
+        levels.append([hashlib.sha256(below[i] + below[i + 1]).digest() if i + 1 < len(below) else below[i]
+                       for i in range(0, len(below), 2)])
+    return levels
+
+
+def changed_leaves(old, new):
+    """Indexes of the leaves that differ between two trees, descending only into subtrees that differ."""
+    if len(old[0]) != len(new[0]):
+        # A resize shifts the tree shape; compare leaf by leaf, extra or missing ones count as changed
+        count = max(len(old[0]), len(new[0]))
+        return [i for i in range(count) if i >= len(old[0]) or i >= len(new[0]) or old[0][i] != new[0][i]]
+    changed = []
+    stack = [(len(new) - 1, 0)]
+    while stack:
+        level, index = stack.pop()
+        if old[level][index] == new[level][index]:
+            continue
+        if level == 0:
+            changed.append(index)
+            continue
+        stack.extend((level - 1, child) for child in (2 * index + 1, 2 * index) if child < len(new[level - 1]))
+    return sorted(changed)
+
+
+def leaf_ranges(indexes, chunk_size, size):
+    """Merged [start, end) byte ranges covered by the given leaves of a file of size bytes."""
+    ranges = []
+    for i in indexes:
+        start, end = i * chunk_size, max(min((i + 1) * chunk_size, size), i * chunk_size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+
+class TreeVerifier:
+    """
+    Verifies the files under some folders of root against trees saved in store_path.
+    Hashing runs on a thread pool by default (hashlib releases the GIL on large buffers);
+    processes=True uses a process pool instead.
+    """
+
+    def __init__(self, root, store_path, chunk_size=CHUNK_SIZE, workers=None, processes=False):
+        self.root = root
+        self.store_path = store_path
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.processes = processes
+        # Where the next spot-check starts in the chunks of all tracked files
+        self.sample_cursor = 0
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.store_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != STORE_VERSION or data.get("chunkSize") != self.chunk_size:
+            return {}
+        self.sample_cursor = data.get("sampleCursor", 0)
+        return data.get("files", {})
+
+    def save(self):
+        tmp_path = f"{self.store_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": STORE_VERSION, "chunkSize": self.chunk_size, "sampleCursor": self.sample_cursor,
+                       "files": self.entries}, f)
+        os.replace(tmp_path, self.store_path)
+
+    def files(self, dirs):
+        """Paths relative to root (with /) of every file under dirs."""
+        found = []
+        for d in dirs:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, *d.split("/"))):
+                rel_dir = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+                found += [f"{rel_dir}/{name}" for name in filenames]
+        return sorted(found)
+
+    def tracked(self, dirs):
+        prefixes = tuple(d.rstrip("/") + "/" for d in dirs)
+        return sorted(rel for rel in self.entries if rel.startswith(prefixes))
+
+    def forget(self, dirs):
+        for rel in self.tracked(dirs):
+            del self.entries[rel]
+
+    def hash_files(self, rels, progress=None):
+        """{rel: (size, mtime_ns, levels)}. Chunks of every file share one pool, so many small files scale too."""
+        plan = {}
+        for rel in rels:
+            st = os.stat(os.path.join(self.root, *rel.split("/")))
+            plan[rel] = (st.st_size, st.st_mtime_ns, range(0, st.st_size, self.chunk_size) if st.st_size else [0])
+        total = sum(size for size, _, _ in plan.values())
+        done = 0
+        pool_type = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        with pool_type(max_workers=self.workers) as pool:
+            futures = {rel: [(pool.submit(hash_chunk, os.path.join(self.root, *rel.split("/")), offset,
+                                          min(self.chunk_size, size - offset)), min(self.chunk_size, size - offset))
+                             for offset in offsets]
+                       for rel, (size, _, offsets) in plan.items()}
+            trees = {}
+            for rel, chunks in futures.items():
+                leaves = []
+                for future, length in chunks:
+                    leaves.append(future.result())
+                    done += length
+                    if progress:
+                        progress(done, total)
+                size, mtime, _ = plan[rel]
+                trees[rel] = (size, mtime, build_tree(leaves))
+        return trees
+
+    def spot_check(self, rels, count):
+        """
+        Re-hashes count chunks of the given (unchanged) files, carrying on from where the last
+        spot-check stopped and wrapping around, and compares them with the saved leaves.
+        Returns ({rel: [leaf indexes that differ]}, chunks checked, bytes read).
+        """
+        leaves = [(rel, i) for rel in rels for i in range(len(self.entries[rel]["levels"][0]))]
+        if not leaves or count <= 0:
+            return {}, 0, 0
+        start = self.sample_cursor % len(leaves)
+        picked = [leaves[(start + n) % len(leaves)] for n in range(min(count, len(leaves)))]
+        self.sample_cursor = (start + len(picked)) % len(leaves)
+
+        bad, read = {}, 0
+        pool_type = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        with pool_type(max_workers=self.workers) as pool:
+            futures = []
+            for rel, i in picked:
+                offset = i * self.chunk_size
+                length = max(0, min(self.chunk_size, self.entries[rel]["size"] - offset))
+                path = os.path.join(self.root, *rel.split("/"))
+                futures.append((rel, i, length, pool.submit(hash_chunk, path, offset, length)))
+            for rel, i, length, future in futures:
+                read += length
+                if future.result().hex() != self.entries[rel]["levels"][0][i]:
+                    bad.setdefault(rel, []).append(i)
+        return bad, len(picked), read
+
+    def _entry(self, size, mtime, levels):
+        return {"size": size, "mtime": mtime, "levels": [[h.hex() for h in level] for level in levels]}
+
+    def record(self, dirs, progress=None):
+        """Hashes every file under dirs and saves the trees as the known-good state. Returns the file count."""
+        self.forget(dirs)
+        for rel, tree in self.hash_files(self.files(dirs), progress).items():
+            self.entries[rel] = self._entry(*tree)
+        self.save()
+        return len(self.tracked(dirs))
+
+    def verify(self, dirs, full=False, record_new=True, progress=None, sample=SAMPLE_CHUNKS):
+        """
+        Checks the tracked files under dirs. Files with a new size or mtime are re-hashed in
+        full; of the unchanged ones only sample chunks are (see spot_check), unless full.
+        Files under dirs with no saved tree are hashed and recorded if record_new.
+        Returns {"checked", "hashed", "sampled", "bytes", "seconds",
+        "corrupt": {rel: [[start, end], ...]}, "missing": [...], "recorded": [...]}.
+        """
+        started = time.perf_counter()
+        tracked = self.tracked(dirs)
+        present = set(self.files(dirs))
+        missing = [rel for rel in tracked if rel not in present]
+        new = sorted(present - set(tracked)) if record_new else []
+
+        to_hash, unchanged = list(new), []
+        for rel in tracked:
+            if rel in missing:
+                continue
+            entry = self.entries[rel]
+            st = os.stat(os.path.join(self.root, *rel.split("/")))
+            if full or st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime"]:
+                to_hash.append(rel)
+            else:
+                unchanged.append(rel)
+
+        bad, sampled, sampled_bytes = self.spot_check(unchanged, sample)
+        corrupt = {}
+        for rel, indexes in bad.items():
+            corrupt[rel] = leaf_ranges(indexes, self.chunk_size, self.entries[rel]["size"])
+            # Stale stat: the whole file is re-hashed (and reported) on every check until re-recorded
+            self.entries[rel]["mtime"] = None
+        trees = self.hash_files(to_hash, progress)
+        for rel, (size, mtime, levels) in trees.items():
+            if rel in self.entries:
+                old = [[bytes.fromhex(h) for h in level] for level in self.entries[rel]["levels"]]
+                changed = changed_leaves(old, levels)
+                if changed or size != self.entries[rel]["size"]:
+                    corrupt[rel] = leaf_ranges(changed, self.chunk_size, max(size, self.entries[rel]["size"]))
+                    continue
+            # Matches (or is new): remember the current stat so the next check can skip it
+            self.entries[rel] = self._entry(size, mtime, levels)
+        if trees or sampled:
+            self.save()
+
+        return {
+            "checked": len(tracked) - len(missing) + len(new),
+            "hashed": len(trees),
+            "sampled": sampled,
+            "bytes": sum(size for size, _, _ in trees.values()) + sampled_bytes,
+            "seconds": round(time.perf_counter() - started, 3),
+            "corrupt": corrupt,
+            "missing": missing,
+            "recorded": new,
+        }
@@ -0,0 +1,121 @@
+"""
+Prometheus text-format /metrics for the supervisor: per-instance state plus histograms of
+session-poll latency and spawn-to-ready time. Served from the supervisor's own event loop.
+"""
+import asyncio
+import bisect
+import time
+
+POLL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.8)
+READY_BUCKETS = (1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect and an increment."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, out):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            out.append(f'{name}_bucket{{le="{bound}"}} {running}')
+        out.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum {self.sum}")
+        out.append(f"{name}_count {self.count}")
+
+
+class SupervisorMetrics:
+    def __init__(self):
+        self.poll_latency = Histogram(POLL_BUCKETS)
+        self.spawn_ready = Histogram(READY_BUCKETS)
+        self.restarts = {}
+
+    def record_exit(self, gs_port):
+        self.restarts[gs_port] = self.restarts.get(gs_port, 0) + 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _family(out, name, kind, help_text):
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} {kind}")
+
+
+def render(supervisor, now=None):
+    """The supervisor's current state in Prometheus text format."""
+    now = now if now is not None else time.monotonic()
+    metrics = supervisor.metrics
+    instances = supervisor.instances
+    labels = [f'port="{i.gs}",pid="{i.pid}"' for i in instances]
+    out = []
+
+    _family(out, "echovr_instances_running", "gauge", "Running echovr.exe instances.")
+    out.append(f"echovr_instances_running {len(instances)}")
+    _family(out, "echovr_instances_target", "gauge", "amountOfInstances from monitor.json.")
+    out.append(f"echovr_instances_target {supervisor.current_config()['amountOfInstances']}")
+    _family(out, "echovr_tick_seconds", "gauge", "Duration of the last supervisor tick.")
+    out.append(f"echovr_tick_seconds {supervisor.last_tick}")
+
+    _family(out, "echovr_instance_up", "gauge", "1 if the instance answered its last poll.")
+    out.extend(f"echovr_instance_up{{{lb}}} {int(i.online)}" for lb, i in zip(labels, instances))
+    _family(out, "echovr_instance_players", "gauge", "Connected players, spectators included.")
+    out.extend(f"echovr_instance_players{{{lb}}} {i.session.players}" for lb, i in zip(labels, instances))
+    _family(out, "echovr_instance_spectators", "gauge", "Connected spectators.")
+    out.extend(f"echovr_instance_spectators{{{lb}}} {i.session.spectators}" for lb, i in zip(labels, instances))
+    _family(out, "echovr_instance_mode", "gauge", "Current mode (idle, lobby, match or unknown).")
+    for lb, i in zip(labels, instances):
+        s = i.session
+        out.append(f'echovr_instance_mode{{{lb},mode="{s.kind}",match_type="{_escape(s.match_type or "")}",'
+                   f'map="{_escape(s.map_name or "")}"}} 1')
+    _family(out, "echovr_instance_uptime_seconds", "gauge", "Seconds since the instance was spawned.")
+    out.extend(f"echovr_instance_uptime_seconds{{{lb}}} {now - i.started_at:.1f}"
+               for lb, i in zip(labels, instances) if i.started_at is not None)
+
+    _family(out, "echovr_instance_restarts_total", "counter", "Instances that exited on this port.")
+    out.extend(f'echovr_instance_restarts_total{{port="{port}"}} {count}' for port, count in sorted(metrics.restarts.items()))
+
+    _family(out, "echovr_session_poll_seconds", "histogram", "Latency of /session polls.")
+    metrics.poll_latency.render("echovr_session_poll_seconds", out)
+    _family(out, "echovr_spawn_ready_seconds", "histogram", "Time from spawn to the first answered /session poll.")
+    metrics.spawn_ready.render("echovr_spawn_ready_seconds", out)
+
+    out.append("")
+    return "\n".join(out)
+
+
+async def serve_metrics(supervisor, host="127.0.0.1", port=9100):
+    """Starts the /metrics listener on the running loop and returns the asyncio server."""
+
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            path = request.split(b" ", 2)[1].split(b"?")[0]
+            if path == b"/metrics":
+                status, content_type, body = "200 OK", CONTENT_TYPE, render(supervisor).encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,270 @@
+"""
+Pure-Python network topology probes (no tracert): first-hop discovery, WAN IP lookup,
+and a TTL-1 reachability test for CGNAT detection. Results are cached against a
+fingerprint of the default gateway and WAN IP.
+"""
+import ctypes
+import os
+import select
+import socket
+import struct
+import time
+import urllib.request
+
+URL_IPIFY = "https://api.ipify.org"
+
+# Where the first hop is probed from when looking for a UniFi gateway
+UNIFI_TARGET = "1.1.1.1"
+
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Linux socket options, not always exported by the socket module
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ICMP = 2
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACH = 3
+ICMP_TIME_EXCEEDED = 11
+
+# Windows IcmpSendEcho status codes
+IP_SUCCESS = 0
+IP_TTL_EXPIRED_TRANSIT = 11013
+
+
+class HttpReflector:
+    """Asks an HTTP "what is my IP" service (api.ipify.org by default) for the WAN address."""
+
+    def __init__(self, url=URL_IPIFY, timeout=3):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            return response.read().decode("utf8").strip()
+
+
+# --- Default gateway ---
+
+def _gateway_linux():
+    with open("/proc/net/route", "r") as f:
+        for line in f.readlines()[1:]:
+            fields = line.split()
+            # Default route with the RTF_GATEWAY flag
+            if len(fields) > 3 and fields[1] == "00000000" and int(fields[3], 16) & 2:
+                return socket.inet_ntoa(struct.pack("<I", int(fields[2], 16)))
+    return None
+
+
+class MIB_IPFORWARDROW(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_ulong) for name in (
+        "dwForwardDest", "dwForwardMask", "dwForwardPolicy", "dwForwardNextHop", "dwForwardIfIndex",
+        "dwForwardType", "dwForwardProto", "dwForwardAge", "dwForwardNextHopAS",
+        "dwForwardMetric1", "dwForwardMetric2", "dwForwardMetric3", "dwForwardMetric4", "dwForwardMetric5")]
+
+
+def _ip_to_dword(ip):
+    return struct.unpack("<I", socket.inet_aton(ip))[0]
+
+
+def _dword_to_ip(value):
+    return socket.inet_ntoa(struct.pack("<I", value))
+
+
+def _gateway_windows():
+    row = MIB_IPFORWARDROW()
+    if ctypes.windll.iphlpapi.GetBestRoute(_ip_to_dword(UNIFI_TARGET), 0, ctypes.byref(row)) != 0:
+        return None
+    return _dword_to_ip(row.dwForwardNextHop) if row.dwForwardNextHop else None
+
+
+def default_gateway():
+    try:
+        if os.name == "nt":
+            return _gateway_windows()
+        if os.path.exists("/proc/net/route"):
+            return _gateway_linux()
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+# --- TTL-limited probes ---
+
+class IP_OPTION_INFORMATION(ctypes.Structure):
+    _fields_ = [("Ttl", ctypes.c_ubyte), ("Tos", ctypes.c_ubyte), ("Flags", ctypes.c_ubyte),
+                ("OptionsSize", ctypes.c_ubyte), ("OptionsData", ctypes.c_void_p)]
+
+
+class ICMP_ECHO_REPLY_T(ctypes.Structure):
+    _fields_ = [("Address", ctypes.c_ulong), ("Status", ctypes.c_ulong), ("RoundTripTime", ctypes.c_ulong),
+                ("DataSize", ctypes.c_ushort), ("Reserved", ctypes.c_ushort), ("Data", ctypes.c_void_p),
+                ("Options", IP_OPTION_INFORMATION)]
+
+
+def _probe_windows(dest, ttl, timeout):
+    """ICMP echo with a TTL through IcmpSendEcho, which needs no admin rights."""
+    iphlpapi = ctypes.windll.iphlpapi
+    iphlpapi.IcmpCreateFile.restype = ctypes.c_void_p
+    handle = iphlpapi.IcmpCreateFile()
+    try:
+        payload = b"echovr-setup"
+        options = IP_OPTION_INFORMATION(Ttl=ttl)
+        reply_buf = ctypes.create_string_buffer(ctypes.sizeof(ICMP_ECHO_REPLY_T) + len(payload) + 8)
+        iphlpapi.IcmpSendEcho(ctypes.c_void_p(handle), _ip_to_dword(dest), payload, len(payload),
+                              ctypes.byref(options), reply_buf, len(reply_buf), int(timeout * 1000))
+        reply = ICMP_ECHO_REPLY_T.from_buffer(reply_buf)
+        if not reply.Address:
+            return None, False
+        hop = _dword_to_ip(reply.Address)
+        if reply.Status == IP_SUCCESS:
+            return hop, True
+        if reply.Status == IP_TTL_EXPIRED_TRANSIT:
+            return hop, False
+        return None, False
+    finally:
+        iphlpapi.IcmpCloseHandle(ctypes.c_void_p(handle))
+
+
+def _read_errqueue(sock, dest):
+    """Turns a queued ICMP error (IP_RECVERR) into (hop, reached)."""
+    _, ancdata, _, _ = sock.recvmsg(512, 512, MSG_ERRQUEUE | socket.MSG_DONTWAIT)
+    for level, kind, data in ancdata:
+        if level != socket.IPPROTO_IP or kind != IP_RECVERR or len(data) < 24:
+            continue
+        _, origin, icmp_type, _, _, _, _ = struct.unpack("=IBBBBII", data[:16])
+        if origin != SO_EE_ORIGIN_ICMP:
+            continue
+        hop = socket.inet_ntoa(data[20:24])
+        if icmp_type == ICMP_TIME_EXCEEDED:
+            return hop, False
+        if icmp_type == ICMP_DEST_UNREACH:
+            return hop, hop == dest
+    return None, False
+
+
+def _probe_linux(dest, ttl, timeout):
+    """
+    Unprivileged probes: an ICMP "ping" datagram socket where net.ipv4.ping_group_range
+    allows it, else UDP to a high port. TTL expiry arrives on the socket error queue.
+    """
+    for proto in (socket.IPPROTO_ICMP, socket.IPPROTO_UDP):
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, proto)
+        except OSError:
+            continue
+        with sock:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+            sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+            if proto == socket.IPPROTO_ICMP:
+                # Echo request; the kernel fills in the identifier and checksum
+                sock.sendto(struct.pack("!BBHHH", 8, 0, 0, 0, ttl) + b"echovr-setup", (dest, 0))
+            else:
+                sock.sendto(b"echovr-setup", (dest, 33434 + ttl))
+
+            poller = select.poll()
+            poller.register(sock, select.POLLIN | select.POLLERR)
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not poller.poll(int(remaining * 1000)):
+                    return None, False
+                try:
+                    return _read_errqueue(sock, dest)
+                except BlockingIOError:
+                    pass
+                data, addr = sock.recvfrom(512)
+                if proto == socket.IPPROTO_ICMP and data and data[0] == ICMP_ECHO_REPLY:
+                    return addr[0], True
+    return None
+
+
+def probe_hop(dest, ttl, timeout=1.0):
+    """
+    Sends one TTL-limited probe toward dest. Returns (hop_ip, reached): the router that
+    answered (or None on silence) and whether dest itself answered. Returns None if
+    this platform can't send such probes.
+    """
+    try:
+        if os.name == "nt":
+            return _probe_windows(dest, ttl, timeout)
+        if hasattr(select, "poll") and hasattr(socket.socket, "recvmsg"):
+            return _probe_linux(dest, ttl, timeout)
+    except (OSError, AttributeError, ctypes.ArgumentError):
+        return None
+    return None
+
+
+def reverse_name(ip):
+    try:
+        return socket.gethostbyaddr(ip)[0]
+    except (OSError, UnicodeError):
+        return ""
+
+
+# --- Engine ---
+
+class NetworkProbe:
+    """
+    Works out hasUnifi / checkCGNAT. reflector returns the WAN IP, prober sends a single
+    TTL-limited probe (see probe_hop) and resolver maps an IP to a hostname; all three can
+    be swapped out, e.g. for a local stand-in when testing.
+    """
+
+    def __init__(self, reflector=None, prober=probe_hop, resolver=reverse_name, gateway=default_gateway,
+                 ttl=DEFAULT_TTL, attempts=3, timeout=1.0):
+        self.reflector = reflector or HttpReflector()
+        self.prober = prober
+        self.resolver = resolver
+        self.gateway = gateway
+        self.ttl = ttl
+        self.attempts = attempts
+        self.timeout = timeout
+
+    def fingerprint(self):
+        try:
+            wan_ip = self.reflector()
+        except Exception:
+            wan_ip = None
+        return {"gateway": self.gateway(), "wanIp": wan_ip}
+
+    def is_fresh(self, cached, fingerprint, now=None):
+        if not cached:
+            return False
+        now = now if now is not None else time.time()
+        return cached.get("gateway") == fingerprint["gateway"] and \
+            cached.get("wanIp") == fingerprint["wanIp"] and \
+            now - cached.get("checkedAt", 0) < self.ttl
+
+    def _first_answer(self, dest, ttl):
+        for _ in range(self.attempts):
+            result = self.prober(dest, ttl, self.timeout)
+            if result is None:
+                return None
+            if result[0]:
+                return result
+        return None, False
+
+    def detect_unifi(self, gateway):
+        """UniFi gateways reverse-resolve to a *unifi* name (what tracert's first hop showed)."""
+        hop = self._first_answer(UNIFI_TARGET, 1)
+        first_hop = hop[0] if hop and hop[0] else gateway
+        return bool(first_hop) and "unifi" in self.resolver(first_hop).lower()
+
+    def detect_cgnat(self, wan_ip):
+        """"Pass" when our own WAN IP answers at TTL 1, i.e. it lives on the first router, not behind a carrier NAT."""
+        if not wan_ip:
+            return "Fail"
+        hop = self._first_answer(wan_ip, 1)
+        return "Pass" if hop and hop[1] else "Fail"
+
+    def check(self, cached=None):
+        """Returns a result entry (gateway, wanIp, checkedAt, hasUnifi, checkCGNAT), reusing cached while it's fresh."""
+        fingerprint = self.fingerprint()
+        if self.is_fresh(cached, fingerprint):
+            return cached
+
+        entry = dict(fingerprint)
+        entry["hasUnifi"] = self.detect_unifi(fingerprint["gateway"])
+        entry["checkCGNAT"] = self.detect_cgnat(fingerprint["wanIp"])
+        entry["checkedAt"] = time.time()
+        return entry
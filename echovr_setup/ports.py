@@ -0,0 +1,120 @@
+"""
+Port planning: probes the GS/API port range for ports that are already taken and hands
+out pairs around them, the same way the monitor pairs them (GS = base + 2i, API = GS + 1).
+"""
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_PORT = 65535
+
+
+class PortPlanError(Exception):
+    pass
+
+
+def port_free(port, host="0.0.0.0"):
+    """True if both a TCP and a UDP socket can bind the port."""
+    for kind in (socket.SOCK_STREAM, socket.SOCK_DGRAM):
+        try:
+            with socket.socket(socket.AF_INET, kind) as sock:
+                sock.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def occupied_ports(ports, max_workers=32, check=port_free):
+    """Probes every port in parallel and returns the set that can't be bound."""
+    ports = list(ports)
+    if not ports:
+        return set()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ports))) as pool:
+        return {port for port, free in zip(ports, pool.map(check, ports)) if not free}
+
+
+def plan_ports(num_instances, base_port, occupied=occupied_ports):
+    """
+    Returns num_instances (gs, api) pairs starting at base_port, skipping any pair with a
+    taken port. Probing is done a window at a time, growing only by the pairs still missing.
+    """
+    pairs = []
+    next_gs = base_port
+    while len(pairs) < num_instances:
+        missing = num_instances - len(pairs)
+        window = [next_gs + 2 * i for i in range(missing) if next_gs + 2 * i + 1 <= MAX_PORT]
+        if not window:
+            raise PortPlanError(f"Only {len(pairs)} of {num_instances} port pairs are free between {base_port} and {MAX_PORT}.")
+        taken = occupied([p for gs in window for p in (gs, gs + 1)])
+        pairs.extend((gs, gs + 1) for gs in window if gs not in taken and gs + 1 not in taken)
+        next_gs = window[-1] + 2
+    return pairs
+
+
+def port_ranges(pairs):
+    """Collapses the planned pairs into contiguous (lower, upper) ranges for forwarding."""
+    ranges = []
+    for gs, api in sorted(pairs):
+        if ranges and ranges[-1][1] + 1 == gs:
+            ranges[-1][1] = api
+        else:
+            ranges.append([gs, api])
+    return [tuple(r) for r in ranges]
+
+
+def format_ranges(ranges):
+    return ", ".join(f"{lower}-{upper}" for lower, upper in ranges)
+
+
+def plan_entries(pairs, base_port):
+    """
+    The plan in the monitor's ports.json entry shape, keyed by instance slot. BasePort is the
+    base the plan was made from; the monitor and supervisor only follow a plan made from
+    their own basePort.
+    """
+    return {str(slot): {"GS": gs, "API": api, "GS_Confirmed": None, "API_Confirmed": None, "LogPath": None,
+                        "BasePort": base_port}
+            for slot, (gs, api) in enumerate(pairs)}
+
+
+def save_plan(path, pairs, base_port):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(plan_entries(pairs, base_port), f)
+    os.replace(tmp_path, path)
+
+
+def _read_entries(path):
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            entries = json.load(f)
+        return [e for _, e in sorted(entries.items(), key=lambda kv: int(kv[0]))]
+    except (OSError, ValueError, KeyError, AttributeError):
+        return []
+
+
+def load_plan(path):
+    """The (gs, api) pairs of a plan, or of a ports.json written by the monitor/supervisor."""
+    try:
+        return [(e["GS"], e["API"]) for e in _read_entries(path)]
+    except (KeyError, TypeError):
+        return []
+
+
+def planned_pairs(path, base_port, count):
+    """
+    The first count pairs instances should run on, in order: the plan's pairs when it was
+    made from base_port, then further pairs right after its last one; without a matching
+    plan, base_port + 2i like the monitor always did. Get-PlannedPortPairs in
+    EchoVR-Server-Monitor.ps1 does the same.
+    """
+    entries = _read_entries(path)
+    pairs = []
+    if entries and all(e.get("BasePort") == base_port for e in entries):
+        pairs = load_plan(path)[:count]
+    next_gs = pairs[-1][0] + 2 if pairs else base_port
+    while len(pairs) < count and next_gs + 1 <= MAX_PORT:
+        pairs.append((next_gs, next_gs + 1))
+        next_gs += 2
+    return pairs
@@ -0,0 +1,312 @@
+"""
+Reader/writer for rad15 game data (build 5932408047), enough to replace files inside a
+package the way `evrFileTools -mode replace` does, without the external tool.
+
+A package is a manifest (manifests/<name>) plus data files (packages/<name>_<n>). Data
+files are a run of zstd frames; each frame holds several game files back to back. The
+manifest, itself zstd-compressed behind a small header, lists:
+
+    contents    (type symbol, file symbol, frame index, offset in frame, size, alignment)
+    structures  per-file metadata, passed through untouched
+    frames      (package index, offset in package, compressed size, decompressed size)
+
+Only frames holding a replaced file are decompressed and recompressed; every other frame
+is copied byte for byte, and packages without a replaced file are cloned whole.
+"""
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from echovr_setup.rebuild import clone_path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_HEADER = struct.Struct("<4sIQQ")
+ZSTD_MAGIC = b"ZSTD"
+MANIFEST_HEADER = struct.Struct("<IIQ" + "6Q16x6Q16x6Q")
+CONTENT = struct.Struct("<qqIIII")
+STRUCTURE_SIZE = 40
+FRAME = struct.Struct("<IIII")
+ZSTD_LEVEL = 9
+# Untouched frame bytes are copied in slices of this size
+COPY_CHUNK = 16 * 1024 * 1024
+
+Content = namedtuple("Content", "type_symbol file_symbol frame offset size alignment")
+Frame = namedtuple("Frame", "package offset compressed_size size")
+
+
+class Rad15Error(Exception):
+    pass
+
+
+def available():
+    return zstandard is not None
+
+
+def to_symbol(name):
+    """A symbol from a patch file/folder name ("0x607d858c90268f9a" or decimal) as a signed int64."""
+    value = int(name, 16) if name.lower().startswith("0x") else int(name)
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class Manifest:
+    """A decoded manifest. Only contents and frames are editable; everything else round-trips."""
+
+    def __init__(self, header, contents, structures, frames, trailer=b"", header_size=16):
+        self.header = header
+        self.contents = contents
+        self.structures = structures
+        self.frames = frames
+        self.trailer = trailer
+        self.header_size = header_size
+
+    @property
+    def package_count(self):
+        return self.header[0]
+
+    @classmethod
+    def from_bytes(cls, data, header_size=16):
+        if len(data) < MANIFEST_HEADER.size:
+            raise Rad15Error("Manifest is truncated")
+        header = MANIFEST_HEADER.unpack_from(data)
+        # Each section: size, unk, unk, element size, count, element count
+        sections = [header[3 + i * 6:9 + i * 6] for i in range(3)]
+        for (size, _, _, _, _, count), element in zip(sections, (CONTENT.size, STRUCTURE_SIZE, FRAME.size)):
+            if size != count * element:
+                raise Rad15Error("Unsupported manifest layout")
+
+        pos = MANIFEST_HEADER.size
+        contents_end = pos + sections[0][0]
+        structures_end = contents_end + sections[1][0]
+        frames_end = structures_end + sections[2][0]
+        if frames_end > len(data):
+            raise Rad15Error("Manifest is truncated")
+        contents = [Content(*c) for c in CONTENT.iter_unpack(data[pos:contents_end])]
+        frames = [Frame(*f) for f in FRAME.iter_unpack(data[structures_end:frames_end])]
+        return cls(header, contents, bytes(data[contents_end:structures_end]), frames, bytes(data[frames_end:]),
+                   header_size)
+
+    def to_bytes(self):
+        body = bytearray(MANIFEST_HEADER.pack(*self.header))
+        for c in self.contents:
+            body += CONTENT.pack(*c)
+        body += self.structures
+        for f in self.frames:
+            body += FRAME.pack(*f)
+        return bytes(body + self.trailer)
+
+
+def read_manifest(path):
+    if not zstandard:
+        raise Rad15Error("zstandard is not installed")
+    with open(path, "rb") as f:
+        raw = f.read()
+    if len(raw) < COMPRESSED_HEADER.size:
+        raise Rad15Error(f"{path} is not a manifest")
+    magic, header_size, length, compressed_length = COMPRESSED_HEADER.unpack_from(raw)
+    if magic != ZSTD_MAGIC:
+        raise Rad15Error(f"{path} is not a manifest")
+    if compressed_length != len(raw) - COMPRESSED_HEADER.size:
+        raise Rad15Error("Manifest is truncated or has trailing data")
+    try:
+        data = zstandard.ZstdDecompressor().decompress(raw[COMPRESSED_HEADER.size:], max_output_size=length)
+    except zstandard.ZstdError as e:
+        raise Rad15Error(f"Corrupt manifest: {e}")
+    if len(data) != length:
+        raise Rad15Error("Manifest size does not match its header")
+    return Manifest.from_bytes(data, header_size)
+
+
+def write_manifest(manifest, path, level=ZSTD_LEVEL):
+    data = manifest.to_bytes()
+    compressed = zstandard.ZstdCompressor(level=level).compress(data)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(COMPRESSED_HEADER.pack(ZSTD_MAGIC, manifest.header_size, len(data), len(compressed)))
+        f.write(compressed)
+    os.replace(tmp_path, path)
+
+
+def load_replacements(input_dir):
+    """{(type symbol, file symbol): path} for input_dir/<group>/<type>/<file>, as evrFileTools lays it out."""
+    found = {}
+    for group in sorted(os.listdir(input_dir)):
+        group_dir = os.path.join(input_dir, group)
+        if not os.path.isdir(group_dir):
+            continue
+        for type_name in sorted(os.listdir(group_dir)):
+            type_dir = os.path.join(group_dir, type_name)
+            if not os.path.isdir(type_dir):
+                continue
+            for file_name in sorted(os.listdir(type_dir)):
+                try:
+                    key = (to_symbol(type_name), to_symbol(file_name))
+                except ValueError:
+                    raise Rad15Error(f"Not a symbol name: {os.path.join(type_name, file_name)}")
+                found[key] = os.path.join(type_dir, file_name)
+    return found
+
+
+def _rebuild_frame(data, entries, replacements):
+    """
+    New frame bytes with the replaced files swapped in. entries are (index, Content) of the
+    frame in offset order; returns (bytes, {index: Content}). Padding between files is kept
+    and topped up to each file's alignment.
+    """
+    out = bytearray()
+    updated = {}
+    prev_end = 0
+    for index, c in entries:
+        out += data[prev_end:c.offset]
+        # A resized file before this one can shift it off its alignment
+        if c.alignment > 1:
+            out += bytes(-len(out) % c.alignment)
+        new_offset = len(out)
+        path = replacements.get((c.type_symbol, c.file_symbol))
+        if path:
+            with open(path, "rb") as f:
+                out += f.read()
+        else:
+            out += data[c.offset:c.offset + c.size]
+        updated[index] = c._replace(offset=new_offset, size=len(out) - new_offset)
+        prev_end = c.offset + c.size
+    out += data[prev_end:]
+    return bytes(out), updated
+
+
+def _copy_range(view, start, end, out):
+    for pos in range(start, end, COPY_CHUNK):
+        out.write(view[pos:min(end, pos + COPY_CHUNK)])
+
+
+def _write_package(src, dst, frames, rewritten, progress=None):
+    """
+    Streams src (memory-mapped) to dst, swapping in the rewritten frames. frames are
+    (index, Frame) in this package. Returns {index: Frame} with the new offsets.
+    """
+    moved = {}
+    tmp_path = dst + ".tmp"
+    # Zero-size marker frames sort ahead of a real frame at the same offset
+    order = sorted(frames, key=lambda item: (item[1].offset, item[1].compressed_size > 0))
+    with open(src, "rb") as s, open(tmp_path, "wb") as out:
+        size = os.fstat(s.fileno()).st_size
+        with mmap.mmap(s.fileno(), 0, access=mmap.ACCESS_READ) if size else memoryview(b"") as view:
+            pos = 0
+            for index, frame in order:
+                if frame.offset < pos or frame.offset + frame.compressed_size > size:
+                    raise Rad15Error(f"Overlapping or truncated frame {index} in {os.path.basename(src)}")
+                _copy_range(view, pos, frame.offset, out)
+                new_offset = out.tell()
+                if new_offset > 0xFFFFFFFF:
+                    raise Rad15Error("Package grew past 4 GB")
+                if index in rewritten:
+                    data, decompressed_size = rewritten[index]
+                    out.write(data)
+                    moved[index] = frame._replace(offset=new_offset, compressed_size=len(data), size=decompressed_size)
+                else:
+                    _copy_range(view, frame.offset, frame.offset + frame.compressed_size, out)
+                    moved[index] = frame._replace(offset=new_offset)
+                pos = frame.offset + frame.compressed_size
+                if progress:
+                    progress(pos, size)
+            _copy_range(view, pos, size, out)
+    os.replace(tmp_path, dst)
+    return moved
+
+
+def remove_output(output_dir, package_name):
+    """Deletes package_name's manifest and package files (finished or .tmp) from output_dir."""
+    for sub in ("manifests", "packages"):
+        folder = os.path.join(output_dir, sub)
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.startswith(package_name):
+                    os.remove(os.path.join(folder, name))
+
+
+def replace_files(data_dir, input_dir, output_dir, package_name, mode="copy", level=ZSTD_LEVEL, progress=None):
+    """
+    Writes package_name from data_dir into output_dir with every file under input_dir
+    replaced, like `evrFileTools -mode replace`. Packages with nothing to replace are placed
+    with clone_path(mode). progress(done, total) gets bytes of package data. Returns stats.
+    Raises Rad15Error if the data isn't in a layout this reader understands. On any error
+    (including one raised by progress) the partial output for package_name is removed.
+    """
+    try:
+        return _replace_files(data_dir, input_dir, output_dir, package_name, mode, level, progress)
+    except BaseException:
+        remove_output(output_dir, package_name)
+        raise
+
+
+def _replace_files(data_dir, input_dir, output_dir, package_name, mode, level, progress):
+    manifest = read_manifest(os.path.join(data_dir, "manifests", package_name))
+    replacements = load_replacements(input_dir)
+
+    by_frame = {}
+    for index, c in enumerate(manifest.contents):
+        if c.frame >= len(manifest.frames):
+            raise Rad15Error(f"File {index} points past the frame table")
+        by_frame.setdefault(c.frame, []).append((index, c))
+    known = {(c.type_symbol, c.file_symbol) for c in manifest.contents}
+    missing = sorted(set(replacements) - known)
+    if missing:
+        type_symbol, file_symbol = (v & 0xFFFFFFFFFFFFFFFF for v in missing[0])
+        raise Rad15Error(f"{len(missing)} patch file(s) are not in {package_name}, e.g. {type_symbol:#x}/{file_symbol:#x}")
+
+    # Decompress, patch and recompress only the frames that hold a replaced file
+    dirty = sorted({c.frame for c in manifest.contents if (c.type_symbol, c.file_symbol) in replacements})
+    rewritten = {}
+    decompressor = zstandard.ZstdDecompressor()
+    compressor = zstandard.ZstdCompressor(level=level)
+    for frame_index in dirty:
+        frame = manifest.frames[frame_index]
+        src = os.path.join(data_dir, "packages", f"{package_name}_{frame.package}")
+        with open(src, "rb") as f:
+            f.seek(frame.offset)
+            compressed = f.read(frame.compressed_size)
+        try:
+            data = decompressor.decompress(compressed, max_output_size=frame.size)
+        except zstandard.ZstdError as e:
+            raise Rad15Error(f"Corrupt frame {frame_index}: {e}")
+        entries = sorted(by_frame[frame_index], key=lambda item: item[1].offset)
+        new_data, updated = _rebuild_frame(data, entries, replacements)
+        for index, c in updated.items():
+            manifest.contents[index] = c
+        rewritten[frame_index] = (compressor.compress(new_data), len(new_data))
+
+    frames_by_package = {}
+    for index, frame in enumerate(manifest.frames):
+        frames_by_package.setdefault(frame.package, []).append((index, frame))
+
+    os.makedirs(os.path.join(output_dir, "packages"), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, "manifests"), exist_ok=True)
+    sizes = {p: os.path.getsize(os.path.join(data_dir, "packages", f"{package_name}_{p}"))
+             for p in range(manifest.package_count)}
+    total, base = sum(sizes.values()), 0
+    stats = {"packages_written": 0, "packages_cloned": 0, "frames_rewritten": len(rewritten),
+             "files_replaced": len(replacements), "bytes": 0}
+
+    for package in range(manifest.package_count):
+        src = os.path.join(data_dir, "packages", f"{package_name}_{package}")
+        dst = os.path.join(output_dir, "packages", f"{package_name}_{package}")
+        frames = frames_by_package.get(package, [])
+        if not any(index in rewritten for index, _ in frames):
+            clone_path(src, dst, mode)
+            stats["packages_cloned"] += 1
+        else:
+            report = (lambda done, _, base=base: progress(base + done, total)) if progress else None
+            for index, frame in _write_package(src, dst, frames, rewritten, report).items():
+                manifest.frames[index] = frame
+            stats["packages_written"] += 1
+            stats["bytes"] += os.path.getsize(dst)
+        base += sizes[package]
+        if progress:
+            progress(base, total)
+
+    write_manifest(manifest, os.path.join(output_dir, "manifests", package_name), level)
+    return stats
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# Linux FICLONE ioctl (btrfs, XFS with reflink=1)
+FICLONE = 0x40049409
+# Windows block cloning (ReFS, Dev Drive)
+FSCTL_DUPLICATE_EXTENTS_TO_FILE = 0x00098344
+
+
+def _reflink(src, dst):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def _block_clone(src, dst):
+    if os.name != "nt":
+        return False
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+
+    class DuplicateExtentsData(ctypes.Structure):
+        _fields_ = [("FileHandle", wintypes.HANDLE), ("SourceFileOffset", ctypes.c_longlong),
+                    ("TargetFileOffset", ctypes.c_longlong), ("ByteCount", ctypes.c_longlong)]
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    try:
+        # Clone ranges are whole clusters; the last one may run past the end of the file
+        volume = ctypes.create_unicode_buffer(261)
+        sectors, sector_size, free, total = (wintypes.DWORD() for _ in range(4))
+        if not (kernel32.GetVolumePathNameW(os.path.abspath(dst), volume, len(volume))
+                and kernel32.GetDiskFreeSpaceW(volume, ctypes.byref(sectors), ctypes.byref(sector_size),
+                                               ctypes.byref(free), ctypes.byref(total))):
+            return False
+        cluster = sectors.value * sector_size.value
+        size = os.path.getsize(src)
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            d.truncate(size)
+            d.flush()
+            if size:
+                data = DuplicateExtentsData(msvcrt.get_osfhandle(s.fileno()), 0, 0, -(-size // cluster) * cluster)
+                returned = wintypes.DWORD()
+                if not kernel32.DeviceIoControl(wintypes.HANDLE(msvcrt.get_osfhandle(d.fileno())),
+                                                FSCTL_DUPLICATE_EXTENTS_TO_FILE, ctypes.byref(data),
+                                                ctypes.sizeof(data), None, 0, ctypes.byref(returned), None):
+                    raise ctypes.WinError(ctypes.get_last_error())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def clone_file(src, dst):
+    """
+    Places src at dst as a copy-on-write clone where the filesystem has them (a reflink on
+    Linux, a block clone on ReFS), else with a plain copy. Returns the method used. Never
+    a hardlink: patched output and its cache entry are separate files that must stay
+    separate, whatever is later written to either.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    if _reflink(src, dst):
+        return "reflink"
+    if _block_clone(src, dst):
+        return "block_clone"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def link_file(src, dst):
+    """
+    Places a file that is only ever read or replaced, never written in place (the untouched
+    packages original_files and win10 share), as a hardlink; clone_file where the two can't
+    be linked. Returns the method used.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        return clone_file(src, dst)
+
+
+def clone_path(src, dst, mode="link"):
+    """link_file for a file or a whole directory. mode="copy" keeps the old full-copy behavior."""
+    if os.path.isdir(src):
+        for dirpath, _, filenames in os.walk(src):
+            out_dir = os.path.join(dst, os.path.relpath(dirpath, src))
+            os.makedirs(out_dir, exist_ok=True)
+            for name in filenames:
+                clone_path(os.path.join(dirpath, name), os.path.join(out_dir, name), mode)
+    elif mode == "copy":
+        shutil.copy2(src, dst)
+    else:
+        link_file(src, dst)
+
+
+def list_files(root):
+    """Relative paths (forward slashes) of every file under root."""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            found.append(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/"))
+    return sorted(found)
+
+
+def patch_cache_key(integrity, inputs, extra=""):
+    """
+    Hash of every input that determines the patched output. inputs is a list of
+    files/directories; per-file SHA-256 comes from the integrity cache, so unchanged
+    inputs are not re-read.
+    """
+    h = hashlib.sha256(extra.encode("utf-8"))
+    for path in inputs:
+        if os.path.isdir(path):
+            files = [(rel, os.path.join(path, *rel.split("/"))) for rel in list_files(path)]
+        elif os.path.exists(path):
+            files = [("", path)]
+        else:
+            files = []
+        h.update(os.path.basename(path).encode("utf-8") + b"\0")
+        for rel, full in files:
+            h.update(f"{rel}\0{integrity.digest(full, 'sha256')}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+class PatchOutputStore:
+    """
+    Patched package files keyed by the hash of their inputs. Entries are cloned in and out
+    of the store (see clone_file), so an identical re-patch is a clone instead of an
+    evrFileTools run, and nothing done to the live win10 copy reaches its cache entry.
+    Where the filesystem can only copy, an entry costs as much disk as win10 itself, so
+    none is kept unless copies is set.
+    """
+
+    def __init__(self, store_dir, keep=2, copies=False):
+        self.store_dir = store_dir
+        self.keep = keep
+        self.copies = copies
+        self.index_path = os.path.join(store_dir, "index.json")
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, index):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp, self.index_path)
+
+    def restore(self, key, out_dir):
+        """Links a cached output into out_dir. Returns False if there is no complete entry."""
+        index = self._load()
+        entry = index.get(key)
+        if not entry:
+            return False
+
+        entry_dir = os.path.join(self.store_dir, key)
+        for rel, size in entry["files"].items():
+            src = os.path.join(entry_dir, *rel.split("/"))
+            if not os.path.exists(src) or os.path.getsize(src) != size:
+                return False
+
+        for rel in entry["files"]:
+            dst = os.path.join(out_dir, *rel.split("/"))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            clone_file(os.path.join(entry_dir, *rel.split("/")), dst)
+
+        entry["used"] = time.time()
+        self._save(index)
+        return True
+
+    def ingest(self, key, out_dir, exclude=()):
+        """
+        Records the files the patch produced in out_dir (minus exclude) under key. Returns
+        False, keeping nothing, if they could only be copied and copies is off.
+        """
+        entry_dir = os.path.join(self.store_dir, key)
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+
+        files = {}
+        for rel in list_files(out_dir):
+            if rel in exclude:
+                continue
+            dst = os.path.join(entry_dir, *rel.split("/"))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if clone_file(os.path.join(out_dir, *rel.split("/")), dst) == "copy" and not self.copies:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return False
+            files[rel] = os.path.getsize(dst)
+
+        index = self._load()
+        index[key] = {"files": files, "used": time.time()}
+
+        # Only the most recent entries are worth the disk space
+        for old_key, _ in sorted(index.items(), key=lambda kv: kv[1]["used"], reverse=True)[self.keep:]:
+            shutil.rmtree(os.path.join(self.store_dir, old_key), ignore_errors=True)
+            del index[old_key]
+        self._save(index)
+        return True
@@ -0,0 +1,152 @@
+"""
+Decoding of the game's /session API and the per-instance state the supervisor keeps.
+"""
+import json
+import re
+import time
+from collections import deque, namedtuple
+
+MATCH_TYPES = {
+    "Echo_Combat": ("Combat, Public", "Public Combat Match"),
+    "Echo_Combat_Private": ("Combat, Private", "Private Combat Match"),
+    "Echo_Combat_Tournament": ("Combat, Tournament", "Tournament Combat Match"),
+    "Echo_Arena": ("Arena, Public", "Public Arena Match"),
+    "Echo_Arena_Private": ("Arena, Private", "Private Arena Match"),
+    "Echo_Arena_Tournament": ("Arena, Tournament", "Tournament Arena Match"),
+}
+MAP_NAMES = {
+    "mpl_combat_fission": "Fission",
+    "mpl_combat_combustion": "Combustion",
+    "mpl_combat_dyson": "Dyson",
+    "mpl_combat_gauss": "Surge",
+}
+PLAYER_ID = re.compile(rb'"playerid"\s*:\s*\d+', re.IGNORECASE)
+
+SPECTATOR_TEAM = 2
+HISTORY_SIZE = 120
+
+# kind is "idle" (404), "lobby" (500), "match" (200) or "unknown"
+Session = namedtuple("Session", "kind match_type map_name players spectators")
+
+IDLE = Session("idle", None, None, 0, 0)
+UNKNOWN = Session("unknown", None, None, 0, 0)
+
+
+def decode_session(body):
+    """
+    Reads a 200 /session body in a single parse: "playerid" entries are counted by the
+    object hook as the decoder builds each object, instead of regex-scanning the text again.
+    """
+    players = 0
+
+    def count_players(pairs):
+        nonlocal players
+        for key, value in pairs:
+            if type(value) is int and key.lower() == "playerid":
+                players += 1
+        return dict(pairs)
+
+    try:
+        data = json.loads(body, object_pairs_hook=count_players)
+    except ValueError:
+        return UNKNOWN
+    if not isinstance(data, dict):
+        return UNKNOWN
+
+    spectators = 0
+    teams = data.get("teams")
+    if not teams:
+        players = 0
+    elif isinstance(teams, list) and len(teams) > SPECTATOR_TEAM and isinstance(teams[SPECTATOR_TEAM], dict):
+        spectators = len(teams[SPECTATOR_TEAM].get("players") or ())
+    return Session("match", data.get("match_type"), data.get("map_name"), players, spectators)
+
+
+def decode_response(status, body=b"", bones=b""):
+    """Session for a /session status code (and /player_bones body on a 500), per the monitor's rules."""
+    if status == 404:
+        return IDLE
+    if status == 500:
+        return Session("lobby", None, None, sum(1 for _ in PLAYER_ID.finditer(bones)), 0)
+    if status == 200:
+        return decode_session(body)
+    return UNKNOWN
+
+
+class InstanceState:
+    """
+    One echovr.exe: ports, process, the latest decoded session and a fixed-size history of
+    (time, players, spectators) samples, so memory stays flat however long the host runs.
+    """
+
+    __slots__ = ("gs", "api", "pid", "process", "log_path", "shutdown_queued", "online",
+                 "session", "history", "client", "started_at", "ready_at")
+
+    def __init__(self, gs, api, pid=None, process=None, client=None, history_size=HISTORY_SIZE):
+        self.gs = gs
+        self.api = api
+        self.pid = pid
+        self.process = process
+        self.log_path = None
+        self.shutdown_queued = False
+        self.online = False
+        self.session = UNKNOWN
+        self.history = deque(maxlen=history_size)
+        self.client = client
+        # time.monotonic() of the spawn and of the first answered poll
+        self.started_at = time.monotonic() if process is not None else None
+        self.ready_at = None
+
+    def is_running(self):
+        return self.process is None or self.process.poll() is None
+
+    def update(self, session, now=None):
+        if self.ready_at is None:
+            self.ready_at = time.monotonic()
+        self.online = True
+        self.session = session
+        self.history.append((now if now is not None else time.time(), session.players, session.spectators))
+
+    def mark_offline(self):
+        self.online = False
+
+    @property
+    def is_idle(self):
+        return self.session.kind == "idle"
+
+    @property
+    def player_count(self):
+        return self.session.players
+
+    @property
+    def active_players(self):
+        return self.session.players - self.session.spectators
+
+    def _mode(self):
+        kind = self.session.kind
+        if kind == "idle":
+            return "Idle", "Idle"
+        if kind == "lobby":
+            return "Social Lobby", "Social Lobby"
+        tray, title = MATCH_TYPES.get(self.session.match_type, ("Unknown", "Unknown Mode"))
+        map_name = MAP_NAMES.get(self.session.map_name)
+        if map_name:
+            return f"{tray} ({map_name})", f"{title} ({map_name})"
+        return tray, title
+
+    @property
+    def mode_tray(self):
+        return self._mode()[0]
+
+    @property
+    def mode_title(self):
+        return self._mode()[1]
+
+    @property
+    def players_tray(self):
+        if self.session.spectators:
+            return f"{self.active_players} Players ({self.session.spectators} Spec.)"
+        return f"{self.active_players} Players"
+
+    def peak_players(self):
+        return max((players for _, players, _ in self.history), default=0)
@@ -0,0 +1,238 @@
+"""
+Fetching artifacts from several sources at once. Each configured source (a mirror of the
+repo over HTTP, or a local/LAN folder laid out the same way) is raced for the first byte;
+the fastest one streams the file, and if it fails partway the next fastest carries on from
+the same offset. Whatever mix of sources served it, the file must match the expected hashes;
+files without expected hashes are only ever fetched from their origin.
+
+setup.json:  "artifactSources": ["http://192.168.1.10:8000/", "\\\\\\\\nas\\\\echovr-resources"]
+"""
+import hashlib
+import http.client
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from echovr_setup.downloads import CHUNK_SIZE, USER_AGENT, DownloadError, DownloadJob
+from echovr_setup.integrity import algorithm_for
+
+# Artifact URLs under this prefix are looked up on mirrors by their path below it
+REPO_RAW_ROOT = "https://raw.githubusercontent.com/EchoTools/EchoVR-Windows-Hosts-Resources/main/"
+READ_ERRORS = (urllib.error.URLError, http.client.HTTPException, OSError)
+
+
+def is_local(source):
+    return not source.startswith(("http://", "https://"))
+
+
+class ArtifactSources:
+    """Maps an origin URL to the same file on every configured source, origin last."""
+
+    def __init__(self, sources=(), root=REPO_RAW_ROOT):
+        self.sources = [s for s in sources if s]
+        self.root = root
+
+    def candidates(self, url):
+        found = []
+        if url.startswith(self.root):
+            rel = url[len(self.root):]
+            for source in self.sources:
+                if is_local(source):
+                    found.append(os.path.join(source, *rel.split("/")))
+                else:
+                    found.append(source.rstrip("/") + "/" + rel)
+        if url not in found:
+            found.append(url)
+        return found
+
+
+class _Stream:
+    """An open file or HTTP response positioned at offset."""
+
+    def __init__(self, location, handle, total, latency):
+        self.location = location
+        self.handle = handle
+        self.total = total
+        self.latency = latency
+
+    def read(self, size):
+        return self.handle.read(size)
+
+    def close(self):
+        try:
+            self.handle.close()
+        except Exception:
+            pass
+
+
+class MultiSourceFetcher:
+    """
+    Drop-in for DownloadManager (download/download_all) that races ArtifactSources.
+    latency keeps each source's last first-byte time for reporting.
+    """
+
+    def __init__(self, sources, max_workers=3, timeout=15, progress=None, chunk_size=CHUNK_SIZE):
+        self.sources = sources if isinstance(sources, ArtifactSources) else ArtifactSources(sources)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self.latency = {}
+        self.served = {}
+        self._lock = threading.Lock()
+        self._jobs = []
+
+    def download(self, url, dest, expected_hashes=()):
+        return self.download_all([DownloadJob(url, dest, expected_hashes)])[0]
+
+    def download_all(self, jobs):
+        """Runs every job, then raises the first failure (if any) once all have settled."""
+        self._jobs = list(jobs)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            futures = [pool.submit(self._run, job) for job in self._jobs]
+        for f in futures:
+            f.result()
+        return self._jobs
+
+    # --- Internals ---
+
+    def _report(self):
+        if not self.progress:
+            return
+        with self._lock:
+            done = sum(j.done for j in self._jobs)
+            total = sum(j.total for j in self._jobs) if all(j.total for j in self._jobs) else 0
+        self.progress(done, total)
+
+    def _open(self, location, offset):
+        started = time.perf_counter()
+        if is_local(location):
+            handle = open(location, "rb")
+            total = os.fstat(handle.fileno()).st_size
+            handle.seek(offset)
+            return _Stream(location, handle, total, time.perf_counter() - started)
+
+        headers = {"User-Agent": USER_AGENT}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        resp = urllib.request.urlopen(urllib.request.Request(location, headers=headers), timeout=self.timeout)
+        if offset and not (resp.status == 206 and resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-")):
+            resp.close()
+            raise DownloadError(f"{location}: no range support")
+        length = resp.headers.get("Content-Length")
+        total = offset + int(length) if length else 0
+        return _Stream(location, resp, total, time.perf_counter() - started)
+
+    def _open_first(self, location, offset):
+        """Opens location and reads its first chunk; the race is decided by this."""
+        stream = self._open(location, offset)
+        try:
+            first = stream.read(self.chunk_size)
+        except BaseException:
+            stream.close()
+            raise
+        with self._lock:
+            self.latency[location] = round(stream.latency, 4)
+        return stream, first
+
+    def _race(self, locations, offset):
+        """
+        Opens every location at once and returns (stream, first_chunk, slower) for the first to
+        deliver a byte; slower lists the others that didn't fail, fastest first.
+        """
+        if not locations:
+            raise DownloadError("No sources left")
+        pool = ThreadPoolExecutor(max_workers=len(locations))
+        futures = {pool.submit(self._open_first, loc, offset): loc for loc in locations}
+        winner, errors, answered = None, {}, []
+        pending = set(futures)
+        try:
+            while pending and winner is None:
+                done, pending = wait(pending, timeout=self.timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in sorted(done, key=lambda f: locations.index(futures[f])):
+                    try:
+                        result = future.result()
+                    except (DownloadError, *READ_ERRORS) as e:
+                        errors[futures[future]] = f"{futures[future]}: {e}"
+                        continue
+                    if winner is None:
+                        winner = result
+                    else:
+                        answered.append(result[0])
+        finally:
+            # Losers are closed as they finish; nobody waits for them
+            for future in pending:
+                future.add_done_callback(lambda f: f.exception() is None and f.result()[0].close())
+            pool.shutdown(wait=False)
+        for stream in answered:
+            stream.close()
+        if winner is None:
+            raise DownloadError("; ".join(errors.values()) or "All sources timed out")
+        losers = sorted((loc for loc in locations if loc != winner[0].location and loc not in errors),
+                        key=lambda loc: self.latency.get(loc, float("inf")))
+        return winner[0], winner[1], losers
+
+    def _run(self, job):
+        algorithms = tuple(algorithm_for(h) for h in job.expected_hashes)
+        # Only files with pinned hashes may come from a mirror; anything else stays on its origin
+        candidates = self.sources.candidates(job.url) if job.expected_hashes else [job.url]
+        failed = set()
+        os.makedirs(os.path.dirname(job.dest) or ".", exist_ok=True)
+
+        while True:
+            remaining = [loc for loc in candidates if loc not in failed]
+            if not remaining:
+                break
+            hashers = {a: hashlib.new(a) for a in algorithms}
+            job.done = job.total = 0
+            used = []
+            try:
+                with open(job.part_path, "wb") as out:
+                    stream, chunk, remaining = self._race(remaining, 0)
+                    while True:
+                        used.append(stream.location)
+                        job.total = job.total or stream.total
+                        broken = False
+                        try:
+                            while chunk:
+                                out.write(chunk)
+                                for h in hashers.values():
+                                    h.update(chunk)
+                                job.done += len(chunk)
+                                self._report()
+                                chunk = stream.read(self.chunk_size)
+                        except READ_ERRORS:
+                            broken = True
+                        finally:
+                            stream.close()
+                        if not broken and (not job.total or job.done >= job.total):
+                            break
+                        failed.add(stream.location)
+                        if not job.total:
+                            # Without a length there's no telling a resume apart from a short file
+                            raise DownloadError(f"{stream.location}: connection lost")
+                        # Cut off partway: the next fastest source picks up at this offset
+                        stream, chunk, remaining = self._race(remaining, job.done)
+            except DownloadError:
+                # Nobody could resume (or answer); start over on whatever hasn't failed yet
+                failed.update(used or remaining)
+                continue
+
+            job.digests = {a: h.hexdigest().upper() for a, h in hashers.items()}
+            if all(job.digests[a] == e.upper() for a, e in zip(algorithms, job.expected_hashes)):
+                os.replace(job.part_path, job.dest)
+                with self._lock:
+                    for location in used:
+                        self.served[location] = self.served.get(location, 0) + 1
+                return job
+            # A source served the wrong bytes; try again from scratch without it
+            failed.update(used)
+
+        if os.path.exists(job.part_path):
+            os.remove(job.part_path)
+        raise DownloadError(f"Failed to download {job.url} from any source")
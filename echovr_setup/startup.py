@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+
+from echovr_setup import STARTED
+
+
+class Probe:
+    """
+    One startup check. func runs on its own thread and must not touch shared state;
+    apply(value) is called with its result on whichever thread consumes the runner.
+    """
+
+    def __init__(self, name, func, timeout, apply=None):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.apply = apply
+
+
+class ProbeResult:
+    def __init__(self, name, value=None, error=None, timed_out=False, elapsed=0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.timed_out = timed_out
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None and not self.timed_out
+
+
+class ProbeRunner:
+    """
+    Starts every probe at once on daemon threads and yields results as they land.
+    A probe that overruns its timeout is reported as timed out and abandoned;
+    its thread can't be killed, but being a daemon it won't hold up exit.
+    """
+
+    def __init__(self, probes):
+        self.probes = list(probes)
+
+    def _call(self, probe, results):
+        started = time.perf_counter()
+        try:
+            value, error = probe.func(), None
+        except Exception as e:
+            value, error = None, e
+        results.put(ProbeResult(probe.name, value, error, elapsed=time.perf_counter() - started))
+
+    def run(self):
+        """Generator of (probe, ProbeResult) in completion order."""
+        results = queue.Queue()
+        started = time.perf_counter()
+        pending = {p.name: p for p in self.probes}
+        deadlines = {p.name: started + p.timeout for p in self.probes}
+
+        for probe in self.probes:
+            threading.Thread(target=self._call, args=(probe, results), daemon=True, name=f"probe-{probe.name}").start()
+
+        while pending:
+            wait = max(0.0, min(deadlines[n] for n in pending) - time.perf_counter())
+            try:
+                result = results.get(timeout=wait)
+            except queue.Empty:
+                now = time.perf_counter()
+                for name in [n for n in pending if deadlines[n] <= now]:
+                    yield pending.pop(name), ProbeResult(name, timed_out=True, elapsed=now - started)
+                continue
+            if result.name in pending:
+                yield pending.pop(result.name), result
+
+    def start(self, on_result, on_done=None):
+        """Runs the probes in the background, calling on_result(probe, result) from a worker thread."""
+        def consume():
+            for probe, result in self.run():
+                on_result(probe, result)
+            if on_done:
+                on_done()
+        threading.Thread(target=consume, daemon=True, name="probe-runner").start()
+
+
+class StartupTimeline:
+    """Milliseconds since process start for named startup milestones."""
+
+    def __init__(self):
+        self.marks = {}
+
+    def mark(self, name):
+        self.marks[name] = round((time.perf_counter() - STARTED) * 1000, 1)
+        return self.marks[name]
@@ -0,0 +1,123 @@
+import atexit
+import json
+import os
+import threading
+from collections.abc import MutableMapping
+
+# How long writes are held back so a burst of changes lands on disk as one file write
+FLUSH_DELAY = 0.5
+
+VERSION_KEY = "schemaVersion"
+
+
+class SetupStore(MutableMapping):
+    """
+    setup.json as a thread-safe dict. Assigning a key marks the store dirty and schedules
+    one debounced flush; flushes write a temp file and rename it over setup.json so a crash
+    or a second writer never leaves a torn file behind.
+
+    migrations[i] upgrades a version i document to version i + 1 in place, so adding a
+    field means appending a function rather than another "if key not in" backfill.
+    """
+
+    def __init__(self, path, migrations=(), delay=FLUSH_DELAY):
+        self.path = path
+        self.migrations = list(migrations)
+        self.delay = delay
+        self.data = {}
+        self.dirty = False
+        # Shared with anything that mutates nested values (the integrity cache) so a flush
+        # never serializes a dict mid-update
+        self.lock = threading.RLock()
+        self._timer = None
+        self._registered = False
+
+    @property
+    def version(self):
+        return len(self.migrations)
+
+    def load(self):
+        """Reads setup.json (a missing file is an empty version 0 document) and migrates it."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        with self.lock:
+            self.data = data
+            self.dirty = False
+            if self.migrate():
+                self.mark_dirty()
+        if not self._registered:
+            atexit.register(self.close)
+            self._registered = True
+        return self
+
+    def migrate(self):
+        """Runs the pending migrations; returns whether any ran."""
+        with self.lock:
+            start = self.data.get(VERSION_KEY, 0)
+            # Newer files (written by a later version of the tool) are left as they are
+            if start >= self.version and os.path.exists(self.path):
+                return False
+            for migration in self.migrations[start:]:
+                migration(self.data)
+            self.data[VERSION_KEY] = self.version
+            return True
+
+    # --- Mapping ---
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            if key in self.data and self.data[key] == value:
+                return
+            self.data[key] = value
+            self.mark_dirty()
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self.data[key]
+            self.mark_dirty()
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.data))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"SetupStore({self.path!r}, {self.data!r})"
+
+    # --- Writing ---
+
+    def mark_dirty(self):
+        """For changes made inside nested values, which assignment can't see."""
+        with self.lock:
+            self.dirty = True
+            if self._timer is None and self.delay is not None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Writes setup.json now if anything changed since the last write."""
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty:
+                return False
+            text = json.dumps(self.data, indent=4)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            return True
+
+    def close(self):
+        self.flush()
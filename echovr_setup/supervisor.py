@@ -0,0 +1,299 @@
+"""
+Spawns and watches echovr.exe instances like the Server Monitor does, but polls every
+instance's /session endpoint at once on asyncio over kept-alive connections, so a tick
+takes about as long as the slowest instance rather than the sum of them.
+"""
+import asyncio
+import datetime
+import json
+import os
+import subprocess
+import time
+from collections import deque
+
+from echovr_setup.logarchive import run_maintenance
+from echovr_setup.logtail import LogTailer
+from echovr_setup.metrics import SupervisorMetrics
+from echovr_setup.ports import planned_pairs
+from echovr_setup.session import InstanceState, decode_response
+
+# monitor.json defaults (see Get-MonitorConfig in EchoVR-Server-Monitor.ps1)
+DEFAULT_MONITOR_CONFIG = {
+    "amountOfInstances": 1,
+    "basePort": 6792,
+    "delayProcessCheck": 5000,
+    "numTaskThreads": 2,
+    "timeStep": 120,
+    "additionalArgs": "-server -headless -noovr -fixedtimestep -nosymbollookup",
+    "exitOnError": True,
+    "pauseSpawning": False,
+    "allowMonitorApi": True,
+    "autoArchive": True,
+    "autoPurge": False,
+    "purgeInterval": "Weekly",
+}
+
+POLL_TIMEOUT = 0.8
+MAX_PAIRS = 100
+
+
+def load_monitor_config(path):
+    config = dict(DEFAULT_MONITOR_CONFIG)
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            config.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+def launch_args(config, gs_port, api_port):
+    """The same command line the monitor starts instances with."""
+    args = ["-numtaskthreads", str(config["numTaskThreads"]), "-timestep", str(config["timeStep"])]
+    args += config["additionalArgs"].split()
+    args += ["-port", str(gs_port), "-httpport", str(api_port)]
+    if config["exitOnError"]:
+        args.append("-exitonerror")
+    return args
+
+
+def minimized_startupinfo():
+    if os.name != "nt":
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = 7  # SW_SHOWMINNOACTIVE
+    return startupinfo
+
+
+class KeepAliveClient:
+    """Minimal HTTP/1.1 GET client holding one persistent connection to an instance's API port."""
+
+    def __init__(self, port, host="127.0.0.1", timeout=POLL_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """Returns (status, body). A kept-alive connection the server has dropped is retried once on a fresh one."""
+        reused = self.writer is not None
+        try:
+            return await asyncio.wait_for(self._get(path), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        except BaseException:
+            self.close()
+            raise
+        try:
+            return await asyncio.wait_for(self._get(path), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nConnection: keep-alive\r\n\r\n".encode())
+        await self.writer.drain()
+
+        status = int((await self.reader.readuntil(b"\r\n")).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip().lower()
+
+        if headers.get("transfer-encoding") == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            body = bytes(body)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            self.close()
+            return status, body
+
+        if headers.get("connection") == "close":
+            self.close()
+        return status, body
+
+
+async def poll_instance(instance, metrics=None):
+    """Polls one instance; False if its API didn't answer (not up yet, or hung)."""
+    try:
+        started = time.perf_counter()
+        status, body = await instance.client.get("/session")
+        if metrics:
+            metrics.poll_latency.observe(time.perf_counter() - started)
+        bones = b""
+        if status == 500:
+            try:
+                bones_status, bones = await instance.client.get("/player_bones")
+                if bones_status != 200:
+                    bones = b""
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+                pass
+        elif status not in (200, 404):
+            instance.mark_offline()
+            return False
+        first_answer = instance.ready_at is None
+        instance.update(decode_response(status, body, bones))
+        if metrics and first_answer and instance.started_at is not None:
+            metrics.spawn_ready.observe(instance.ready_at - instance.started_at)
+        return True
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+        instance.mark_offline()
+        return False
+
+
+async def poll_all(instances, metrics=None):
+    """Polls every instance concurrently. Returns how many answered."""
+    results = await asyncio.gather(*(poll_instance(i, metrics) for i in instances))
+    return sum(results)
+
+
+class Supervisor:
+    """
+    Keeps amountOfInstances echovr.exe processes running on the planned ports (see
+    planned_pairs) and polls them each tick.
+    """
+
+    def __init__(self, root_dir, config=None):
+        self.root_dir = root_dir
+        self.dashboard_dir = os.path.join(root_dir, "dashboard")
+        self.exe_path = os.path.join(root_dir, "bin", "win10", "echovr.exe")
+        self.monitor_json = os.path.join(self.dashboard_dir, "monitor.json")
+        self.ports_json = os.path.join(self.dashboard_dir, "temp", "ports.json")
+        self.port_plan = os.path.join(self.dashboard_dir, "portplan.json")
+        self.config = config
+        self.instances = []
+        self.last_tick = 0.0
+        self.metrics = SupervisorMetrics()
+        self.tailer = LogTailer(os.path.join(root_dir, "_local", "r14logs"))
+        self.log_events = deque(maxlen=200)
+        # Like the monitor, a link code on screen holds back spawning until it's dealt with
+        self.link_code = None
+        self.maintenance_day = None
+        self.maintenance = None
+
+    def current_config(self):
+        return self.config or load_monitor_config(self.monitor_json)
+
+    def port_pairs(self, config):
+        return planned_pairs(self.port_plan, config["basePort"], MAX_PAIRS)
+
+    def next_pair(self, config):
+        used = {i.gs for i in self.instances}
+        for gs, api in self.port_pairs(config):
+            if gs not in used:
+                return gs, api
+        return None
+
+    def spawn(self, config):
+        pair = self.next_pair(config)
+        if pair is None:
+            return None
+        process = subprocess.Popen([self.exe_path] + launch_args(config, *pair),
+                                   cwd=os.path.dirname(self.exe_path), startupinfo=minimized_startupinfo())
+        instance = InstanceState(pair[0], pair[1], process.pid, process, KeepAliveClient(pair[1]))
+        self.instances.append(instance)
+        return instance
+
+    def reap(self):
+        for instance in [i for i in self.instances if not i.is_running()]:
+            instance.client.close()
+            self.instances.remove(instance)
+            self.metrics.record_exit(instance.gs)
+
+    def queue_shutdown(self, pid, queued=True):
+        for instance in self.instances:
+            if instance.pid == pid:
+                instance.shutdown_queued = queued
+
+    def stop(self, instance):
+        if instance.process and instance.process.poll() is None:
+            instance.process.kill()
+        instance.client.close()
+        self.instances.remove(instance)
+
+    async def tick(self):
+        """One monitor pass: reap exits, poll everything at once, stop idle queued instances, top up."""
+        started = time.perf_counter()
+        config = self.current_config()
+        self.reap()
+        self.read_logs()
+        self.start_maintenance(config)
+        if config["allowMonitorApi"] and self.instances:
+            await poll_all(self.instances, self.metrics)
+        for instance in [i for i in self.instances if i.shutdown_queued and i.is_idle]:
+            self.stop(instance)
+        if not config["pauseSpawning"] and not self.link_code:
+            for _ in range(config["amountOfInstances"] - len(self.instances)):
+                if self.spawn(config) is None:
+                    break
+        self.save_port_map()
+        self.last_tick = time.perf_counter() - started
+        return self.last_tick
+
+    def read_logs(self):
+        by_pid = {i.pid: i for i in self.instances if i.pid is not None}
+        for event in self.tailer.poll(by_pid):
+            self.log_events.append(event)
+            if event.matcher == "link_code" and self.link_code is None:
+                self.link_code = event.value
+        for pid, instance in by_pid.items():
+            instance.log_path = self.tailer.log_for(pid) or instance.log_path
+
+    def start_maintenance(self, config):
+        """Once a day, archive/purge logs in a worker thread, skipping the logs instances have open."""
+        today = datetime.date.today()
+        if self.maintenance_day == today or (self.maintenance and not self.maintenance.done()):
+            return
+        self.maintenance_day = today
+        active = [i.log_path for i in self.instances if i.log_path]
+        self.maintenance = asyncio.ensure_future(
+            asyncio.to_thread(run_maintenance, config, self.tailer.log_dir, exclude=active))
+
+    def clear_link_code(self):
+        self.link_code = None
+
+    async def run(self, on_tick=None):
+        while True:
+            await self.tick()
+            if on_tick:
+                on_tick(self)
+            await asyncio.sleep(self.current_config()["delayProcessCheck"] / 1000)
+
+    def save_port_map(self):
+        """Writes the running instances to ports.json so the monitor can adopt them."""
+        entries = {str(i.pid): {"GS": i.gs, "API": i.api, "GS_Confirmed": None, "API_Confirmed": None, "LogPath": i.log_path}
+                   for i in self.instances if i.pid is not None}
+        os.makedirs(os.path.dirname(self.ports_json), exist_ok=True)
+        tmp_path = self.ports_json + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.ports_json)
+
+    def close(self):
+        for instance in self.instances:
+            instance.client.close()
+        self.tailer.close()
@@ -0,0 +1,181 @@
+"""
+Background work for the GUI. Tasks run on a bounded pool; everything they report
+(progress, results, errors) is queued and handed to callbacks on the thread that drains
+the scheduler, which for the GUI is the Tk main loop via after().
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+# How often the Tk loop drains the queue
+DRAIN_INTERVAL_MS = 50
+# Callbacks run per drain, so a burst from workers can't starve the event loop
+DRAIN_BATCH = 100
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+# done/total are bytes or steps; either may be None while unknown
+Progress = namedtuple("Progress", "task stage done total")
+
+
+class Task:
+    """
+    One submitted job. func(task) runs on a worker and may call task.progress(...) and
+    task.check() (raises TaskCancelled once cancel() was called or the timeout passed).
+    on_progress(Progress), on_done(result) and on_error(exception) run on the main thread;
+    exactly one of on_done/on_error is called. on_exit() runs once the worker has returned,
+    which after a timeout can be well after on_error.
+    """
+
+    def __init__(self, scheduler, name, func, timeout=None, on_progress=None, on_done=None, on_error=None,
+                 on_exit=None):
+        self.scheduler = scheduler
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_exit = on_exit
+        self.deadline = None
+        self.finished = False
+        self.exited = False
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._stage = None
+        self._latest = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise TaskCancelled(self.name)
+
+    def progress(self, stage=None, done=None, total=None):
+        """Thread-safe; only the newest event is delivered if the main thread falls behind."""
+        self.check()
+        if not self.on_progress:
+            return
+        with self._lock:
+            if stage is not None:
+                self._stage = stage
+            queued = self._latest is not None
+            self._latest = Progress(self.name, self._stage, done, total)
+        if not queued:
+            self.scheduler.call_main(self._deliver_progress)
+
+    def _deliver_progress(self):
+        with self._lock:
+            event, self._latest = self._latest, None
+        if event and not self.finished:
+            self.on_progress(event)
+
+    def _run(self):
+        try:
+            self.check()
+            value, error = self.func(self), None
+        except BaseException as e:
+            value, error = None, e
+        self.scheduler.call_main(self._settle, value, error)
+        self.scheduler.call_main(self._exit)
+
+    def _exit(self):
+        """Main thread, after _settle: the worker is gone, so the task stops counting as running."""
+        self.exited = True
+        self.scheduler._forget(self)
+        if self.on_exit:
+            self.on_exit()
+
+    def _settle(self, value, error):
+        """Main thread. The first outcome wins; a result arriving after a timeout is dropped."""
+        if self.finished:
+            return
+        self.finished = True
+        if error is None and self._cancel.is_set():
+            error = TaskCancelled(self.name)
+        if error is None:
+            if self.on_done:
+                self.on_done(value)
+        elif self.on_error:
+            self.on_error(error)
+
+
+class TaskScheduler:
+    """
+    A bounded worker pool plus a main-thread dispatch queue. Call drain() from the main
+    thread (attach() does it on a Tk after() loop). Timed out tasks are cancelled and
+    reported as TaskTimeout; their worker can only stop at the next check()/progress(), and
+    until it does the task stays in running() so the same work isn't started twice.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self.tasks = []
+        self._main = queue.SimpleQueue()
+        self._widget = None
+
+    def submit(self, name, func, timeout=None, on_progress=None, on_done=None, on_error=None, on_exit=None):
+        task = Task(self, name, func, timeout, on_progress, on_done, on_error, on_exit)
+        if timeout:
+            task.deadline = time.monotonic() + timeout
+        self.tasks.append(task)
+        self.pool.submit(task._run)
+        return task
+
+    def call_main(self, func, *args):
+        """Queues func(*args) for the main thread. Safe from any thread."""
+        self._main.put((func, args))
+
+    def running(self, name):
+        return next((t for t in self.tasks if t.name == name), None)
+
+    def _forget(self, task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def drain(self, limit=DRAIN_BATCH):
+        """Main thread: expires overdue tasks, then runs up to limit queued callbacks."""
+        now = time.monotonic()
+        for task in [t for t in self.tasks if t.deadline and t.deadline <= now and not t.finished]:
+            task.cancel()
+            task._settle(None, TaskTimeout(f"{task.name} took longer than {task.timeout}s"))
+        for _ in range(limit):
+            try:
+                func, args = self._main.get_nowait()
+            except queue.Empty:
+                break
+            func(*args)
+
+    def attach(self, widget, interval=DRAIN_INTERVAL_MS):
+        """Drains on widget's Tk loop until the widget is destroyed."""
+        self._widget = widget
+
+        def tick():
+            try:
+                self.drain()
+            finally:
+                if self._widget is widget:
+                    widget.after(interval, tick)
+        widget.after(interval, tick)
+
+    def shutdown(self):
+        """Cancels everything still running and stops draining; workers are not waited for."""
+        self._widget = None
+        for task in list(self.tasks):
+            task.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,195 @@
+"""
+Timing spans for the patch pipeline, saved as Chrome trace JSON (open in chrome://tracing
+or https://ui.perfetto.dev). An optional sampling profiler adds the Python stacks of every
+thread to the same file.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Traces kept in dashboard/traces
+KEEP_TRACES = 10
+SAMPLE_INTERVAL = 0.005
+
+
+def tree_size(path):
+    """Bytes in a file or everything under a folder; 0 if it's missing."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _rate(nbytes, seconds):
+    return round(nbytes / 1048576 / seconds, 1) if nbytes and seconds > 0 else None
+
+
+def format_stages(summary):
+    """One line per stage of a saved run summary (see SetupCore.last_patch_trace)."""
+    lines = []
+    for stage in summary.get("stages", []):
+        line = f"{stage['name']}: {stage['seconds']:.1f}s"
+        if stage.get("mb_per_s"):
+            line += f" ({stage['bytes'] / 1048576:.1f} MB at {stage['mb_per_s']} MB/s)"
+        if stage.get("error"):
+            line += f" - {stage['error']}"
+        lines.append(line)
+    lines.append(f"total: {summary.get('seconds', 0):.1f}s")
+    return "\n".join(lines)
+
+
+class Tracer:
+    """
+    Records spans as Chrome trace complete ("X") events. span() yields a dict the body can
+    add args to; a "bytes" arg also gets an MB/s figure. Safe to use from several threads.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.events = []
+        self.stages = []
+        self.profiler = None
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+
+    def _us(self, t):
+        return round((t - self.origin) * 1e6, 1)
+
+    @contextmanager
+    def span(self, name, **args):
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        started = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._depth.value = depth
+            if args.get("bytes"):
+                args["mb_per_s"] = _rate(args["bytes"], elapsed)
+            event = {"name": name, "cat": self.name, "ph": "X", "ts": self._us(started),
+                     "dur": round(elapsed * 1e6, 1), "pid": self.pid, "tid": threading.get_ident(), "args": args}
+            with self._lock:
+                self.events.append(event)
+                # Top-level spans are the stages shown to the user
+                if depth == 0:
+                    self.stages.append({"name": name, "seconds": round(elapsed, 3), "bytes": args.get("bytes"),
+                                        "mb_per_s": args.get("mb_per_s"), "error": args.get("error")})
+
+    def start_profiler(self, interval=SAMPLE_INTERVAL):
+        self.profiler = SamplingProfiler(self, interval)
+        self.profiler.start()
+
+    @property
+    def seconds(self):
+        return round(time.perf_counter() - self.origin, 3)
+
+    def to_json(self):
+        if self.profiler:
+            self.profiler.stop()
+        with self._lock:
+            events = list(self.events)
+        tids = {e["tid"] for e in events}
+        threads = {t.ident: t.name for t in threading.enumerate()}
+        meta = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": threads.get(tid, str(tid))}}
+                for tid in tids]
+        trace = {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"name": self.name, "startedAt": self.started_at, "seconds": self.seconds,
+                          "python": sys.version.split()[0]},
+        }
+        if self.profiler:
+            trace["stackFrames"], trace["samples"] = self.profiler.export()
+        return trace
+
+    def save(self, trace_dir, keep=KEEP_TRACES):
+        """Writes <name>-<timestamp>.json into trace_dir and drops the oldest beyond keep. Returns the path."""
+        os.makedirs(trace_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(trace_dir, f"{self.name}-{stamp}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_json(), f)
+        os.replace(tmp_path, path)
+
+        traces = sorted(n for n in os.listdir(trace_dir) if n.startswith(f"{self.name}-") and n.endswith(".json"))
+        for old in traces[:-keep] if keep else []:
+            try:
+                os.remove(os.path.join(trace_dir, old))
+            except OSError:
+                pass
+        return path
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of every other thread every interval seconds with sys._current_frames.
+    Costs a few percent while running, so it's opt-in (patchProfiler in setup.json).
+    """
+
+    def __init__(self, tracer, interval=SAMPLE_INTERVAL):
+        self.tracer = tracer
+        self.interval = interval
+        self.frames = {}
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="sampling-profiler")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _frame_id(self, key, parent):
+        # Frames are identified by (code location, parent) so identical stacks share ids
+        node = (key, parent)
+        frame_id = self.frames.get(node)
+        if frame_id is None:
+            frame_id = self.frames[node] = str(len(self.frames) + 1)
+        return frame_id
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = self.tracer._us(time.perf_counter())
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                parent = None
+                for key in reversed(stack):
+                    parent = self._frame_id(key, parent)
+                self.samples.append({"tid": tid, "ts": now, "sf": parent, "weight": 1})
+
+    def export(self):
+        stack_frames = {}
+        for (key, parent), frame_id in self.frames.items():
+            entry = {"name": key, "category": "python"}
+            if parent:
+                entry["parent"] = parent
+            stack_frames[frame_id] = entry
+        samples = [dict(s, cpu=0, name="sample") for s in self.samples if s["sf"]]
+        return stack_frames, samples
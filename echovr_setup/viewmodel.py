@@ -0,0 +1,47 @@
+"""
+What the main menu shows, as plain data derived from SetupCore. The GUI keeps the last
+state it rendered and only touches the widgets whose part of the state changed.
+"""
+from collections import namedtuple
+
+# Checklist items whose Done button waits for the server config
+NEEDS_CONFIG = ("chklst_portFwd", "chklst_usedNewConfig", "chklst_unifiAllowP2P")
+
+CHECKLIST_NOTES = {
+    "chklst_privateNet": 'Click "Set" to do this automatically.',
+    "chklst_staticIP": "e.g., 192.168.1.100. Reconnect before continuing.",
+    "chklst_portFwd": "Complete your server configuration first.",
+    "chklst_unifiAllowP2P": "Ensure P2P traffic to your server is unblocked in the UniFi dashboard.",
+    "chklst_usedNewConfig": "Do this with the device you usually play on. (Config > Generate Client Config)",
+    "chklst_hasMonitorScript": "Downloads the Server Monitor to your echo folder.\nThe .ps1 option will auto-update execution policy.",
+}
+
+# One open checklist item
+ChecklistRow = namedtuple("ChecklistRow", "key label enabled note")
+
+MenuState = namedtuple("MenuState", "font ready patched configured checklist")
+
+
+def menu_state(core, font):
+    configured = bool(core.setup_data["isConfigured"])
+    rows = tuple(ChecklistRow(key, label, configured or key not in NEEDS_CONFIG, CHECKLIST_NOTES.get(key, ""))
+                 for key, label, done in core.checklist() if not done)
+    ready = configured and bool(core.setup_data["isPatched"]) and not rows
+    return MenuState(font, ready, bool(core.setup_data["isPatched"]), configured, rows)
+
+
+def changed_parts(old, new):
+    """Names of the MenuState fields that differ; every field when nothing has been rendered yet."""
+    if old is None:
+        return set(MenuState._fields)
+    return {name for name in MenuState._fields if getattr(old, name) != getattr(new, name)}
+
+
+def diff_rows(old_rows, new_rows):
+    """(removed keys, added rows, changed rows) between two checklist states."""
+    old = {row.key: row for row in old_rows}
+    new_keys = {row.key for row in new_rows}
+    removed = [key for key in old if key not in new_keys]
+    added = [row for row in new_rows if row.key not in old]
+    changed = [row for row in new_rows if row.key in old and old[row.key] != row]
+    return removed, added, changed
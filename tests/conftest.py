@@ -0,0 +1,71 @@
+import functools
+import os
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Tests import echovr_setup straight from the checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        # Clients that hang up early (losing a race) are expected
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class RangeHandler(QuietHandler):
+    """
+    Static files plus single "bytes=N-" ranges, which SimpleHTTPRequestHandler lacks. An
+    If-Range that isn't the file's Last-Modified gets the whole file, as it should.
+    """
+
+    def send_head(self):
+        spec = self.headers.get("Range", "")
+        if not spec.startswith("bytes=") or not spec.endswith("-"):
+            return super().send_head()
+        path = self.translate_path(self.path)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self.send_error(404)
+            return None
+        fs = os.fstat(f.fileno())
+        validator = self.headers.get("If-Range")
+        if validator and validator != self.date_time_string(fs.st_mtime):
+            f.close()
+            return super().send_head()
+        size = fs.st_size
+        start = int(spec[6:-1])
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Length", str(size - start))
+        self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+        self.end_headers()
+        return f
+
+
+@pytest.fixture
+def serve():
+    """serve(directory, handler=QuietHandler) -> base URL ending in /; servers stop after the test."""
+    servers = []
+
+    def start(directory, handler=QuietHandler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=str(directory)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,33 @@
+import pytest
+
+from echovr_setup import cli
+from echovr_setup.core import SetupCore, SetupError
+from echovr_setup.downloads import DownloadError
+from echovr_setup.rad15 import Rad15Error
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "bin" / "win10").mkdir(parents=True)
+    (tmp_path / "bin" / "win10" / "echovr.exe").write_bytes(b"MZ")
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("error", [SetupError("no"), DownloadError("no"), OSError("no"), Rad15Error("no")])
+def test_expected_errors_exit_non_zero(root, monkeypatch, capsys, error):
+    def fail(self, **kwargs):
+        raise error
+
+    monkeypatch.setattr(SetupCore, "verify_game_data", fail)
+    assert cli.main(["--root", root, "verify-data", "--quiet"]) == 1
+    assert capsys.readouterr().err == "Error: no\n"
+
+
+def test_update_dlls_pins(root, monkeypatch):
+    seen = []
+    monkeypatch.setattr(SetupCore, "update_dlls", lambda self, pins=None: seen.append(pins) or [])
+    md5 = "67e6e9b3be315ea784d69e5a31815b89"
+    assert cli.main(["--root", root, "update-dlls", "--md5", f"pnsradgameserver.dll={md5}"]) == 1
+    assert seen == [{"pnsradgameserver.dll": {"md5": md5}}]
+    with pytest.raises(SystemExit):
+        cli.main(["--root", root, "update-dlls", "--md5", "pnsradgameserver.dll=1234"])
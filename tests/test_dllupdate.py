@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from echovr_setup.dllupdate import DllTarget, DllUpdater, build_release
+from echovr_setup.integrity import IntegrityCache
+
+
+def digests(data):
+    return hashlib.md5(data).hexdigest(), hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def release(tmp_path):
+    """site/ holds build 2 of a.dll with a delta from build 1; bin/a.dll is build 1. Returns (site, old, new)."""
+    old = os.urandom(200000)
+    new = old[:50000] + os.urandom(1000) + old[50000:]
+    (tmp_path / "v1").mkdir()
+    (tmp_path / "v1" / "a.dll").write_bytes(old)
+    (tmp_path / "site").mkdir()
+    (tmp_path / "site" / "a.dll").write_bytes(new)
+    build_release(str(tmp_path / "site"), [str(tmp_path / "v1")])
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "a.dll").write_bytes(old)
+    return tmp_path / "site", old, new
+
+
+def updater(base, tmp_path, md5, sha256):
+    target = DllTarget("a.dll", str(tmp_path / "bin" / "a.dll"), base + "a.dll", md5, sha256)
+    return DllUpdater([target], base + "manifest.json", IntegrityCache())
+
+
+def test_delta_to_pinned_build(serve, release, tmp_path):
+    site, _, new = release
+    report = updater(serve(site), tmp_path, *digests(new)).run()
+    assert report[0]["method"] == "delta" and report[0]["bytes"] < 10000
+    assert (tmp_path / "bin" / "a.dll").read_bytes() == new
+
+
+def test_md5_pin_alone_is_enough(serve, release, tmp_path):
+    site, _, new = release
+    report = updater(serve(site), tmp_path, digests(new)[0], None).run()
+    assert report[0]["method"] == "delta"
+    assert (tmp_path / "bin" / "a.dll").read_bytes() == new
+
+
+def test_stale_pin_reports_current(serve, release, tmp_path):
+    site, old, _ = release
+    report = updater(serve(site), tmp_path, *digests(old)).run()
+    assert report[0]["method"] == "current"
+
+
+def test_delta_for_another_build_is_rejected_before_patching(serve, release, tmp_path):
+    site, old, new = release
+    # A manifest entry that claims build 2 but points at a delta building something else
+    other = old[:100] + os.urandom(500) + old[100:]
+    (tmp_path / "v2").mkdir()
+    (tmp_path / "v2" / "a.dll").write_bytes(other)
+    build_release(str(tmp_path / "v2"), [str(tmp_path / "v1")], out_dir=str(tmp_path / "other"))
+    manifest = json.loads((site / "manifest.json").read_text())
+    delta_info = next(iter(manifest["files"]["a.dll"]["deltas"].values()))
+    delta = (tmp_path / "other" / delta_info["path"]).read_bytes()
+    (site / delta_info["path"]).write_bytes(delta)
+    delta_info["sha256"] = hashlib.sha256(delta).hexdigest().upper()
+    (site / "manifest.json").write_text(json.dumps(manifest))
+
+    report, jobs = updater(serve(site), tmp_path, *digests(new)).update()
+    assert report[0]["method"] == "full" and "different DLL" in report[0]["reason"]
+    assert (tmp_path / "bin" / "a.dll").read_bytes() == old
+    assert [job.dest for job in jobs] == [str(tmp_path / "bin" / "a.dll")]
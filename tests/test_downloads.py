@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+from email.utils import formatdate
+
+import pytest
+from conftest import RangeHandler
+
+from echovr_setup.downloads import DownloadError, DownloadJob, DownloadManager
+
+SIZE = 2 * 1024 * 1024 + 77
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """site/blob.bin; returns (site_dir, data, sha256, last_modified)."""
+    site = tmp_path / "site"
+    site.mkdir()
+    data = os.urandom(SIZE)
+    (site / "blob.bin").write_bytes(data)
+    modified = formatdate(os.stat(site / "blob.bin").st_mtime, usegmt=True)
+    return site, data, hashlib.sha256(data).hexdigest(), modified
+
+
+def recording(drop_first_at=None):
+    """A RangeHandler that logs each request's headers and can hang up on the first one."""
+    class Recording(RangeHandler):
+        requests = []
+
+        def do_GET(self):
+            Recording.requests.append(dict(self.headers))
+            if drop_first_at is not None and len(Recording.requests) == 1:
+                f = self.send_head()
+                self.wfile.write(f.read(drop_first_at))
+                f.close()
+                self.close_connection = True
+                return
+            super().do_GET()
+    return Recording
+
+
+def seed_partial(dest, data, count, validator, url):
+    with open(str(dest) + ".part", "wb") as f:
+        f.write(data[:count])
+    with open(str(dest) + ".part.json", "w") as f:
+        json.dump({"url": url, "validator": validator}, f)
+
+
+def test_partial_file_resumes_with_range(serve, artifact, tmp_path):
+    site, data, sha, modified = artifact
+    handler = recording()
+    url = serve(site, handler) + "blob.bin"
+    dest = tmp_path / "out.bin"
+    seed_partial(dest, data, 1000000, modified, url)
+    job = DownloadManager().download(url, str(dest), (sha,))
+    assert dest.read_bytes() == data
+    assert job.digests["sha256"] == sha.upper()
+    assert handler.requests[0]["Range"] == "bytes=1000000-"
+    assert handler.requests[0]["If-Range"] == modified
+    assert not os.path.exists(str(dest) + ".part.json")
+
+
+def test_changed_file_restarts_from_scratch(serve, artifact, tmp_path):
+    site, data, sha, _ = artifact
+    handler = recording()
+    url = serve(site, handler) + "blob.bin"
+    dest = tmp_path / "out.bin"
+    # The partial came from an older build; If-Range fails and the server sends it all
+    seed_partial(dest, os.urandom(SIZE), 1000000, "Thu, 01 Jan 2015 00:00:00 GMT", url)
+    DownloadManager().download(url, str(dest), (sha,))
+    assert dest.read_bytes() == data
+    assert len(handler.requests) == 1
+
+
+def test_partial_without_validator_is_not_resumed(serve, artifact, tmp_path):
+    site, data, sha, _ = artifact
+    handler = recording()
+    url = serve(site, handler) + "blob.bin"
+    dest = tmp_path / "out.bin"
+    (tmp_path / "out.bin.part").write_bytes(os.urandom(5000))
+    DownloadManager().download(url, str(dest), (sha,))
+    assert dest.read_bytes() == data
+    assert "Range" not in handler.requests[0]
+
+
+def test_dropped_connection_resumes(serve, artifact, tmp_path):
+    site, data, sha, modified = artifact
+    handler = recording(drop_first_at=700000)
+    url = serve(site, handler) + "blob.bin"
+    dest = tmp_path / "out.bin"
+    DownloadManager(retries=1).download(url, str(dest), (sha,))
+    assert dest.read_bytes() == data
+    assert [r.get("Range") for r in handler.requests] == [None, "bytes=700000-"]
+    assert handler.requests[1]["If-Range"] == modified
+
+
+def test_hash_mismatch_fails_and_discards(serve, artifact, tmp_path):
+    site, _, _, _ = artifact
+    url = serve(site, RangeHandler) + "blob.bin"
+    dest = tmp_path / "out.bin"
+    with pytest.raises(DownloadError):
+        DownloadManager(retries=0).download(url, str(dest), ("0" * 64,))
+    assert not dest.exists()
+    assert not (tmp_path / "out.bin.part").exists()
+
+
+def test_missing_file_is_not_retried(serve, artifact, tmp_path):
+    site, _, _, _ = artifact
+    handler = recording()
+    with pytest.raises(DownloadError):
+        DownloadManager(retries=3).download(serve(site, handler) + "nope.bin", str(tmp_path / "out.bin"))
+    assert len(handler.requests) == 1
+
+
+def test_download_all_reports_progress(serve, artifact, tmp_path):
+    site, data, sha, _ = artifact
+    base = serve(site, RangeHandler)
+    seen = []
+    manager = DownloadManager(progress=lambda done, total: seen.append((done, total)))
+    jobs = [DownloadJob(base + "blob.bin", str(tmp_path / f"out{i}.bin"), (sha,)) for i in range(3)]
+    manager.download_all(jobs)
+    assert all((tmp_path / f"out{i}.bin").read_bytes() == data for i in range(3))
+    assert seen[-1] == (3 * SIZE, 3 * SIZE)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import threading
+
+import pytest
+from conftest import QuietHandler
+
+from echovr_setup import core as core_module
+from echovr_setup.core import SetupCore, SetupError
+from echovr_setup.downloads import DownloadJob
+from echovr_setup.fleet import FleetProvisioner, SharedDownloads, load_inventory
+from echovr_setup.httpcache import HttpCache
+
+
+def counting():
+    class Counting(QuietHandler):
+        hits = []
+        lock = threading.Lock()
+
+        def do_GET(self):
+            with Counting.lock:
+                Counting.hits.append(self.path)
+            super().do_GET()
+    return Counting
+
+
+@pytest.fixture
+def site(tmp_path):
+    """site/dll/a.dll and site/misc/b.zip; returns (dir, {name: (data, sha256)})."""
+    root = tmp_path / "site"
+    files = {}
+    for rel in ("dll/a.dll", "misc/b.zip"):
+        data = os.urandom(300000)
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_bytes(data)
+        files[rel] = (data, hashlib.sha256(data).hexdigest())
+    return root, files
+
+
+def make_install(path):
+    (path / "bin" / "win10").mkdir(parents=True)
+    (path / "bin" / "win10" / "echovr.exe").write_bytes(b"MZ")
+    return path
+
+
+def test_inventory_csv_and_json(tmp_path):
+    (tmp_path / "hosts.csv").write_text(
+        "root,discord_id,password,regions,serveraddr,base_port,instances\n"
+        "echo-a,1,pw,us-east,,6792,4\n"
+        "echo-b,1,pw,,,,2\n")
+    rows = load_inventory(str(tmp_path / "hosts.csv"))
+    assert [r.root for r in rows] == [str(tmp_path / "echo-a"), str(tmp_path / "echo-b")]
+    assert rows[1].base_port == 6792 and rows[1].instances == 2 and rows[1].regions == ""
+
+    (tmp_path / "hosts.json").write_text(json.dumps([{"root": "x", "discord_id": 1, "password": "p", "instances": 1}]))
+    assert load_inventory(str(tmp_path / "hosts.json"))[0].discord_id == "1"
+
+
+@pytest.mark.parametrize("body, message", [
+    ("root,discord_id,password,instances\nx,1,,2\n", "missing password"),
+    ("root,discord_id,password,instances\nx,1,pw,two\n", "row 1"),
+    ("root,discord_id,password,instances\nx,1,pw,1\n./x,1,pw,1\n", "more than once"),
+])
+def test_inventory_errors(tmp_path, body, message):
+    (tmp_path / "hosts.csv").write_text(body)
+    with pytest.raises(SetupError, match=message):
+        load_inventory(str(tmp_path / "hosts.csv"))
+
+
+def test_shared_downloads_fetch_each_url_once(serve, site, tmp_path):
+    root, files = site
+    handler = counting()
+    base = serve(root, handler)
+    shared = SharedDownloads(str(tmp_path / "cache"))
+    url = base + "dll/a.dll"
+    data, sha = files["dll/a.dll"]
+
+    def install(i):
+        shared.download_all([DownloadJob(url, str(tmp_path / f"install{i}" / "a.dll"), (sha,))])
+
+    threads = [threading.Thread(target=install, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all((tmp_path / f"install{i}" / "a.dll").read_bytes() == data for i in range(6))
+    assert handler.hits == ["/dll/a.dll"]
+    assert (shared.fetched, shared.copied) == (1, 6)
+
+
+def test_shared_downloads_mirror_keeps_file_name(serve, site, tmp_path):
+    root, files = site
+    mirror = serve(root / "misc")
+    shared = SharedDownloads(str(tmp_path / "cache"), mirror=mirror)
+    data, sha = files["misc/b.zip"]
+    job = DownloadJob("https://example.invalid/repo/misc/b.zip", str(tmp_path / "out" / "b.zip"), (sha,))
+    shared.download_all([job])
+    assert (tmp_path / "out" / "b.zip").read_bytes() == data
+    assert job.digests["sha256"] == sha.upper()
+
+
+def test_concurrent_cache_writes_of_one_url(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"))
+    bodies = [os.urandom(100000) for _ in range(8)]
+    errors = []
+
+    def store(data):
+        try:
+            cache.store_bytes("https://example.invalid/a.dll", data, {"ETag": '"x"'})
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=store, args=(data,)) for data in bodies]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    body = cache.lookup("https://example.invalid/a.dll")
+    with open(body, "rb") as f:
+        assert f.read() in bodies
+    # No temp files left behind
+    assert sorted(os.listdir(tmp_path / "cache")) == sorted(["index.json", os.path.basename(body)])
+
+
+def test_fleet_run_over_temp_installs(serve, site, tmp_path, monkeypatch):
+    root, files = site
+    handler = counting()
+    base = serve(root, handler)
+    monkeypatch.setattr(core_module, "occupied_ports", lambda ports: set())
+
+    def fake_patch(self, status=None, progress=None, downloads=None):
+        # Stands in for the patch sequence: each install pulls the same artifacts
+        jobs = [DownloadJob(base + rel, os.path.join(self.bin_dir, os.path.basename(rel)), (sha,))
+                for rel, (_, sha) in files.items()]
+        downloads.download_all(jobs)
+        self.setup_data["isPatched"] = True
+        return True
+
+    monkeypatch.setattr(SetupCore, "run_patch_sequence", fake_patch)
+    for name in ("a", "b", "c"):
+        make_install(tmp_path / name)
+    lines = ["root,discord_id,password,base_port,instances"]
+    lines += [f"{name},1,pw,7000,2" for name in ("a", "b", "c", "missing")]
+    (tmp_path / "hosts.csv").write_text("\n".join(lines) + "\n")
+
+    fleet = FleetProvisioner(load_inventory(str(tmp_path / "hosts.csv")), str(tmp_path / "cache"), parallel=3)
+    report = fleet.run()
+
+    assert (report["installs"], report["ok"], report["failed"]) == (4, 3, 1)
+    by_root = {os.path.basename(r["root"]): r for r in report["results"]}
+    assert "echovr.exe not found" in by_root["missing"]["error"]
+    # Installs on one machine never share a port
+    ranges = sorted(by_root[name]["ports"] for name in "abc")
+    assert ranges == ["7000-7003", "7004-7007", "7008-7011"]
+    for name in "abc":
+        for rel, (data, _) in files.items():
+            assert (tmp_path / name / "bin" / "win10" / os.path.basename(rel)).read_bytes() == data
+    assert sorted(handler.hits) == ["/dll/a.dll", "/misc/b.zip"]
+    assert report["downloads"] == {"fetched": 2, "copied": 6}
+
+
+def test_unexpected_error_is_reported_per_install(tmp_path, monkeypatch):
+    monkeypatch.setattr(core_module, "occupied_ports", lambda ports: set())
+
+    def broken_patch(self, status=None, progress=None, downloads=None):
+        if self.root_dir.endswith("b"):
+            raise KeyError("lowerPort")
+        return True
+
+    monkeypatch.setattr(SetupCore, "run_patch_sequence", broken_patch)
+    for name in ("a", "b"):
+        make_install(tmp_path / name)
+    (tmp_path / "hosts.csv").write_text("root,discord_id,password,instances\na,1,pw,1\nb,1,pw,1\n")
+
+    report = FleetProvisioner(load_inventory(str(tmp_path / "hosts.csv")), str(tmp_path / "cache"), parallel=2).run()
+    assert (report["ok"], report["failed"]) == (1, 1)
+    by_root = {os.path.basename(r["root"]): r for r in report["results"]}
+    assert by_root["a"]["error"] is None
+    assert by_root["b"]["error"] == "KeyError: 'lowerPort'"
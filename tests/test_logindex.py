@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+
+from echovr_setup.logindex import LogIndex
+from echovr_setup.logtail import ERRORS, SESSION_END, SESSION_START
+
+LINES = [
+    "[10-18-2026] [08:00:00]: Session started for OVR-ORG-123456789",
+    "[10-18-2026] [08:00:01]: Arash joined the lobby",
+    "[10-18-2026] [08:00:02]: Exception: call to foo.bar(1) failed",
+    "[10-18-2026] [08:00:03]: [ERROR] 100% of frames dropped",
+    "[10-18-2026] [08:00:04]: Unhandled exception at 0x7ff6",
+    "[10-18-2026] [08:00:05]: Process crashed, writing minidump",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    logs = tmp_path / "r14logs"
+    logs.mkdir()
+    path = logs / "r14_20261018_4242.log"
+    path.write_text("\n".join(LINES) + "\n")
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+    index = LogIndex(str(tmp_path / "logindex.db"), str(logs))
+    index.update()
+    yield index
+    index.close()
+
+
+def lines(events):
+    """The distinct matched lines, without their timestamps."""
+    return sorted({e["line"][25:] for e in events})
+
+
+def test_crash_needs_whole_words(index):
+    assert lines(index.search(kind="crash")) == [
+        "Process crashed, writing minidump", "Unhandled exception at 0x7ff6"]
+
+
+def test_text_that_is_not_fts_syntax_still_searches(index):
+    assert lines(index.search("foo.bar(1) failed")) == ["Exception: call to foo.bar(1) failed"]
+    assert lines(index.search("100%")) == ["[ERROR] 100% of frames dropped"]
+
+
+def test_fts_queries_still_work(index):
+    if not index.fts:
+        pytest.skip("sqlite built without FTS5")
+    assert lines(index.search('"frames dropped"')) == ["[ERROR] 100% of frames dropped"]
+    assert lines(index.search("session AND started")) == ["Session started for OVR-ORG-123456789"]
+
+
+def test_player_and_pid_are_extracted(index):
+    events = index.search(player="OVR-ORG-123456789")
+    assert [e["pid"] for e in events] == [4242]
+
+
+def test_shared_matchers_respect_word_starts():
+    assert ERRORS.match("NoException here") is None
+    assert ERRORS.match("got Exception: boom") == "Exception: boom"
+    assert SESSION_START.match("subsession started") is None
+    assert SESSION_START.match("SESSION loaded")
+    assert SESSION_END.match("Session closed")
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from echovr_setup.logtail import TAIL_START, InotifyWatcher, LogTailer, Matcher, PollingWatcher
+
+LINE = Matcher("line", r".+")
+
+
+@pytest.fixture
+def logs(tmp_path):
+    (tmp_path / "r14logs").mkdir()
+    return tmp_path / "r14logs"
+
+
+def tailer(logs, watcher=PollingWatcher):
+    return LogTailer(str(logs), [LINE], watcher(str(logs)))
+
+
+def values(events):
+    return [e.value for e in events]
+
+
+def append(path, text):
+    with open(path, "ab") as f:
+        f.write(text.encode())
+
+
+def test_first_poll_reads_only_the_tail(logs):
+    lines = [f"line {i:06d}" for i in range(20000)]
+    (logs / "r14_a_42.log").write_text("\n".join(lines) + "\n")
+    events = tailer(logs).poll()
+    assert values(events)[-1] == "line 019999"
+    # Only whole lines from the last TAIL_START bytes
+    assert len(events) == TAIL_START // len("line 000000\n")
+    assert all(v in lines for v in values(events))
+    assert {e.pid for e in events} == {42}
+
+
+def test_partial_lines_wait_for_their_newline(logs):
+    log = logs / "r14_a_42.log"
+    log.write_text("one\n")
+    t = tailer(logs)
+    assert values(t.poll()) == ["one"]
+    append(log, "tw")
+    assert t.poll() == []
+    append(log, "o\r\nthr")
+    assert values(t.poll()) == ["two"]
+    append(log, "ee\n")
+    assert values(t.poll()) == ["three"]
+
+
+def test_truncated_log_is_read_from_the_start(logs):
+    log = logs / "r14_a_42.log"
+    log.write_text("a long first line\nanother\n")
+    t = tailer(logs)
+    assert values(t.poll()) == ["a long first line", "another"]
+    log.write_text("new\n")
+    assert values(t.poll()) == ["new"]
+
+
+def test_newer_log_for_the_pid_takes_over(logs):
+    old = logs / "r14_a_42.log"
+    old.write_text("old\n")
+    os.utime(old, ns=(1_000_000_000, 1_000_000_000))
+    t = tailer(logs)
+    assert values(t.poll()) == ["old"]
+
+    new = logs / "r14_b_42.log"
+    new.write_text("new\n")
+    os.utime(new, ns=(2_000_000_000, 2_000_000_000))
+    os.utime(logs, ns=(3_000_000_000, 3_000_000_000))
+    assert values(t.poll()) == ["new"]
+    assert t.log_for(42) == str(new)
+    assert list(t.offsets) == [str(new)]
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/sys/fs/inotify"), reason="needs inotify")
+def test_inotify_reads_only_changed_logs(logs):
+    (logs / "r14_a_1.log").write_text("a\n")
+    (logs / "r14_b_2.log").write_text("b\n")
+    t = tailer(logs, InotifyWatcher)
+    try:
+        assert sorted(values(t.poll())) == ["a", "b"]
+        read = []
+        read_new = t._read_new
+        t._read_new = lambda path: read.append(os.path.basename(path)) or read_new(path)
+        append(logs / "r14_b_2.log", "more\n")
+        assert values(t.poll()) == ["more"]
+        assert read == ["r14_b_2.log"]
+        assert t.poll() == [] and read == ["r14_b_2.log"]
+    finally:
+        t.close()
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from echovr_setup.merkle import TreeVerifier
+
+CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """pkg/a (10 chunks and a bit), pkg/b (3 chunks), pkg/empty; returns (root, verifier factory)."""
+    pkg = tmp_path / "root" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "a").write_bytes(os.urandom(10 * CHUNK + 100))
+    (pkg / "b").write_bytes(os.urandom(3 * CHUNK))
+    (pkg / "empty").write_bytes(b"")
+    root = tmp_path / "root"
+
+    def verifier():
+        return TreeVerifier(str(root), str(tmp_path / "merkle.json"), chunk_size=CHUNK, workers=2)
+
+    verifier().record(["pkg"])
+    return root, verifier
+
+
+def corrupt_silently(path, offset):
+    """Flips a byte without changing the size or mtime."""
+    st = os.stat(path)
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_unchanged_tree_only_samples(tree):
+    _, verifier = tree
+    report = verifier().verify(["pkg"], sample=4)
+    assert report["corrupt"] == {} and report["missing"] == []
+    assert report["checked"] == 3 and report["hashed"] == 0
+    assert report["sampled"] == 4 and report["bytes"] == 4 * CHUNK
+
+
+def test_changed_file_reports_ranges(tree):
+    root, verifier = tree
+    with open(root / "pkg" / "a", "r+b") as f:
+        f.seek(5 * CHUNK + 10)
+        f.write(b"x")
+    report = verifier().verify(["pkg"], sample=0)
+    assert report["hashed"] == 1
+    assert report["corrupt"] == {"pkg/a": [[5 * CHUNK, 6 * CHUNK]]}
+
+
+def test_silent_corruption_is_found_by_the_rotating_sample(tree):
+    root, verifier = tree
+    corrupt_silently(root / "pkg" / "b", 2 * CHUNK + 7)
+    assert verifier().verify(["pkg"], sample=0)["corrupt"] == {}
+
+    # 16 leaves in all (11 + 3 + 1 for the empty file); the cursor carries over between checks
+    found = []
+    for _ in range(4):
+        report = verifier().verify(["pkg"], sample=4)
+        found.append(report["corrupt"])
+    assert {"pkg/b": [[2 * CHUNK, 3 * CHUNK]]} in found
+
+    # Once found, the file is re-hashed and reported on every later check
+    report = verifier().verify(["pkg"], sample=0)
+    assert report["hashed"] == 1
+    assert report["corrupt"] == {"pkg/b": [[2 * CHUNK, 3 * CHUNK]]}
+
+
+def test_full_rehashes_everything(tree):
+    root, verifier = tree
+    corrupt_silently(root / "pkg" / "a", 0)
+    report = verifier().verify(["pkg"], full=True)
+    assert report["hashed"] == 3 and report["sampled"] == 0
+    assert report["corrupt"] == {"pkg/a": [[0, CHUNK]]}
+
+
+def test_missing_and_new_files(tree):
+    root, verifier = tree
+    os.remove(root / "pkg" / "b")
+    (root / "pkg" / "c").write_bytes(b"new")
+    report = verifier().verify(["pkg"], record_new=False, sample=0)
+    assert report["missing"] == ["pkg/b"] and report["recorded"] == []
+    report = verifier().verify(["pkg"], sample=0)
+    assert report["recorded"] == ["pkg/c"]
+    assert "pkg/c" in verifier().tracked(["pkg"])
@@ -0,0 +1,98 @@
+import asyncio
+
+from echovr_setup.metrics import Histogram, SupervisorMetrics, render, serve_metrics
+from echovr_setup.session import InstanceState, Session
+
+
+class FakeSupervisor:
+    def __init__(self, instances):
+        self.instances = instances
+        self.metrics = SupervisorMetrics()
+        self.last_tick = 0.25
+
+    def current_config(self):
+        return {"amountOfInstances": 3}
+
+
+def make_supervisor():
+    match = InstanceState(6792, 6793, pid=100)
+    match.started_at = 10.0
+    match.update(Session("match", "Echo_Arena", 'map "a"', 4, 1))
+    idle = InstanceState(6794, 6795, pid=101)
+    sup = FakeSupervisor([match, idle])
+    sup.metrics.record_exit(6794)
+    sup.metrics.record_exit(6794)
+    sup.metrics.poll_latency.observe(0.003)
+    sup.metrics.poll_latency.observe(0.3)
+    sup.metrics.spawn_ready.observe(7)
+    return sup
+
+
+def samples(text):
+    """{series: value} from the Prometheus text, comments skipped."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, _, value = line.rpartition(" ")
+            out[series] = value
+    return out
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram((1, 2, 5))
+    for value in (0.5, 1, 3, 9):
+        h.observe(value)
+    out = []
+    h.render("x", out)
+    assert out == ['x_bucket{le="1"} 2', 'x_bucket{le="2"} 2', 'x_bucket{le="5"} 3',
+                   'x_bucket{le="+Inf"} 4', "x_sum 13.5", "x_count 4"]
+
+
+def test_render_reports_instances_and_histograms():
+    text = render(make_supervisor(), now=70.0)
+    values = samples(text)
+    assert values["echovr_instances_running"] == "2"
+    assert values["echovr_instances_target"] == "3"
+    assert values["echovr_tick_seconds"] == "0.25"
+    assert values['echovr_instance_up{port="6792",pid="100"}'] == "1"
+    assert values['echovr_instance_up{port="6794",pid="101"}'] == "0"
+    assert values['echovr_instance_players{port="6792",pid="100"}'] == "4"
+    assert values['echovr_instance_spectators{port="6792",pid="100"}'] == "1"
+    assert values['echovr_instance_mode{port="6792",pid="100",mode="match",match_type="Echo_Arena",map="map \\"a\\""}'] == "1"
+    assert values['echovr_instance_uptime_seconds{port="6792",pid="100"}'] == "60.0"
+    assert 'echovr_instance_uptime_seconds{port="6794",pid="101"}' not in values
+    assert values['echovr_instance_restarts_total{port="6794"}'] == "2"
+    assert values['echovr_session_poll_seconds_bucket{le="0.005"}'] == "1"
+    assert values["echovr_session_poll_seconds_count"] == "2"
+    assert values['echovr_spawn_ready_seconds_bucket{le="10"}'] == "1"
+    # Every family is declared once, before its samples
+    assert text.count("# TYPE echovr_session_poll_seconds histogram") == 1
+    assert text.endswith("\n")
+
+
+def test_metrics_endpoint():
+    sup = make_supervisor()
+
+    async def get(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def run():
+        server = await serve_metrics(sup, port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await get(port, "/metrics?x=1"), await get(port, "/other")
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    metrics, other = asyncio.run(run())
+    head, _, body = metrics.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert b"Content-Type: text/plain; version=0.0.4" in head
+    assert b"echovr_instances_running 2" in body
+    assert other.startswith(b"HTTP/1.1 404")
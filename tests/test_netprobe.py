@@ -0,0 +1,111 @@
+import ctypes
+import select
+import struct
+
+from echovr_setup import netprobe
+from echovr_setup.core import SetupCore
+from echovr_setup.netprobe import DEFAULT_TTL, UNIFI_TARGET, HttpReflector, NetworkProbe
+
+
+class FakeSocket:
+    """A ping socket whose only inbound datagram is the given reply."""
+
+    def __init__(self, reply, sender):
+        self.reply = reply
+        self.sender = sender
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def setsockopt(self, *args):
+        pass
+
+    def sendto(self, data, addr):
+        self.sent.append((data, addr))
+
+    def recvmsg(self, *args):
+        raise BlockingIOError
+
+    def recvfrom(self, size):
+        return self.reply, (self.sender, 0)
+
+
+class FakePoll:
+    def register(self, *args):
+        pass
+
+    def poll(self, timeout):
+        return [(0, select.POLLIN)]
+
+
+def patch_socket(monkeypatch, reply, sender="203.0.113.7"):
+    sock = FakeSocket(reply, sender)
+    monkeypatch.setattr(netprobe.socket, "socket", lambda *args: sock)
+    monkeypatch.setattr(netprobe.select, "poll", FakePoll, raising=False)
+    return sock
+
+
+def test_echo_reply_constant_is_the_icmp_type():
+    assert netprobe.ICMP_ECHO_REPLY == 0
+
+
+def test_linux_probe_recognises_echo_reply(monkeypatch):
+    reply = struct.pack("!BBHHH", netprobe.ICMP_ECHO_REPLY, 0, 0, 0, 1) + b"echovr-setup"
+    sock = patch_socket(monkeypatch, reply)
+    assert netprobe._probe_linux("203.0.113.7", 1, 0.5) == ("203.0.113.7", True)
+    assert sock.sent[0][1] == ("203.0.113.7", 0)
+
+
+def test_linux_probe_ignores_other_icmp(monkeypatch):
+    # An echo *request* looped back is not an answer from the target
+    request = struct.pack("!BBHHH", 8, 0, 0, 0, 1) + b"echovr-setup"
+    patch_socket(monkeypatch, request)
+    calls = iter([[(0, select.POLLIN)], []])
+    monkeypatch.setattr(FakePoll, "poll", lambda self, timeout: next(calls))
+    assert netprobe._probe_linux("203.0.113.7", 1, 0.5) == (None, False)
+
+
+def test_probe_hop_treats_ctypes_errors_as_unsupported(monkeypatch):
+    def broken(dest, ttl, timeout):
+        raise ctypes.ArgumentError("argument 2: wrong type")
+
+    monkeypatch.setattr(netprobe, "_probe_linux", broken)
+    monkeypatch.setattr(netprobe, "_probe_windows", broken)
+    assert netprobe.probe_hop("203.0.113.7", 1) is None
+
+
+def test_check_is_reused_until_gateway_or_wan_ip_changes(serve, tmp_path):
+    (tmp_path / "ip").write_text("198.51.100.20\n")
+    base = serve(tmp_path)
+    core = SetupCore(str(tmp_path)).open()
+    core.setup_data["wanIpReflector"] = base + "ip"
+    assert core.network_probe().reflector() == "198.51.100.20"
+    assert NetworkProbe(HttpReflector(base + "missing")).fingerprint()["wanIp"] is None
+
+    gateway = ["192.168.1.1"]
+    probes = []
+
+    def prober(dest, ttl, timeout):
+        probes.append(dest)
+        return ("192.168.1.1", False) if dest == UNIFI_TARGET else (dest, True)
+
+    probe = NetworkProbe(HttpReflector(base + "ip"), prober=prober, resolver=lambda ip: "unifi.localdomain",
+                         gateway=lambda: gateway[0])
+    first = probe.check()
+    assert (first["wanIp"], first["hasUnifi"], first["checkCGNAT"]) == ("198.51.100.20", True, "Pass")
+    assert probes == [UNIFI_TARGET, "198.51.100.20"]
+
+    assert probe.check(first) is first and len(probes) == 2
+    assert not probe.is_fresh(first, probe.fingerprint(), now=first["checkedAt"] + DEFAULT_TTL)
+
+    gateway[0] = "10.0.0.1"
+    second = probe.check(first)
+    assert second is not first and second["gateway"] == "10.0.0.1" and len(probes) == 4
+
+    (tmp_path / "ip").write_text("198.51.100.21\n")
+    third = probe.check(second)
+    assert third["wanIp"] == "198.51.100.21" and probes[-1] == "198.51.100.21"
@@ -0,0 +1,101 @@
+import asyncio
+import itertools
+import json
+import os
+
+import pytest
+
+from echovr_setup import core as core_module
+from echovr_setup import supervisor as supervisor_module
+from echovr_setup.core import SetupCore, SetupError
+from echovr_setup.ports import load_plan, plan_ports, planned_pairs, port_ranges
+from echovr_setup.supervisor import DEFAULT_MONITOR_CONFIG, Supervisor
+
+PIDS = itertools.count(6000)
+
+
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    held = set()
+    monkeypatch.setattr(core_module, "occupied_ports", lambda ports: set(ports) & held)
+    core = SetupCore(str(tmp_path)).open()
+    core.held = held
+    return core
+
+
+class FakeProcess:
+    def __init__(self, args, **kwargs):
+        self.pid = next(PIDS)
+
+    def poll(self):
+        return None
+
+
+def configure(core, instances, reserved=frozenset()):
+    return core.configure("1234", "pw", instances, 7000, reserved=reserved)
+
+
+def test_plan_skips_taken_pairs():
+    pairs = plan_ports(3, 7000, lambda ports: {7003} & set(ports))
+    assert pairs == [(7000, 7001), (7004, 7005), (7006, 7007)]
+    assert port_ranges(pairs) == [(7000, 7001), (7004, 7007)]
+
+
+def test_reconfigure_keeps_own_running_instances(core):
+    assert configure(core, 2) == [(7000, 7001), (7002, 7003)]
+    # Both instances are up now, so their ports can't be bound
+    core.held.update({7000, 7001, 7002, 7003})
+    assert configure(core, 2) == [(7000, 7001), (7002, 7003)]
+    assert configure(core, 3) == [(7000, 7001), (7002, 7003), (7004, 7005)]
+    assert load_plan(core.port_plan) == [(7000, 7001), (7002, 7003), (7004, 7005)]
+
+
+def test_ports_held_by_monitor_instances_are_own(core):
+    os.makedirs(core.temp_dir, exist_ok=True)
+    with open(core.ports_json, "w") as f:
+        json.dump({"4242": {"GS": 7000, "API": 7001}}, f)
+    core.held.update({7000, 7001, 7004})
+    assert configure(core, 2) == [(7000, 7001), (7002, 7003)]
+    assert configure(core, 3) == [(7000, 7001), (7002, 7003), (7006, 7007)]
+
+
+def test_other_installs_and_programs_still_count(core):
+    core.held.add(7002)
+    assert configure(core, 2, reserved=frozenset({7000})) == [(7004, 7005), (7006, 7007)]
+
+
+def spawned_ports(root, base_port, instances, monkeypatch):
+    """The pairs a monitor on base_port starts its instances on."""
+    monkeypatch.setattr(supervisor_module.subprocess, "Popen", FakeProcess)
+    os.makedirs(os.path.join(root, "_local", "r14logs"), exist_ok=True)
+    config = dict(DEFAULT_MONITOR_CONFIG, amountOfInstances=instances, basePort=base_port, allowMonitorApi=False,
+                  autoArchive=False)
+    sup = Supervisor(root, config=config)
+    try:
+        asyncio.run(sup.tick())
+        return sorted((i.gs, i.api) for i in sup.instances)
+    finally:
+        sup.close()
+
+
+def test_monitor_follows_skipped_pairs(core, monkeypatch):
+    core.held.update({7000, 7003})
+    pairs = configure(core, 2)
+    assert pairs == [(7004, 7005), (7006, 7007)]
+    assert core.setup_data["portRanges"] == "7004-7007"
+    # The monitor keeps its basePort but starts on the ports the checklist lists
+    assert spawned_ports(core.root_dir, 7000, 2, monkeypatch) == pairs
+    # Past the plan it carries on after the last planned pair
+    assert spawned_ports(core.root_dir, 7000, 3, monkeypatch) == pairs + [(7008, 7009)]
+
+
+def test_plan_for_another_base_port_is_ignored(core, monkeypatch):
+    core.held.add(7002)
+    assert configure(core, 2) == [(7000, 7001), (7004, 7005)]
+    assert spawned_ports(core.root_dir, 8000, 2, monkeypatch) == [(8000, 8001), (8002, 8003)]
+    assert planned_pairs(core.port_plan + ".missing", 7000, 2) == [(7000, 7001), (7002, 7003)]
+
+
+def test_missing_fields(core):
+    with pytest.raises(SetupError):
+        core.configure("", "pw", 1)
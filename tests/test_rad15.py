@@ -0,0 +1,171 @@
+import os
+import random
+
+import pytest
+
+zstandard = pytest.importorskip("zstandard")
+
+from echovr_setup import rad15
+from echovr_setup.rad15 import Content, Frame, Manifest, Rad15Error, read_manifest, replace_files, to_symbol
+
+NAME = "48037dc70b0ecab2"
+TYPE = to_symbol("0x607d858c90268f9a")
+TARGETS = {(3, 1): to_symbol("0x11a8523ed4724ca7"), (9, 4): to_symbol("0xf8d40525c88885d8")}
+
+
+def section(count, size):
+    return (count * size, 0, 1 << 32, size, count, count)
+
+
+def build_package(root, frame_count=12, split=7):
+    """
+    A synthetic package: frame_count frames of five 16-aligned files, frames [0, split) in
+    package 0 (after a 4 byte lead-in) and the rest in package 1, plus a zero-size end marker.
+    Returns ({(type, file): bytes}, Manifest).
+    """
+    rng = random.Random(1)
+    (root / "packages").mkdir(parents=True)
+    (root / "manifests").mkdir()
+    files, contents, frames = {}, [], []
+    packages = {0: bytearray(b"HDR0"), 1: bytearray()}
+    compressor = zstandard.ZstdCompressor(level=3)
+    for fi in range(frame_count):
+        package = 0 if fi < split else 1
+        data = bytearray()
+        for k in range(5):
+            target = TARGETS.get((fi, k))
+            key = (TYPE, target) if target else (rng.getrandbits(63), rng.getrandbits(63))
+            blob = rng.randbytes(rng.randint(100, 3000)) + b"A" * rng.randint(0, 8000)
+            data += bytes(-len(data) % 16)
+            contents.append(Content(key[0], key[1], fi, len(data), len(blob), 16))
+            files[key] = blob
+            data += blob
+        packed = compressor.compress(bytes(data))
+        frames.append(Frame(package, len(packages[package]), len(packed), len(data)))
+        packages[package] += packed
+    frames.append(Frame(1, len(packages[1]), 0, 0))
+    for index, blob in packages.items():
+        (root / "packages" / f"{NAME}_{index}").write_bytes(blob)
+    header = (2, 524288, 0, *section(len(contents), 32), *section(len(contents), 40), *section(len(frames), 16))
+    manifest = Manifest(header, contents, rng.randbytes(40 * len(contents)), frames)
+    rad15.write_manifest(manifest, str(root / "manifests" / NAME))
+    return files, manifest
+
+
+def write_patch(root, files):
+    """files: {file symbol hex name: bytes} under root/0/<TYPE>/."""
+    folder = root / "0" / "0x607d858c90268f9a"
+    folder.mkdir(parents=True)
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+
+
+def read_all(root):
+    """{(type, file): bytes} decoded from the package at root."""
+    manifest = read_manifest(str(root / "manifests" / NAME))
+    decompressor = zstandard.ZstdDecompressor()
+    out = {}
+    for c in manifest.contents:
+        frame = manifest.frames[c.frame]
+        with open(root / "packages" / f"{NAME}_{frame.package}", "rb") as f:
+            f.seek(frame.offset)
+            data = decompressor.decompress(f.read(frame.compressed_size), max_output_size=frame.size)
+        assert len(data) == frame.size
+        assert c.offset % c.alignment == 0
+        out[(c.type_symbol, c.file_symbol)] = data[c.offset:c.offset + c.size]
+    return out
+
+
+def test_manifest_round_trips(tmp_path):
+    _, manifest = build_package(tmp_path)
+    read = read_manifest(str(tmp_path / "manifests" / NAME))
+    assert read.to_bytes() == manifest.to_bytes()
+    assert read.package_count == 2
+    assert read.frames[-1].compressed_size == 0
+
+
+def test_to_symbol_is_signed_int64():
+    assert to_symbol("0xf8d40525c88885d8") < 0
+    assert to_symbol("0x11a8523ed4724ca7") == 0x11a8523ed4724ca7
+    assert to_symbol("-5") == -5
+
+
+def test_replace_files_swaps_only_patched_files(tmp_path):
+    original, _ = build_package(tmp_path / "orig")
+    patch = {"0x11a8523ed4724ca7": os.urandom(8793), "0xf8d40525c88885d8": os.urandom(1541)}
+    write_patch(tmp_path / "patch", patch)
+    seen = []
+    stats = replace_files(str(tmp_path / "orig"), str(tmp_path / "patch"), str(tmp_path / "out"), NAME,
+                          progress=lambda done, total: seen.append((done, total)))
+    assert stats["frames_rewritten"] == 2 and stats["packages_written"] == 2
+    assert seen[-1][0] == seen[-1][1]
+
+    expected = dict(original)
+    expected[(TYPE, to_symbol("0x11a8523ed4724ca7"))] = patch["0x11a8523ed4724ca7"]
+    expected[(TYPE, to_symbol("0xf8d40525c88885d8"))] = patch["0xf8d40525c88885d8"]
+    assert read_all(tmp_path / "out") == expected
+
+    # Untouched frames are the same compressed bytes, just moved
+    before = read_manifest(str(tmp_path / "orig" / "manifests" / NAME))
+    after = read_manifest(str(tmp_path / "out" / "manifests" / NAME))
+    assert after.structures == before.structures and after.header == before.header
+    for index, (old, new) in enumerate(zip(before.frames, after.frames)):
+        if index in (3, 9) or not old.compressed_size:
+            continue
+        with open(tmp_path / "orig" / "packages" / f"{NAME}_{old.package}", "rb") as a, \
+                open(tmp_path / "out" / "packages" / f"{NAME}_{new.package}", "rb") as b:
+            a.seek(old.offset)
+            b.seek(new.offset)
+            assert a.read(old.compressed_size) == b.read(new.compressed_size)
+    # The end marker follows the resized package
+    assert after.frames[-1].offset == os.path.getsize(tmp_path / "out" / "packages" / f"{NAME}_1")
+
+
+def test_untouched_package_is_cloned(tmp_path):
+    build_package(tmp_path / "orig")
+    write_patch(tmp_path / "patch", {"0x11a8523ed4724ca7": b"new"})
+    stats = replace_files(str(tmp_path / "orig"), str(tmp_path / "patch"), str(tmp_path / "out"), NAME)
+    assert stats["packages_cloned"] == 1 and stats["packages_written"] == 1
+    assert (tmp_path / "out" / "packages" / f"{NAME}_1").read_bytes() == \
+        (tmp_path / "orig" / "packages" / f"{NAME}_1").read_bytes()
+
+
+def test_unknown_patch_file_fails_without_output(tmp_path):
+    build_package(tmp_path / "orig")
+    write_patch(tmp_path / "patch", {"0x1234": b"x"})
+    (tmp_path / "out" / "packages").mkdir(parents=True)
+    (tmp_path / "out" / "packages" / "2b47aab238f60515_0").write_bytes(b"kept")
+    with pytest.raises(Rad15Error):
+        replace_files(str(tmp_path / "orig"), str(tmp_path / "patch"), str(tmp_path / "out"), NAME)
+    assert os.listdir(tmp_path / "out" / "packages") == ["2b47aab238f60515_0"]
+
+
+def test_failure_partway_removes_partial_output(tmp_path):
+    build_package(tmp_path / "orig")
+    write_patch(tmp_path / "patch", {"0x11a8523ed4724ca7": b"new", "0xf8d40525c88885d8": b"new"})
+
+    def interrupt(done, total):
+        if done:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        replace_files(str(tmp_path / "orig"), str(tmp_path / "patch"), str(tmp_path / "out"), NAME,
+                      progress=interrupt)
+    assert os.listdir(tmp_path / "out" / "packages") == []
+    assert os.listdir(tmp_path / "out" / "manifests") == []
+
+
+def test_corrupt_manifest_is_rad15_error(tmp_path):
+    build_package(tmp_path / "orig")
+    path = tmp_path / "orig" / "manifests" / NAME
+    path.write_bytes(path.read_bytes()[:40])
+    with pytest.raises(Rad15Error):
+        read_manifest(str(path))
+
+
+def test_manifest_length_must_match_its_header(tmp_path):
+    build_package(tmp_path)
+    path = tmp_path / "manifests" / NAME
+    path.write_bytes(path.read_bytes() + b"\0" * 16)
+    with pytest.raises(Rad15Error, match="trailing data"):
+        read_manifest(str(path))
@@ -0,0 +1,95 @@
+import os
+import shutil
+
+from echovr_setup import rebuild
+from echovr_setup.rebuild import PatchOutputStore, clone_file, clone_path, link_file, list_files
+
+
+def test_clone_never_shares_storage(tmp_path):
+    src = tmp_path / "src"
+    src.write_bytes(b"original")
+    method = clone_file(str(src), str(tmp_path / "dst"))
+    assert method in ("reflink", "block_clone", "copy")
+    assert os.stat(src).st_ino != os.stat(tmp_path / "dst").st_ino
+    assert os.stat(src).st_nlink == 1
+    with open(tmp_path / "dst", "r+b") as f:
+        f.write(b"CHANGED")
+    assert src.read_bytes() == b"original"
+
+
+def test_link_shares_read_only_files(tmp_path):
+    src = tmp_path / "src"
+    src.write_bytes(b"original")
+    assert link_file(str(src), str(tmp_path / "dst")) == "hardlink"
+    assert os.stat(src).st_ino == os.stat(tmp_path / "dst").st_ino
+    # Replacing the linked copy leaves the original alone
+    os.remove(tmp_path / "dst")
+    (tmp_path / "dst").write_bytes(b"new")
+    assert src.read_bytes() == b"original"
+
+
+def test_clone_path_links_or_copies_trees(tmp_path):
+    (tmp_path / "a" / "sub").mkdir(parents=True)
+    (tmp_path / "a" / "x").write_bytes(b"1")
+    (tmp_path / "a" / "sub" / "y").write_bytes(b"2")
+    clone_path(str(tmp_path / "a"), str(tmp_path / "b"))
+    assert list_files(str(tmp_path / "b")) == ["sub/y", "x"]
+    assert os.stat(tmp_path / "b" / "x").st_nlink == 2
+    clone_path(str(tmp_path / "a"), str(tmp_path / "c"), mode="copy")
+    assert os.stat(tmp_path / "c" / "x").st_nlink == 1
+
+
+def test_store_round_trip_is_independent_of_win10(tmp_path):
+    produced = tmp_path / "produced"
+    (produced / "packages").mkdir(parents=True)
+    (produced / "packages" / "p_0").write_bytes(b"patched")
+    (produced / "kept").write_bytes(b"kept")
+    store = PatchOutputStore(str(tmp_path / "cache"), copies=True)
+    assert store.ingest("key", str(produced), exclude={"kept"})
+
+    # Writing into the live copy must not reach the cache entry
+    with open(produced / "packages" / "p_0", "r+b") as f:
+        f.write(b"BROKEN!")
+    win10 = tmp_path / "win10"
+    assert store.restore("key", str(win10))
+    assert list_files(str(win10)) == ["packages/p_0"]
+    assert (win10 / "packages" / "p_0").read_bytes() == b"patched"
+
+
+def test_restore_rejects_incomplete_entries(tmp_path):
+    produced = tmp_path / "produced"
+    produced.mkdir()
+    (produced / "f").write_bytes(b"data")
+    store = PatchOutputStore(str(tmp_path / "cache"), copies=True)
+    assert not store.restore("key", str(tmp_path / "win10"))
+
+    store.ingest("key", str(produced))
+    os.remove(tmp_path / "cache" / "key" / "f")
+    assert not store.restore("key", str(tmp_path / "win10"))
+
+
+def test_store_skips_entries_it_can_only_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(rebuild, "_reflink", lambda src, dst: False)
+    monkeypatch.setattr(rebuild, "_block_clone", lambda src, dst: False)
+    produced = tmp_path / "produced"
+    produced.mkdir()
+    (produced / "f").write_bytes(b"data")
+    store = PatchOutputStore(str(tmp_path / "cache"))
+    assert not store.ingest("key", str(produced))
+    assert os.listdir(tmp_path / "cache") == []
+    assert not store.restore("key", str(tmp_path / "win10"))
+
+    # Stands in for a filesystem with reflinks
+    monkeypatch.setattr(rebuild, "_reflink", lambda src, dst: shutil.copyfile(src, dst) is not None)
+    assert store.ingest("key", str(produced))
+    assert store.restore("key", str(tmp_path / "win10"))
+
+
+def test_store_keeps_recent_entries(tmp_path):
+    produced = tmp_path / "produced"
+    produced.mkdir()
+    (produced / "f").write_bytes(b"data")
+    store = PatchOutputStore(str(tmp_path / "cache"), keep=2, copies=True)
+    for key in ("a", "b", "c"):
+        store.ingest(key, str(produced))
+    assert sorted(n for n in os.listdir(tmp_path / "cache") if n != "index.json") == ["b", "c"]
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import time
+
+import pytest
+from conftest import QuietHandler, RangeHandler
+
+from echovr_setup.downloads import DownloadError, DownloadJob
+from echovr_setup.sources import ArtifactSources, MultiSourceFetcher
+
+SIZE = 3 * 1024 * 1024 + 123
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """A good copy and a corrupt copy of misc/blob.bin; returns (good_dir, bad_dir, data, sha256)."""
+    data = os.urandom(SIZE)
+    good = tmp_path / "good"
+    bad = tmp_path / "bad"
+    for root, content in ((good, data), (bad, b"x" * SIZE)):
+        (root / "misc").mkdir(parents=True)
+        (root / "misc" / "blob.bin").write_bytes(content)
+    return good, bad, data, hashlib.sha256(data).hexdigest()
+
+
+def make_cutoff(data, cut, send_length=True):
+    class CutOff(QuietHandler):
+        """Sends the first cut bytes of the file, then hangs up; refuses ranges."""
+
+        def do_GET(self):
+            if self.headers.get("Range"):
+                self.send_error(416)
+                return
+            self.send_response(200)
+            if send_length:
+                self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+    return CutOff
+
+
+class Slow(QuietHandler):
+    def do_GET(self):
+        time.sleep(0.5)
+        super().do_GET()
+
+
+class SlowStart(RangeHandler):
+    """Slow to send a whole file, quick to send the rest of one."""
+
+    def do_GET(self):
+        if not self.headers.get("Range"):
+            time.sleep(0.5)
+        super().do_GET()
+
+
+def fetch(sources, origin, dest, sha):
+    fetcher = MultiSourceFetcher(ArtifactSources(sources, root=origin), timeout=5)
+    fetcher.download(origin + "misc/blob.bin", str(dest), (sha,))
+    return fetcher
+
+
+def test_fastest_source_wins(serve, artifact, tmp_path):
+    good, _, data, sha = artifact
+    origin = serve(good, Slow)
+    mirror = serve(good)
+    fetcher = fetch([mirror], origin, tmp_path / "out.bin", sha)
+    assert (tmp_path / "out.bin").read_bytes() == data
+    assert fetcher.served == {mirror + "misc/blob.bin": 1}
+
+
+def test_local_folder_source(serve, artifact, tmp_path):
+    good, _, data, sha = artifact
+    origin = serve(good, Slow)
+    fetcher = fetch([str(good)], origin, tmp_path / "out.bin", sha)
+    assert (tmp_path / "out.bin").read_bytes() == data
+    assert fetcher.served == {os.path.join(str(good), "misc", "blob.bin"): 1}
+
+
+def test_cut_off_source_resumes_from_offset(serve, artifact, tmp_path):
+    good, _, data, sha = artifact
+    origin = serve(good, SlowStart)
+    dropper = serve(good, make_cutoff(data, 1024 * 1024))
+    fetcher = fetch([dropper], origin, tmp_path / "out.bin", sha)
+    assert (tmp_path / "out.bin").read_bytes() == data
+    # Both contributed: the dropper's first MB and the origin's ranged remainder
+    assert set(fetcher.served) == {dropper + "misc/blob.bin", origin + "misc/blob.bin"}
+
+
+def test_cut_off_without_length_is_a_failure(serve, artifact, tmp_path):
+    good, _, data, sha = artifact
+    origin = serve(good, Slow)
+    dropper = serve(good, make_cutoff(data, 1024 * 1024, send_length=False))
+    fetcher = fetch([dropper], origin, tmp_path / "out.bin", sha)
+    assert (tmp_path / "out.bin").read_bytes() == data
+    assert fetcher.served == {origin + "misc/blob.bin": 1}
+
+
+def test_corrupt_mirror_is_rejected(serve, artifact, tmp_path):
+    good, bad, data, sha = artifact
+    origin = serve(good, Slow)
+    fetcher = fetch([serve(bad), str(bad)], origin, tmp_path / "out.bin", sha)
+    assert (tmp_path / "out.bin").read_bytes() == data
+    assert fetcher.served == {origin + "misc/blob.bin": 1}
+
+
+def test_every_source_bad_fails_cleanly(serve, artifact, tmp_path):
+    _, bad, _, sha = artifact
+    with pytest.raises(DownloadError):
+        fetch([str(bad)], serve(bad), tmp_path / "out.bin", sha)
+    assert not (tmp_path / "out.bin").exists()
+    assert not (tmp_path / "out.bin.part").exists()
+
+
+def test_unhashed_files_only_come_from_origin(serve, artifact, tmp_path):
+    good, bad, data, _ = artifact
+    origin = serve(good, Slow)
+    fetcher = MultiSourceFetcher(ArtifactSources([str(bad)], root=origin), timeout=5)
+    fetcher.download_all([DownloadJob(origin + "misc/blob.bin", str(tmp_path / "out.bin"))])
+    assert (tmp_path / "out.bin").read_bytes() == data
+
+
+def test_candidates_map_repo_paths():
+    sources = ArtifactSources(["http://lan:8000/", "/srv/mirror"], root="https://origin/repo/")
+    assert sources.candidates("https://origin/repo/dll/a.dll") == [
+        "http://lan:8000/dll/a.dll", os.path.join("/srv/mirror", "dll", "a.dll"), "https://origin/repo/dll/a.dll"]
+    assert sources.candidates("https://elsewhere/x") == ["https://elsewhere/x"]
@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import json
+
+import pytest
+
+from echovr_setup import supervisor as supervisor_module
+from echovr_setup.ports import save_plan
+from echovr_setup.session import InstanceState
+from echovr_setup.supervisor import DEFAULT_MONITOR_CONFIG, KeepAliveClient, Supervisor, launch_args, poll_all
+
+PIDS = itertools.count(5000)
+
+
+class FakeProcess:
+    """Stands in for an echovr.exe Popen; exit() makes poll() report it gone."""
+
+    def __init__(self, args, **kwargs):
+        self.args = args
+        self.pid = next(PIDS)
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def exit(self, code=0):
+        self.returncode = code
+
+    def kill(self):
+        self.returncode = -9
+
+
+@pytest.fixture
+def supervisor(tmp_path, monkeypatch):
+    monkeypatch.setattr(supervisor_module.subprocess, "Popen", FakeProcess)
+    (tmp_path / "_local" / "r14logs").mkdir(parents=True)
+    (tmp_path / "dashboard").mkdir()
+    config = dict(DEFAULT_MONITOR_CONFIG, amountOfInstances=2, basePort=7000, allowMonitorApi=False,
+                  autoArchive=False)
+    sup = Supervisor(str(tmp_path), config=config)
+    yield sup
+    sup.close()
+
+
+def tick(sup):
+    return asyncio.run(sup.tick())
+
+
+def ports(sup):
+    return sorted((i.gs, i.api) for i in sup.instances)
+
+
+def test_tick_spawns_on_monitor_ports(supervisor):
+    tick(supervisor)
+    assert ports(supervisor) == [(7000, 7001), (7002, 7003)]
+    args = supervisor.instances[0].process.args
+    assert args[0] == supervisor.exe_path and args[1:] == launch_args(supervisor.config, 7000, 7001)
+    with open(supervisor.ports_json) as f:
+        saved = json.load(f)
+    assert {e["GS"] for e in saved.values()} == {7000, 7002}
+
+
+def test_planned_ports_are_used(supervisor):
+    save_plan(supervisor.port_plan, [(7000, 7001), (7010, 7011)], 7000)
+    tick(supervisor)
+    assert ports(supervisor) == [(7000, 7001), (7010, 7011)]
+
+
+def test_exited_instance_is_reaped_and_replaced(supervisor):
+    tick(supervisor)
+    gone = next(i for i in supervisor.instances if i.gs == 7002)
+    gone.process.exit(1)
+    tick(supervisor)
+    assert gone not in supervisor.instances
+    assert ports(supervisor) == [(7000, 7001), (7002, 7003)]
+    assert supervisor.metrics.restarts == {7002: 1}
+
+
+def test_paused_spawning_only_reaps(supervisor):
+    tick(supervisor)
+    supervisor.config["pauseSpawning"] = True
+    for instance in supervisor.instances:
+        instance.process.exit()
+    tick(supervisor)
+    assert supervisor.instances == []
+    with open(supervisor.ports_json) as f:
+        assert json.load(f) == {}
+
+
+def test_queued_shutdown_waits_for_idle(supervisor):
+    tick(supervisor)
+    supervisor.config["amountOfInstances"] = 1
+    instance = supervisor.instances[0]
+    supervisor.queue_shutdown(instance.pid)
+    tick(supervisor)
+    assert instance in supervisor.instances
+    instance.update(supervisor_module.decode_response(404))
+    tick(supervisor)
+    assert instance not in supervisor.instances
+    assert instance.process.returncode == -9
+
+
+def test_link_code_holds_spawning(supervisor, tmp_path):
+    supervisor.config["amountOfInstances"] = 1
+    tick(supervisor)
+    pid = supervisor.instances[0].pid
+    log = tmp_path / "_local" / "r14logs" / f"r14_20261018_{pid}.log"
+    log.write_text("[10-18-2026] [08:00:00]: Link code >>> ABC123 <<<\n")
+    supervisor.config["amountOfInstances"] = 2
+    tick(supervisor)
+    assert supervisor.link_code == "ABC123"
+    assert len(supervisor.instances) == 1
+    supervisor.clear_link_code()
+    tick(supervisor)
+    assert len(supervisor.instances) == 2
+
+
+async def fake_api(responses):
+    """An instance API on an ephemeral port answering /session from responses[path] = (status, body)."""
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                status, body = responses[request.split(b" ")[1].decode()]
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_poll_all_decodes_every_instance():
+    match = json.dumps({"match_type": "Echo_Arena", "map_name": "mpl_arena_a",
+                        "teams": [{"players": [{"playerid": 1}, {"playerid": 2}]}, {"players": []}]}).encode()
+
+    async def run():
+        idle_server, idle_port = await fake_api({"/session": (404, b"")})
+        match_server, match_port = await fake_api({"/session": (200, match)})
+        instances = [InstanceState(1, port, client=KeepAliveClient(port)) for port in (idle_port, match_port)]
+        dead = InstanceState(1, 1, client=KeepAliveClient(1))
+        try:
+            answered = await poll_all(instances + [dead])
+            # A second round goes over the kept-alive connections
+            answered += await poll_all(instances)
+        finally:
+            for instance in instances + [dead]:
+                instance.client.close()
+            idle_server.close()
+            match_server.close()
+        return answered, instances, dead
+
+    answered, (idle, match_instance), dead = asyncio.run(run())
+    assert answered == 4
+    assert idle.is_idle and idle.online
+    assert match_instance.session.kind == "match" and match_instance.player_count == 2
+    assert len(match_instance.history) == 2
+    assert not dead.online
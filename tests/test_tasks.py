@@ -0,0 +1,63 @@
+import threading
+import time
+
+from echovr_setup.tasks import TaskCancelled, TaskScheduler, TaskTimeout
+
+
+def drain_until(scheduler, condition, limit=5.0):
+    deadline = time.monotonic() + limit
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        scheduler.drain()
+        time.sleep(0.005)
+
+
+def test_done_then_exit():
+    scheduler = TaskScheduler(max_workers=1)
+    seen = []
+    scheduler.submit("job", lambda task: 42, on_done=lambda v: seen.append(("done", v)),
+                     on_exit=lambda: seen.append("exit"))
+    drain_until(scheduler, lambda: "exit" in seen)
+    assert seen == [("done", 42), "exit"]
+    assert scheduler.running("job") is None
+
+
+def test_timed_out_task_stays_running_until_worker_returns():
+    scheduler = TaskScheduler(max_workers=2)
+    release = threading.Event()
+    errors, exits = [], []
+
+    def work(task):
+        release.wait(5)
+        task.check()
+
+    task = scheduler.submit("patch", work, timeout=0.05, on_error=errors.append, on_exit=lambda: exits.append(1))
+    drain_until(scheduler, lambda: errors)
+    assert isinstance(errors[0], TaskTimeout)
+    # Settled, but the worker is still inside work(): nothing new may start under this name
+    assert scheduler.running("patch") is task
+    assert not task.exited
+
+    release.set()
+    drain_until(scheduler, lambda: exits)
+    assert scheduler.running("patch") is None
+    # The late TaskCancelled from the worker is not reported a second time
+    assert len(errors) == 1
+
+
+def test_cancel_reports_cancelled():
+    scheduler = TaskScheduler(max_workers=1)
+    started = threading.Event()
+    errors = []
+
+    def work(task):
+        started.set()
+        while True:
+            task.check()
+            time.sleep(0.001)
+
+    task = scheduler.submit("job", work, on_error=errors.append)
+    started.wait(5)
+    task.cancel()
+    drain_until(scheduler, lambda: errors and task.exited)
+    assert isinstance(errors[0], TaskCancelled)